@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+处理器端到端吞吐量基准测试
+
+使用本地假 Bot API 服务和与 main.py 相同的 Application 配置，用合成群组驱动
+真实的处理器，覆盖以下场景（按顺序运行，共享同一份数据）:
+
+- message:  前一半成员发送周报消息 (handle_message)
+- submit:   之后四分之一成员使用 /submit (submit_report)
+- status:   每个群组 --repeat 次 /status (check_status)
+- summary:  每个群组 --repeat 次 /summary (show_summary)
+- export:   每个群组 --repeat 次 /export (export_report)
+- reminder: --repeat 次定时提醒，所有群组同时到期 (scheduled_reminder)
+
+更新经 Application 的更新处理器（并发、按聊天串行）分发，单条延迟从交给
+处理器到处理完成（包括回复的 Bot API 调用）为止。每个场景记录吞吐量、
+p50/p99 延迟、分配的内存块数、实际写入磁盘的字节数 (Linux)、存储层逻辑读写
+字节数（来自存储指标）和 Bot API 调用次数，结果保存为 JSON，可用 --compare 与其他提交的结果对比。
+
+用法:
+    python benchmarks/bench_handlers.py [--groups 10] [--members 50] [--repeat 5]
+        [--backend json journal sqlite] [--scenario message status ...]
+        [--tracemalloc] [--output FILE] [--compare BASELINE.json]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fake_telegram import FakeTelegramServer  # noqa: E402
+from reporting import compare_results, save_results  # noqa: E402
+
+TOKEN = "123456:BENCHMARK"
+SCENARIOS = ("message", "submit", "status", "summary", "export", "reminder")
+REPORT_TEXT = "#周报 本周完成了基准测试相关工作，修复了若干问题；下周计划继续优化存储和提醒。"
+
+# 基准测试关注处理开销，默认放开发送限速并只输出警告日志（可用环境变量覆盖）
+BENCH_ENV = {
+    "LOG_LEVEL": "WARNING",
+    "SEND_GLOBAL_RATE": "1000000",
+    "SEND_CHAT_RATE": "1000000",
+    "LOOP_LAG_INTERVAL": "0",
+    "METRICS_PORT": "0",
+}
+
+
+def group_id(index: int) -> int:
+    """第 index 个合成群组的ID"""
+    return -1_000_000_000 - index
+
+
+def user_id(group: int, member: int, members: int) -> int:
+    """合成群组中第 member 个成员的ID（各群组成员互不重复）"""
+    return 10_000_000 + group * members + member
+
+
+def seed(services, groups: int, members: int):
+    """注册合成群组和成员（不计入测量）"""
+    for g in range(groups):
+        gid = group_id(g)
+        services.bot_service.register_group(gid, f"Bench Group {g}")
+        services.bot_service.sync_members(gid, {
+            str(user_id(g, m, members)): f"User{user_id(g, m, members)}"
+            for m in range(members)
+        })
+
+
+def make_updates(server: FakeTelegramServer, scenario: str, groups: int,
+                 members: int, repeat: int) -> list:
+    """生成场景的更新（不同群组交错，模拟同时到达）"""
+    updates = []
+    if scenario == "message":
+        for m in range(members // 2):
+            for g in range(groups):
+                updates.append(server.make_update(group_id(g), user_id(g, m, members), REPORT_TEXT))
+    elif scenario == "submit":
+        for m in range(members // 2, members * 3 // 4):
+            for g in range(groups):
+                updates.append(server.make_update(
+                    group_id(g), user_id(g, m, members), "/submit " + REPORT_TEXT
+                ))
+    else:
+        for _ in range(repeat):
+            for g in range(groups):
+                updates.append(server.make_update(group_id(g), user_id(g, 0, members), f"/{scenario}"))
+    return updates
+
+
+async def drive_updates(application, updates: list, inflight: int) -> tuple:
+    """把更新交给更新处理器，最多 inflight 条同时在途
+
+    Returns:
+        (总耗时, 单条延迟列表)
+    """
+    from telegram import Update
+
+    objects = [Update.de_json(data, application.bot) for data in updates]
+    processor = application.update_processor
+    gate = asyncio.Semaphore(inflight)
+    latencies = []
+
+    async def one(update):
+        async with gate:
+            start = time.perf_counter()
+            await processor.process_update(update, application.process_update(update))
+            latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(update) for update in objects))
+    return time.perf_counter() - started, latencies
+
+
+async def drive_reminders(application, services, repeat: int) -> tuple:
+    """运行 repeat 次定时提醒任务，每次所有群组都到期
+
+    Returns:
+        (总耗时, 单次任务耗时列表)
+    """
+    from telegram.ext import CallbackContext
+    from src.handlers.messages import scheduled_reminder
+    from src.services.schedule_service import ScheduleService
+
+    context = CallbackContext(application)
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(repeat):
+        # 新的调度从一周前开始计算，当前时刻所有群组都已到期
+        services.schedule_service = ScheduleService(services.config, services.shard)
+        services.schedule_service.sync(now=time.time() - 8 * 86400)
+        start = time.perf_counter()
+        await scheduled_reminder(context)
+        latencies.append(time.perf_counter() - start)
+    return time.perf_counter() - started, latencies
+
+
+def disk_write_bytes() -> int:
+    """本进程（所有线程）实际写入磁盘的字节数，不支持的平台返回 0
+
+    来自 /proc/self/io 的 write_bytes，按页计数并包含文件系统元数据，
+    同时覆盖 JSON 整文件重写、日志追加和 SQLite 页写入。
+    """
+    try:
+        with open("/proc/self/io", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("write_bytes:"):
+                    return int(line.split(":", 1)[1])
+    except OSError:
+        pass
+    return 0
+
+
+def storage_bytes(op_names) -> int:
+    """存储指标中累计的字节数"""
+    from src.utils.metrics import STORAGE_BYTES
+
+    return int(sum(
+        STORAGE_BYTES.value(component=component, op=op)
+        for component in ("config", "reports") for op in op_names
+    ))
+
+
+async def run_backend(backend: str, args) -> dict:
+    """在一个后端上依次运行所有场景
+
+    Returns:
+        {"<后端>/<场景>": 指标}
+    """
+    from main import build_application
+    from src.services.container import BOT_DATA_KEY
+    from src.utils.stats import summarize
+
+    os.environ["REPORT_STORAGE"] = backend
+    os.chdir(tempfile.mkdtemp(prefix=f"workpilot-bench-{backend}-"))
+
+    server = FakeTelegramServer()
+    server.start()
+    application = build_application(TOKEN, base_url=server.base_url)
+    services = application.bot_data[BOT_DATA_KEY]
+    errors = []
+
+    async def on_error(update, context):
+        errors.append(context.error)
+
+    application.add_error_handler(on_error)
+    seed(services, args.groups, args.members)
+    await application.initialize()
+
+    results = {}
+    try:
+        for scenario in args.scenario:
+            calls_before = sum(server.calls.values())
+            errors_before = len(errors)
+            disk_before = disk_write_bytes()
+            written_before = storage_bytes(("write", "upsert", "export"))
+            read_before = storage_bytes(("read",))
+            if args.tracemalloc:
+                tracemalloc.start()
+            blocks_before = sys.getallocatedblocks()
+
+            if scenario == "reminder":
+                elapsed, latencies = await drive_reminders(application, services, args.repeat)
+                operations = args.repeat * args.groups
+            else:
+                updates = make_updates(server, scenario, args.groups, args.members, args.repeat)
+                elapsed, latencies = await drive_updates(application, updates, args.inflight)
+                operations = len(updates)
+
+            # 等待排队中的存储写操作完成，计入本场景
+            await services.async_bot.run_write(lambda: None)
+            metrics = {
+                "operations": operations,
+                "seconds": elapsed,
+                "throughput": operations / elapsed if elapsed else 0.0,
+                "p50": summarize(latencies)["p50"],
+                "p99": summarize(latencies)["p99"],
+                "errors": len(errors) - errors_before,
+                "api_calls": sum(server.calls.values()) - calls_before,
+                "alloc_blocks": sys.getallocatedblocks() - blocks_before,
+                "disk_write_bytes": disk_write_bytes() - disk_before,
+                "storage_write_bytes": storage_bytes(("write", "upsert", "export")) - written_before,
+                "storage_read_bytes": storage_bytes(("read",)) - read_before,
+            }
+            if args.tracemalloc:
+                metrics["alloc_peak_bytes"] = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            results[f"{backend}/{scenario}"] = metrics
+    finally:
+        await application.shutdown()
+        services.close()
+        server.stop()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="处理器端到端吞吐量基准测试")
+    parser.add_argument("--groups", type=int, default=10, help="合成群组数")
+    parser.add_argument("--members", type=int, default=50, help="每个群组的成员数")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="查询类命令每个群组的次数 / 定时提醒的轮数")
+    parser.add_argument("--inflight", type=int, default=64, help="同时在途的更新数")
+    parser.add_argument("--backend", nargs="+", default=["json"],
+                        choices=["json", "journal", "sqlite"], help="周报存储后端")
+    parser.add_argument("--scenario", nargs="+", default=list(SCENARIOS),
+                        choices=SCENARIOS, help="运行的场景（按给定顺序）")
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="用 tracemalloc 记录每个场景的内存峰值（会显著拖慢运行）")
+    parser.add_argument("--output", help="结果文件，默认 benchmarks/results/handlers-<提交号>.json")
+    parser.add_argument("--compare", help="与之对比的基线结果文件")
+    parser.add_argument("--threshold", type=float, default=0.1, help="对比时视为退化的相对变化")
+    args = parser.parse_args()
+
+    for key, value in BENCH_ENV.items():
+        os.environ.setdefault(key, value)
+    # 启用指标，存储层读写字节数从指标中读取
+    from src.utils.metrics import REGISTRY
+    REGISTRY.enable()
+
+    results = {}
+    for backend in args.backend:
+        results.update(asyncio.run(run_backend(backend, args)))
+
+    print(f"{'场景':<18} {'操作数':>7} {'吞吐/s':>9} {'p50 ms':>8} {'p99 ms':>8} "
+          f"{'磁盘写 KB':>9} {'内存块':>8} {'API':>6} {'错误':>5}")
+    for name, m in results.items():
+        print(f"{name:<18} {m['operations']:>7} {m['throughput']:>9.1f} "
+              f"{m['p50'] * 1000:>8.2f} {m['p99'] * 1000:>8.2f} "
+              f"{m['disk_write_bytes'] / 1024:>9.1f} {m['alloc_blocks']:>8} "
+              f"{m['api_calls']:>6} {m['errors']:>5}")
+
+    params = {key: value for key, value in vars(args).items() if key not in ("output", "compare", "threshold")}
+    path = save_results("handlers", params, results, args.output)
+    print(f"\n结果已保存: {path}")
+
+    if args.compare:
+        compare_results(args.compare, results, args.threshold)
+    if any(m["errors"] for m in results.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
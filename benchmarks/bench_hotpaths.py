@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+存储与渲染热点路径微基准测试
+
+在临时目录中为每种规模（成员数 × 历史周数）建立一个群组，直接调用以下热点函数:
+
+- config_save:              Config.save()（同步写回整个配置文件）
+- load_reports:             WeeklyReport.load_reports()，每次先清空缓存
+- load_reports_cached:      WeeklyReport.load_reports()，命中缓存
+- get_pending_members:      BotService.get_pending_members()，索引已建立
+- get_pending_members_cold: BotService.get_pending_members()，每次先丢弃索引和缓存
+- generate_summary:         BotService.generate_summary()
+- export_to_markdown:       WeeklyReport.export_to_markdown()，当前周
+- export_history:           WeeklyReport.export_to_markdown()，全部历史周
+- add_report:               WeeklyReport.add_report()，依次为每个成员写入
+
+当前周 80% 的成员已提交；历史周各有 --history-members 份周报。每个场景自动
+确定每轮调用次数，输出单次调用耗时的最优值/中位数/均值，结果保存为 JSON。
+
+--profile DIR 为每个场景额外生成（不计入计时）:
+- <场景>.pstats:    cProfile 统计 (snakeviz / gprof2dot)
+- <场景>.folded:    调用栈采样，folded 格式 (flamegraph.pl / speedscope)
+- <场景>.alloc.txt: tracemalloc 内存峰值和存活内存最多的分配点
+
+用法:
+    python benchmarks/bench_hotpaths.py [--members 10 100 1000 10000] [--weeks 1 52 520]
+        [--backend json journal sqlite] [--scenario add_report ...]
+        [--profile DIR] [--output FILE] [--compare BASELINE.json]
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from profiling import StackSampler, run_cprofile, top_allocations  # noqa: E402
+from reporting import compare_results, save_results  # noqa: E402
+
+GROUP_ID = -1_000_000_001
+GROUP_NAME = "Bench Group"
+SCENARIOS = (
+    "config_save", "load_reports", "load_reports_cached", "get_pending_members",
+    "get_pending_members_cold", "generate_summary", "export_to_markdown",
+    "export_history", "add_report",
+)
+# 剖析时每个场景最多调用的次数（cProfile 和 tracemalloc 开销很大）
+PROFILE_CALLS = 200
+CONTENT = ("本周完成:\n1. 存储层性能优化，减少整文件重写\n2. 修复提醒时区问题\n"
+           "下周计划:\n1. 补充基准测试\n2. 评审导出功能")
+
+
+def record(user_id: int, submitted_at: str) -> dict:
+    """构造一份周报记录"""
+    return {"username": f"User{user_id}", "content": CONTENT, "submitted_at": submitted_at}
+
+
+class Fixture:
+    """一种规模的测试数据（临时目录中的配置和周报存储）"""
+
+    def __init__(self, backend: str, members: int, weeks: int, history_members: int):
+        """建立测试数据
+
+        Args:
+            backend: 周报存储后端
+            members: 群组成员数
+            weeks: 周报历史周数（包括当前周）
+            history_members: 每个历史周的周报数
+        """
+        from src.models.config import Config
+        from src.models.report import WeeklyReport
+        from src.models.report_store import create_report_store
+        from src.services.bot_service import BotService
+        from src.utils.time_utils import week_key, week_start
+
+        self.root = Path(tempfile.mkdtemp(prefix="workpilot-hotpaths-"))
+        reports_dir = self.root / "reports"
+        reports_dir.mkdir()
+        os.environ["REPORT_DB"] = str(self.root / "reports.db")
+        self.config = Config(self.root / "config.json", flush_interval=0, refresh_interval=0)
+        self.weekly = WeeklyReport(
+            reports_dir, store=create_report_store(backend, reports_dir),
+            timezone_for=self.config.get_group_timezone
+        )
+        self.bot_service = BotService(self.config, self.weekly)
+
+        self.user_ids = [10_000_000 + i for i in range(members)]
+        self.config.register_group(GROUP_ID, GROUP_NAME)
+        self.bot_service.sync_members(
+            GROUP_ID, {str(uid): f"User{uid}" for uid in self.user_ids}
+        )
+
+        store = self.weekly.store
+        current = self.weekly.current_week(GROUP_ID)
+        monday = week_start(current)
+        for k in range(weeks - 1, 0, -1):
+            week = week_key(monday - timedelta(weeks=k))
+            submitted_at = (monday - timedelta(weeks=k) + timedelta(days=4)).isoformat()
+            store.save_week(GROUP_ID, week, {"week": week, "reports": {
+                str(uid): record(uid, submitted_at) for uid in self.user_ids[:history_members]
+            }})
+        submitted_at = date.today().isoformat()
+        store.save_week(GROUP_ID, current, {"week": current, "reports": {
+            str(uid): record(uid, submitted_at) for uid in self.user_ids[:members * 4 // 5]
+        }})
+        self.all_weeks = sorted(store.list_weeks(GROUP_ID))
+        self._next_user = 0
+
+    def scenario(self, name: str):
+        """返回场景的无参调用函数，不适用时返回 None"""
+        weekly = self.weekly
+        bot_service = self.bot_service
+
+        if name == "config_save":
+            return self.config.save
+        if name == "load_reports":
+            def load():
+                weekly.cache.clear()
+                return weekly.load_reports(GROUP_ID)
+            return load
+        if name == "load_reports_cached":
+            return lambda: weekly.load_reports(GROUP_ID)
+        if name == "get_pending_members":
+            return lambda: bot_service.get_pending_members(GROUP_ID)
+        if name == "get_pending_members_cold":
+            def pending_cold():
+                bot_service.pending_index.invalidate(GROUP_ID)
+                weekly.cache.clear()
+                return bot_service.get_pending_members(GROUP_ID)
+            return pending_cold
+        if name == "generate_summary":
+            return lambda: bot_service.generate_summary(GROUP_ID)
+        if name == "export_to_markdown":
+            return lambda: weekly.export_to_markdown(GROUP_ID, GROUP_NAME)
+        if name == "export_history":
+            if len(self.all_weeks) < 2:
+                return None
+            return lambda: weekly.export_to_markdown(GROUP_ID, GROUP_NAME, weeks=self.all_weeks)
+        if name == "add_report":
+            def add():
+                uid = self.user_ids[self._next_user % len(self.user_ids)]
+                self._next_user += 1
+                return weekly.add_report(GROUP_ID, uid, f"User{uid}", CONTENT)
+            return add
+        raise ValueError(f"未知场景: {name}")
+
+    def close(self):
+        """关闭存储并删除临时目录"""
+        self.bot_service.close()
+        self.config.close()
+        self.weekly.close()
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+def measure(func, repeat: int, min_time: float, max_calls: int) -> dict:
+    """测量单次调用耗时
+
+    先确定每轮调用次数（一轮至少 min_time 秒，不超过 max_calls 次），再运行 repeat 轮。
+
+    Returns:
+        {"calls", "best", "p50", "mean"}（秒/次）
+    """
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or number >= max_calls:
+            break
+        number = min(max_calls, number * 10 if elapsed < min_time / 10 else number * 2)
+
+    per_call = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        per_call.append((time.perf_counter() - start) / number)
+    return {
+        "calls": number,
+        "best": min(per_call),
+        "p50": statistics.median(per_call),
+        "mean": statistics.fmean(per_call),
+    }
+
+
+def profile(func, calls: int, prefix: Path) -> int:
+    """生成 cProfile 统计、调用栈采样和内存分配报告
+
+    Returns:
+        内存峰值（字节）
+    """
+    run_cprofile(func, calls, prefix.with_suffix(".pstats"))
+
+    # 至少采样约 1 秒，样本太少时火焰图没有意义
+    with StackSampler() as sampler:
+        deadline = time.perf_counter() + 1.0
+        while time.perf_counter() < deadline:
+            func()
+    sampler.write_folded(prefix.with_suffix(".folded"))
+
+    peak, allocations = top_allocations(func, calls)
+    lines = [f"peak: {peak} bytes ({calls} calls)", ""]
+    for item in allocations:
+        lines.append(f"{item['size']:>12} B {item['count']:>8} blocks")
+        lines.extend(f"    {frame}" for frame in item["traceback"])
+    prefix.with_suffix(".alloc.txt").write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="存储与渲染热点路径微基准测试")
+    parser.add_argument("--members", type=int, nargs="+", default=[10, 100, 1000, 10000],
+                        help="群组成员数")
+    parser.add_argument("--weeks", type=int, nargs="+", default=[1, 52, 520],
+                        help="历史周数（包括当前周）")
+    parser.add_argument("--history-members", type=int, default=100,
+                        help="每个历史周的周报数（不超过成员数）")
+    parser.add_argument("--backend", nargs="+", default=["json"],
+                        choices=["json", "journal", "sqlite"], help="周报存储后端")
+    parser.add_argument("--scenario", nargs="+", default=list(SCENARIOS),
+                        choices=SCENARIOS, help="运行的场景")
+    parser.add_argument("--repeat", type=int, default=5, help="计时轮数")
+    parser.add_argument("--min-time", type=float, default=0.1, help="每轮最少秒数")
+    parser.add_argument("--max-calls", type=int, default=10000, help="每轮最多调用次数")
+    parser.add_argument("--profile", metavar="DIR",
+                        help="为每个场景输出 cProfile 统计、folded 调用栈和内存分配报告")
+    parser.add_argument("--output", help="结果文件，默认 benchmarks/results/hotpaths-<提交号>.json")
+    parser.add_argument("--compare", help="与之对比的基线结果文件")
+    parser.add_argument("--threshold", type=float, default=0.1, help="对比时视为退化的相对变化")
+    args = parser.parse_args()
+
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    profile_dir = Path(args.profile) if args.profile else None
+    if profile_dir is not None:
+        profile_dir.mkdir(parents=True, exist_ok=True)
+
+    # add_report 会改变当前周数据，放在最后运行
+    scenarios = [name for name in SCENARIOS if name in args.scenario]
+    results = {}
+    print(f"{'场景':<44} {'次/轮':>6} {'最优':>11} {'中位数':>11} {'均值':>11}")
+    for backend in args.backend:
+        for members in args.members:
+            for weeks in args.weeks:
+                fixture = Fixture(backend, members, weeks, min(args.history_members, members))
+                try:
+                    for name in scenarios:
+                        func = fixture.scenario(name)
+                        if func is None:
+                            continue
+                        key = f"{backend}/m{members}/w{weeks}/{name}"
+                        metrics = measure(func, args.repeat, args.min_time, args.max_calls)
+                        if profile_dir is not None:
+                            metrics["alloc_peak_bytes"] = profile(
+                                func, min(metrics["calls"], PROFILE_CALLS),
+                                profile_dir / key.replace("/", "_")
+                            )
+                        results[key] = metrics
+                        print(f"{key:<44} {metrics['calls']:>6} "
+                              f"{_format_seconds(metrics['best']):>11} "
+                              f"{_format_seconds(metrics['p50']):>11} "
+                              f"{_format_seconds(metrics['mean']):>11}")
+                finally:
+                    fixture.close()
+
+    params = {key: value for key, value in vars(args).items()
+              if key not in ("output", "compare", "threshold", "profile")}
+    path = save_results("hotpaths", params, results, args.output)
+    print(f"\n结果已保存: {path}")
+    if profile_dir is not None:
+        print(f"剖析结果: {profile_dir}")
+    if args.compare:
+        compare_results(args.compare, results, args.threshold)
+
+
+def _format_seconds(value: float) -> str:
+    """以合适的单位显示耗时"""
+    if value < 1e-3:
+        return f"{value * 1e6:.1f} µs"
+    if value < 1:
+        return f"{value * 1e3:.2f} ms"
+    return f"{value:.2f} s"
+
+
+if __name__ == "__main__":
+    main()
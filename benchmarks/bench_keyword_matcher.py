@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+关键词匹配基准测试
+
+对比逐个关键词扫描 (any(keyword in text)) 与编译后的 KeywordMatcher，
+覆盖不同的消息长度和关键词数量。
+
+用法:
+    python benchmarks/bench_keyword_matcher.py [--repeat 5] [--number 2000]
+"""
+
+import argparse
+import random
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.utils.keyword_matcher import KeywordMatcher
+
+
+BASE_KEYWORDS = ["周报", "#周报", "本周工作", "weekly report", "週報", "weekly update",
+                 "rapport hebdomadaire", "wochenbericht", "informe semanal", "週次報告"]
+CHAT_ALPHABET = "今天中午吃什么我们下午开会讨论一下需求好的收到谢谢 hello ok thanks lunch?"
+
+
+def make_keywords(count: int) -> list:
+    """生成指定数量的关键词（基础关键词 + 模板变体）"""
+    keywords = list(BASE_KEYWORDS)
+    index = 0
+    while len(keywords) < count:
+        keywords.append(f"{BASE_KEYWORDS[index % len(BASE_KEYWORDS)]} 模板{index}")
+        index += 1
+    return keywords[:count]
+
+
+def make_message(size: int, rng: random.Random) -> str:
+    """生成不含关键词的普通聊天消息（最坏情况：需要扫描全文）"""
+    return "".join(rng.choice(CHAT_ALPHABET) for _ in range(size))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="关键词匹配基准测试")
+    parser.add_argument("--repeat", type=int, default=5, help="重复轮数，取最优")
+    parser.add_argument("--number", type=int, default=2000, help="每轮调用次数")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    print(f"{'关键词数':>8} {'消息长度':>8} {'any() µs':>10} {'matcher µs':>11} {'加速比':>7}")
+    for keyword_count in (4, 16, 64, 256):
+        keywords = make_keywords(keyword_count)
+        matcher = KeywordMatcher(keywords)
+        for size in (20, 200, 2000, 20000):
+            text = make_message(size, rng)
+            assert matcher.search(text) == any(k in text for k in keywords)
+
+            scan = min(timeit.repeat(lambda: any(k in text for k in keywords),
+                                     repeat=args.repeat, number=args.number))
+            compiled = min(timeit.repeat(lambda: matcher.search(text),
+                                         repeat=args.repeat, number=args.number))
+            scan_us = scan / args.number * 1e6
+            compiled_us = compiled / args.number * 1e6
+            print(f"{keyword_count:>8} {size:>8} {scan_us:>10.2f} {compiled_us:>11.2f} "
+                  f"{scan_us / compiled_us:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
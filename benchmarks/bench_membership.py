@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+成员表内存与查询基准测试
+
+比较同一份成员数据的两种内存表示:
+
+- dict:    json.loads 得到的字符串键字典 {"群组ID": {"members": {"用户ID": "用户名"}}}
+- compact: Config 加载后 Config.data 中的 MemberTable（array('q') 成员ID + 共享
+           用户名表），字符串键只在读写文件时存在
+
+合成 --groups 个群组，每个群组 --members 人，其中 --overlap 比例的成员来自
+一个所有群组共享的用户池（同一个人在多个群组中）。对每种规模记录:
+
+- bytes:       常驻内存（tracemalloc，包括键、值和容器），即加载后进程实际占用
+- build:       加载耗时（dict 为 json.loads，compact 为 json.loads + 转换为 MemberTable）
+- lookup:      在已取得的群组成员表（compact 为 Config.membership 快照）中判断成员的
+               耗时（每次查询，一半命中）
+- username:    在已取得的群组成员表中按用户ID取用户名的耗时（每次查询）
+- iterate:     遍历全部群组全部成员 (user_id, username) 的耗时（dict 需要 int() 转换）
+
+用法:
+    python benchmarks/bench_membership.py [--groups 10 100] [--members 100 1000 10000]
+        [--overlap 0.5] [--output FILE] [--compare BASELINE.json]
+"""
+
+import argparse
+import gc
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from reporting import compare_results, save_results  # noqa: E402
+
+# 每种规模的查询次数
+QUERIES = 100_000
+
+
+def make_groups(groups: int, members: int, overlap: float, seed: int = 0) -> dict:
+    """生成配置文件中的群组部分"""
+    rng = random.Random(seed)
+    shared = [10_000_000 + i for i in range(members)]
+    shared_count = int(members * overlap)
+    data = {}
+    next_user = 20_000_000
+    for g in range(groups):
+        user_ids = rng.sample(shared, shared_count)
+        user_ids.extend(range(next_user, next_user + members - shared_count))
+        next_user += members - shared_count
+        data[str(-1_000_000_000 - g)] = {
+            "name": f"Bench Group {g}",
+            "members": {str(uid): f"User{uid}" for uid in user_ids},
+        }
+    return data
+
+
+def traced(build):
+    """运行 build 并返回 (结果, 存活字节数, 耗时)"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        result = build()
+        elapsed = time.perf_counter() - start
+        gc.collect()
+        size = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    return result, size, elapsed
+
+
+def timed(func, queries) -> float:
+    """每次查询的平均耗时（秒）"""
+    start = time.perf_counter()
+    for query in queries:
+        func(*query)
+    return (time.perf_counter() - start) / len(queries)
+
+
+def run_case(groups: int, members: int, overlap: float) -> dict:
+    """运行一种规模，返回 {"dict": 指标, "compact": 指标}"""
+    from src.models.config import Config
+    from src.models.membership import compact_groups
+
+    document = json.dumps({"groups": make_groups(groups, members, overlap)})
+    root = Path(tempfile.mkdtemp(prefix="workpilot-membership-"))
+    try:
+        (root / "config.json").write_text(document, encoding="utf-8")
+        config = Config(root / "config.json", flush_interval=0, refresh_interval=0)
+        group_ids = config.membership.group_ids()
+
+        loaded, dict_bytes, dict_build = traced(lambda: json.loads(document)["groups"])
+        # 与 Config 加载配置文件的路径相同；结果单独计量，不依赖上面的字符串键字典
+        _, compact_bytes, compact_build = traced(
+            lambda: compact_groups(json.loads(document)["groups"], {})
+        )
+        membership = config.membership
+        views = {group_id: membership.group(group_id) for group_id in group_ids}
+        tables = {group_id: loaded[str(group_id)]["members"] for group_id in group_ids}
+
+        rng = random.Random(1)
+        queries = []
+        for _ in range(QUERIES):
+            group_id = rng.choice(group_ids)
+            user_id = rng.choice(views[group_id].ids)
+            hit = rng.random() < 0.5
+            queries.append((group_id, user_id if hit else -user_id))
+
+        def dict_contains(group_id, user_id):
+            return str(user_id) in tables[group_id]
+
+        def dict_username(group_id, user_id):
+            return tables[group_id].get(str(user_id))
+
+        def compact_contains(group_id, user_id):
+            return user_id in views[group_id]
+
+        def compact_username(group_id, user_id):
+            return views[group_id].username(user_id)
+
+        def dict_iterate():
+            for group in loaded.values():
+                for user_id, username in group["members"].items():
+                    int(user_id)
+
+        def compact_iterate():
+            for group_id in group_ids:
+                for user_id, username in membership.group(group_id).items():
+                    pass
+
+        results = {
+            "dict": {
+                "bytes": dict_bytes,
+                "build": dict_build,
+                "lookup": timed(dict_contains, queries),
+                "username": timed(dict_username, queries),
+                "iterate": timed(dict_iterate, [()] * 3),
+            },
+            "compact": {
+                "bytes": compact_bytes,
+                "build": compact_build,
+                "lookup": timed(compact_contains, queries),
+                "username": timed(compact_username, queries),
+                "iterate": timed(compact_iterate, [()] * 3),
+                "usernames": membership.get_stats()["usernames"],
+            },
+        }
+        config.close()
+        return results
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="成员表内存与查询基准测试")
+    parser.add_argument("--groups", type=int, nargs="+", default=[10, 100], help="群组数")
+    parser.add_argument("--members", type=int, nargs="+", default=[100, 1000, 10000],
+                        help="每个群组的成员数")
+    parser.add_argument("--overlap", type=float, default=0.5,
+                        help="来自共享用户池（在多个群组中）的成员比例")
+    parser.add_argument("--output", help="结果文件，默认 benchmarks/results/membership-<提交号>.json")
+    parser.add_argument("--compare", help="与之对比的基线结果文件")
+    parser.add_argument("--threshold", type=float, default=0.1, help="对比时视为退化的相对变化")
+    args = parser.parse_args()
+
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    results = {}
+    print(f"{'规模':<16} {'表示':<8} {'内存 KB':>10} {'B/成员':>7} {'构建 ms':>9} "
+          f"{'查找 ns':>8} {'取名 ns':>8} {'遍历 ms':>8}")
+    for groups in args.groups:
+        for members in args.members:
+            case = run_case(groups, members, args.overlap)
+            for kind, m in case.items():
+                key = f"g{groups}/m{members}/{kind}"
+                results[key] = m
+                print(f"{f'g{groups}/m{members}':<16} {kind:<8} {m['bytes'] / 1024:>10.1f} "
+                      f"{m['bytes'] / (groups * members):>7.1f} {m['build'] * 1e3:>9.2f} "
+                      f"{m['lookup'] * 1e9:>8.0f} {m['username'] * 1e9:>8.0f} "
+                      f"{m['iterate'] * 1e3:>8.2f}")
+
+    params = {key: value for key, value in vars(args).items()
+              if key not in ("output", "compare", "threshold")}
+    path = save_results("membership", params, results, args.output)
+    print(f"\n结果已保存: {path}")
+    if args.compare:
+        compare_results(args.compare, results, args.threshold)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+更新 → 回复延迟基准测试 (polling 与 webhook 模式对比)
+
+使用本地假 Bot API 服务驱动真实的 Application（与 main.py 相同的处理器配置），
+逐条注入周报消息，测量从更新产生到 Bot 发出回复的延迟。
+
+用法:
+    python benchmarks/bench_update_latency.py [--count 200] [--mode polling webhook]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fake_telegram import FakeTelegramServer  # noqa: E402
+
+TOKEN = "123456:BENCHMARK"
+SECRET = "benchmark-secret"
+
+
+def _free_port() -> int:
+    """获取一个空闲端口"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _post_webhook(url: str, update: dict, secret: str) -> int:
+    """向 Bot 的 webhook 地址推送一条更新，返回 HTTP 状态码"""
+    request = urllib.request.Request(
+        url, data=json.dumps(update).encode(), method="POST",
+        headers={"Content-Type": "application/json",
+                 "X-Telegram-Bot-Api-Secret-Token": secret}
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+async def run_mode(mode: str, count: int) -> dict:
+    """在指定模式下运行一轮测试
+
+    Args:
+        mode: polling 或 webhook
+        count: 注入的更新数
+
+    Returns:
+        延迟统计
+    """
+    from main import ALLOWED_UPDATES, build_application
+    from src.utils.stats import summarize
+
+    server = FakeTelegramServer()
+    server.start()
+    application = build_application(TOKEN, base_url=server.base_url)
+    loop = asyncio.get_running_loop()
+
+    await application.initialize()
+    await application.start()
+    webhook_url = None
+    if mode == "polling":
+        await application.updater.start_polling(
+            poll_interval=0, timeout=10, allowed_updates=ALLOWED_UPDATES
+        )
+    else:
+        port = _free_port()
+        webhook_url = f"http://127.0.0.1:{port}/telegram"
+        await application.updater.start_webhook(
+            listen="127.0.0.1", port=port, url_path="telegram",
+            webhook_url=webhook_url, secret_token=SECRET,
+            allowed_updates=ALLOWED_UPDATES
+        )
+        # 错误的 secret token 必须被拒绝
+        bad = server.make_update(-1, 1, "#周报 伪造的更新内容内容")
+        status = await loop.run_in_executor(None, _post_webhook, webhook_url, bad, "wrong")
+        assert status == 403, f"secret token 校验失败: HTTP {status}"
+
+    latencies = []
+    timeouts = 0
+    try:
+        for i in range(count):
+            update = server.make_update(
+                chat_id=-1000 - i % 10, user_id=i,
+                text=f"#周报 第{i}份 本周完成了基准测试相关工作"
+            )
+            message_id = update["message"]["message_id"]
+            started = time.perf_counter()
+            if mode == "polling":
+                server.push_update(update)
+            else:
+                await loop.run_in_executor(None, _post_webhook, webhook_url, update, SECRET)
+            arrived = await loop.run_in_executor(None, server.wait_reply, message_id)
+            if arrived is None:
+                timeouts += 1
+            else:
+                latencies.append(arrived - started)
+    finally:
+        if application.updater.running:
+            await application.updater.stop()
+        await application.stop()
+        await application.shutdown()
+        server.stop()
+
+    result = summarize(latencies)
+    result["timeouts"] = timeouts
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="更新 → 回复延迟基准测试")
+    parser.add_argument("--count", type=int, default=200, help="每种模式注入的更新数")
+    parser.add_argument("--mode", nargs="+", default=["polling", "webhook"],
+                        choices=["polling", "webhook"], help="测试的模式")
+    args = parser.parse_args()
+
+    # 使用临时数据目录，避免污染 data/
+    os.chdir(tempfile.mkdtemp(prefix="workpilot-bench-"))
+
+    print(f"{'模式':<8} {'样本':>6} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8} {'超时':>5}")
+    for mode in args.mode:
+        stats = asyncio.run(run_mode(mode, args.count))
+        print(f"{mode:<8} {stats['count']:>6} {stats['p50'] * 1000:>8.2f} "
+              f"{stats['p90'] * 1000:>8.2f} {stats['p99'] * 1000:>8.2f} "
+              f"{stats['max'] * 1000:>8.2f} {stats['timeouts']:>5}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+本地假 Telegram Bot API 服务
+
+在后台线程中运行一个最小化的 Bot API HTTP 服务，供基准测试使用:
+- getMe / setMyCommands / deleteWebhook / setWebhook 等直接返回成功
+- getUpdates 支持长轮询，返回通过 push_update() 注入的更新
+- sendMessage / sendDocument 记录到达时间，用于计算“更新 → 回复”延迟
+
+Bot 通过 Application.builder().base_url(server.base_url) 指向该服务。
+"""
+
+import itertools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs
+
+
+BOT_USER = {
+    "id": 424242,
+    "is_bot": True,
+    "first_name": "WorkPilot",
+    "username": "workpilot_bench_bot",
+    "can_join_groups": True,
+    "can_read_all_group_messages": True,
+    "supports_inline_queries": False,
+}
+
+
+class FakeTelegramServer:
+    """假 Bot API 服务"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        """初始化服务（port 为 0 时自动分配）
+
+        Args:
+            host: 监听地址
+            port: 监听端口
+        """
+        self._updates: List[dict] = []
+        self._update_ids = itertools.count(1)
+        self._message_ids = itertools.count(1_000_000)
+        self._cond = threading.Condition()
+        # 回复记录: [(到达时间, 方法名, 参数)]
+        self.replies: List[tuple] = []
+        self.calls: Dict[str, int] = {}
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = self.rfile.read(length)
+                method = self.path.rsplit("/", 1)[-1]
+                params = _parse_params(self.headers.get("Content-Type", ""), body)
+                result = server._dispatch(method, params)
+                payload = json.dumps({"ok": True, "result": result}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = do_POST
+
+            def log_message(self, format, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer((host, port), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        """Bot API 基础地址（传给 Application.builder().base_url）"""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/bot"
+
+    def start(self):
+        """启动服务线程"""
+        self._thread.start()
+
+    def stop(self):
+        """停止服务并唤醒所有长轮询"""
+        with self._cond:
+            self._cond.notify_all()
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def make_update(self, chat_id: int, user_id: int, text: str,
+                    chat_type: str = "supergroup") -> dict:
+        """构造一条群消息更新
+
+        Args:
+            chat_id: 聊天ID
+            user_id: 发送者ID
+            text: 消息文本
+            chat_type: 聊天类型
+
+        Returns:
+            Update 字典
+        """
+        message = {
+            "message_id": next(self._message_ids),
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": chat_type, "title": f"Group {chat_id}"},
+            "from": {"id": user_id, "is_bot": False, "first_name": f"User{user_id}"},
+            "text": text,
+        }
+        if text.startswith("/"):
+            command = text.split()[0]
+            message["entities"] = [{"type": "bot_command", "offset": 0, "length": len(command)}]
+        return {"update_id": next(self._update_ids), "message": message}
+
+    def push_update(self, update: dict):
+        """注入一条更新，供 getUpdates 长轮询返回
+
+        Args:
+            update: Update 字典
+        """
+        with self._cond:
+            self._updates.append(update)
+            self._cond.notify_all()
+
+    def wait_reply(self, message_id: int, timeout: float = 10.0) -> Optional[float]:
+        """等待针对某条消息的回复
+
+        Args:
+            message_id: 被回复的消息ID
+            timeout: 超时秒数
+
+        Returns:
+            回复到达的 perf_counter 时间，超时返回 None
+        """
+        deadline = time.perf_counter() + timeout
+        with self._cond:
+            while True:
+                for arrived, _, params in self.replies:
+                    if str(params.get("reply_to_message_id")) == str(message_id):
+                        return arrived
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+
+    def _dispatch(self, method: str, params: dict):
+        """处理一次 Bot API 调用"""
+        self.calls[method] = self.calls.get(method, 0) + 1
+
+        if method == "getUpdates":
+            return self._get_updates(params)
+        if method == "getMe":
+            return BOT_USER
+        if method in ("sendMessage", "sendDocument"):
+            with self._cond:
+                self.replies.append((time.perf_counter(), method, params))
+                self._cond.notify_all()
+            chat_id = int(params.get("chat_id", 0))
+            return {
+                "message_id": next(self._message_ids),
+                "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "supergroup"},
+                "from": BOT_USER,
+                "text": params.get("text", ""),
+            }
+        if method == "getChatAdministrators":
+            return [{"status": "creator", "user": BOT_USER, "is_anonymous": False}]
+        return True
+
+    def _get_updates(self, params: dict) -> List[dict]:
+        """长轮询返回 offset 之后的更新"""
+        offset = int(params.get("offset", 0) or 0)
+        timeout = float(params.get("timeout", 0) or 0)
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                self._updates = [u for u in self._updates if u["update_id"] >= offset]
+                if self._updates or time.monotonic() >= deadline:
+                    return list(self._updates)
+                self._cond.wait(deadline - time.monotonic())
+
+
+def _parse_params(content_type: str, body: bytes) -> dict:
+    """解析 Bot API 请求参数（JSON 或表单）"""
+    if not body:
+        return {}
+    if "application/json" in content_type:
+        return json.loads(body)
+    if "multipart/form-data" in content_type:
+        # 文件上传：基准测试只关心到达时间，不解析内容
+        return {}
+    return {key: values[-1] for key, values in parse_qs(body.decode()).items()}
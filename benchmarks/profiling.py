@@ -0,0 +1,115 @@
+"""
+基准测试的剖析工具
+
+- StackSampler: 定时采样目标线程的调用栈，输出 folded 格式
+  ("外层;内层;... 次数"，可直接交给 flamegraph.pl、speedscope 或 inferno)
+- run_cprofile: 用 cProfile 运行并保存 .pstats（snakeviz / gprof2dot 可读）
+- top_allocations: 用 tracemalloc 运行并返回按调用栈汇总的最大分配点
+"""
+
+import cProfile
+import sys
+import threading
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+
+class StackSampler:
+    """调用栈采样器（在后台线程中按固定间隔采样）"""
+
+    def __init__(self, interval: float = 0.001, thread_id: int = None):
+        """初始化采样器
+
+        Args:
+            interval: 采样间隔（秒）
+            thread_id: 被采样的线程，默认为创建采样器的线程
+        """
+        self.interval = interval
+        self.thread_id = thread_id or threading.get_ident()
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(names))] += 1
+
+    def __enter__(self) -> "StackSampler":
+        self._thread = threading.Thread(target=self._sample, name="stack-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+    def write_folded(self, path: Path):
+        """以 folded 格式保存采样结果
+
+        Args:
+            path: 输出文件
+        """
+        lines = [f"{stack} {count}" for stack, count in self.stacks.most_common()]
+        Path(path).write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def run_cprofile(func: Callable[[], object], calls: int, path: Path):
+    """用 cProfile 运行 calls 次并保存统计
+
+    Args:
+        func: 被测函数
+        calls: 调用次数
+        path: .pstats 输出文件
+    """
+    profiler = cProfile.Profile()
+    profiler.enable()
+    for _ in range(calls):
+        func()
+    profiler.disable()
+    profiler.dump_stats(str(path))
+
+
+def top_allocations(func: Callable[[], object], calls: int, limit: int = 10,
+                    frames: int = 8) -> Tuple[int, List[dict]]:
+    """用 tracemalloc 运行 calls 次，返回内存峰值和运行后仍存活（包括返回值）内存最多的分配点
+
+    Args:
+        func: 被测函数
+        calls: 调用次数
+        limit: 返回的分配点数
+        frames: 每个分配点保留的调用栈深度
+
+    Returns:
+        (峰值字节数, [{"size", "count", "traceback"}])，traceback 从分配处向外
+    """
+    tracemalloc.start(frames)
+    try:
+        before = tracemalloc.take_snapshot()
+        # 保留返回值直到快照，返回值本身的分配也计入
+        kept = [func() for _ in range(calls)]
+        after = tracemalloc.take_snapshot()
+        peak = tracemalloc.get_traced_memory()[1]
+        del kept
+    finally:
+        tracemalloc.stop()
+
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    stats = after.filter_traces(ignore).compare_to(before.filter_traces(ignore), "traceback")
+    top = []
+    for stat in sorted(stats, key=lambda s: s.size_diff, reverse=True)[:limit]:
+        top.append({
+            "size": stat.size_diff,
+            "count": stat.count_diff,
+            "traceback": [f"{Path(f.filename).name}:{f.lineno}" for f in reversed(stat.traceback)],
+        })
+    return peak, top
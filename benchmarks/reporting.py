@@ -0,0 +1,107 @@
+"""
+基准测试结果的保存与对比
+
+结果保存为 JSON，附带提交号、Python 版本和运行参数，便于跨提交比较:
+
+    {"benchmark": ..., "meta": {...}, "params": {...}, "results": {场景: {指标: 值}}}
+"""
+
+import json
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+# 对比的指标；throughput 越大越好，其余（耗时、内存、字节数）越小越好
+COMPARED_METRICS = ("throughput", "p50", "p99", "mean", "disk_write_bytes", "alloc_peak_bytes",
+                    "bytes", "lookup", "username", "iterate")
+HIGHER_IS_BETTER = ("throughput",)
+
+
+def git_revision() -> str:
+    """获取当前提交号（工作区有改动时加 -dirty），不在 git 仓库中时返回 unknown"""
+    try:
+        revision = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return f"{revision}-dirty" if dirty else revision
+
+
+def save_results(benchmark: str, params: dict, results: Dict[str, dict],
+                 output: Optional[str] = None) -> Path:
+    """保存结果
+
+    Args:
+        benchmark: 基准测试名称
+        params: 运行参数
+        results: {场景: {指标: 值}}
+        output: 输出文件，默认为 benchmarks/results/<名称>-<提交号>.json
+
+    Returns:
+        输出文件路径
+    """
+    revision = git_revision()
+    document = {
+        "benchmark": benchmark,
+        "meta": {
+            "revision": revision,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+        },
+        "params": params,
+        "results": results,
+    }
+    path = Path(output) if output else RESULTS_DIR / f"{benchmark}-{revision}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(document, ensure_ascii=False, indent=2), encoding="utf-8")
+    return path
+
+
+def compare_results(baseline_file: str, results: Dict[str, dict], threshold: float = 0.1) -> int:
+    """与基线结果对比，打印变化超过阈值的指标
+
+    Args:
+        baseline_file: 基线结果文件
+        results: 本次结果 {场景: {指标: 值}}
+        threshold: 视为退化的相对变化比例
+
+    Returns:
+        退化的指标数
+    """
+    baseline = json.loads(Path(baseline_file).read_text(encoding="utf-8"))
+    print(f"\n与基线 {baseline['meta']['revision']} 对比 (退化阈值 {threshold:.0%}):")
+    regressions = changed = 0
+    for scenario, metrics in results.items():
+        old_metrics = baseline["results"].get(scenario)
+        if not old_metrics:
+            continue
+        for name in COMPARED_METRICS:
+            value = metrics.get(name)
+            old = old_metrics.get(name)
+            if not isinstance(value, (int, float)) or not isinstance(old, (int, float)) or not old:
+                continue
+            change = (value - old) / abs(old)
+            worse = -change if name in HIGHER_IS_BETTER else change
+            if abs(worse) <= threshold:
+                continue
+            changed += 1
+            if worse > 0:
+                regressions += 1
+            mark = "退化" if worse > 0 else "改善"
+            print(f"  {scenario:<28} {name:<18} {old:>12.6g} → {value:<12.6g} {change:+8.1%}  {mark}")
+    if not changed:
+        print("  没有超过阈值的变化")
+    return regressions
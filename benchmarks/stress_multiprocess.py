@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+多进程并发写入压力测试
+
+启动多个工作进程共享同一个 data/ 目录，每个进程同时向同一个群组注册成员、
+提交周报并修改排除列表，结束后用全新的实例重新加载，检查是否有提交丢失。
+
+用法:
+    python benchmarks/stress_multiprocess.py [--workers 8] [--reports 100]
+        [--backend json journal sqlite] [--flush-interval 0]
+
+任何一个后端出现丢失时以非零状态码退出。
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+GROUP_ID = -1001
+WEEK = "2026-W01"
+
+
+def worker(data_dir: str, backend: str, index: int, reports: int,
+           flush_interval: float, start_barrier):
+    """工作进程：注册成员、提交周报、修改排除列表
+
+    Args:
+        data_dir: 共享数据目录
+        backend: 周报存储后端
+        index: 工作进程序号
+        reports: 每个进程提交的周报数
+        flush_interval: 配置写回合并窗口
+        start_barrier: 所有进程同时开始的屏障
+    """
+    from src.models.config import Config
+    from src.models.report import WeeklyReport
+    from src.models.report_store import create_report_store
+
+    data_dir = Path(data_dir)
+    reports_dir = data_dir / "reports"
+    os.environ["REPORT_DB"] = str(data_dir / "reports.db")
+    config = Config(data_dir / "config.json", flush_interval=flush_interval)
+    manager = WeeklyReport(reports_dir, store=create_report_store(backend, reports_dir))
+
+    start_barrier.wait()
+    config.register_group(GROUP_ID, "Stress Group")
+    for i in range(reports):
+        user_id = index * reports + i
+        config.add_member(GROUP_ID, user_id, f"user{user_id}")
+        manager.add_report(GROUP_ID, user_id, f"user{user_id}", f"report {user_id}", WEEK)
+    # 每个进程排除一个自己的用户，验证不同类型的修改也不会互相覆盖
+    config.add_excluded_user(index * reports, f"user{index * reports}")
+
+    config.close()
+    manager.close()
+
+
+def run(backend: str, workers: int, reports: int, flush_interval: float) -> dict:
+    """运行一轮压力测试
+
+    Args:
+        backend: 周报存储后端
+        workers: 工作进程数
+        reports: 每个进程提交的周报数
+        flush_interval: 配置写回合并窗口
+
+    Returns:
+        结果统计
+    """
+    from src.models.config import Config
+    from src.models.report_store import create_report_store
+
+    data_dir = Path(tempfile.mkdtemp(prefix=f"workpilot-stress-{backend}-"))
+    ctx = multiprocessing.get_context("spawn")
+    barrier = ctx.Barrier(workers)
+    processes = [
+        ctx.Process(target=worker, args=(str(data_dir), backend, i, reports,
+                                         flush_interval, barrier))
+        for i in range(workers)
+    ]
+
+    started = time.perf_counter()
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    duration = time.perf_counter() - started
+
+    # 用全新实例从磁盘重新加载
+    os.environ["REPORT_DB"] = str(data_dir / "reports.db")
+    store = create_report_store(backend, data_dir / "reports")
+    submitted = store.load_week(GROUP_ID, WEEK)["reports"]
+    store.close()
+    config = Config(data_dir / "config.json", flush_interval=0)
+    members = (config.get_group(GROUP_ID) or {}).get("members", {})
+    excluded = config.get_excluded_users()
+
+    expected = workers * reports
+    return {
+        "backend": backend,
+        "expected": expected,
+        "reports": len(submitted),
+        "members": len(members),
+        "excluded": len(excluded),
+        "lost": (expected - len(submitted)) + (expected - len(members))
+                + (workers - len(excluded)),
+        "failed_workers": sum(1 for p in processes if p.exitcode != 0),
+        "duration": duration,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="多进程并发写入压力测试")
+    parser.add_argument("--workers", type=int, default=8, help="工作进程数")
+    parser.add_argument("--reports", type=int, default=100, help="每个进程提交的周报数")
+    parser.add_argument("--backend", nargs="+", default=["json", "journal", "sqlite"],
+                        choices=["json", "journal", "sqlite"], help="测试的存储后端")
+    parser.add_argument("--flush-interval", type=float, default=0,
+                        help="配置写回合并窗口（秒），0 为每次修改立即保存")
+    args = parser.parse_args()
+
+    print(f"{'后端':<8} {'预期':>6} {'周报':>6} {'成员':>6} {'排除':>5} {'丢失':>5} "
+          f"{'失败进程':>8} {'耗时 s':>7}")
+    ok = True
+    for backend in args.backend:
+        result = run(backend, args.workers, args.reports, args.flush_interval)
+        ok = ok and result["lost"] == 0 and result["failed_workers"] == 0
+        print(f"{backend:<8} {result['expected']:>6} {result['reports']:>6} "
+              f"{result['members']:>6} {result['excluded']:>5} {result['lost']:>5} "
+              f"{result['failed_workers']:>8} {result['duration']:>7.2f}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,11 @@ WorkPilot - Telegram 周报收集 Bot
 主入口文件
 """
 
+import argparse
+import asyncio
+import multiprocessing
 import os
+import signal
 import sys
 import logging
 from pathlib import Path
@@ -47,67 +51,317 @@ from src.handlers.commands import (
     exclude_user,
     include_user,
     list_excluded,
+    schedule_command,
 )
+from src.handlers.filters import REPORT_FILTER_KEY, ReportMessageFilter
 from src.handlers.messages import handle_message
 from src.handlers.menu_setup import setup_menu_commands
+from src.instrumentation import (
+    CONNECTION_POOL_SIZE, InstrumentedRequest, instrument_handler, register_service_gauges,
+    register_update_gauges, with_log_context,
+)
+from src.models.report_store import LegacyWeekKeysError, create_report_store
 from src.scheduler import setup_scheduled_jobs
-from src.utils.logger import setup_logger
+from src.services.container import BOT_DATA_KEY, ServiceContainer
+from src.sharding import ShardSpec, build_router_application, feed_updates
+from src.update_processor import BacklogQueue, PerChatUpdateProcessor
+from src.utils.logger import configure_logging, setup_logger
+from src.utils.loop_monitor import LoopLagMonitor
+from src.utils.metrics import start_metrics_server
 
 
 # 配置日志
 logger = setup_logger(__name__)
 
 
-def main():
-    """主函数"""
-    # 从环境变量获取 Bot Token
-    token = os.environ.get("TELEGRAM_BOT_TOKEN")
+# 只订阅实际处理的更新类型（命令和普通消息都属于 message）
+ALLOWED_UPDATES = [Update.MESSAGE]
 
-    if not token:
-        logger.error("请设置 TELEGRAM_BOT_TOKEN 环境变量")
-        print("错误: 请设置 TELEGRAM_BOT_TOKEN 环境变量")
-        print("export TELEGRAM_BOT_TOKEN='your_bot_token_here'")
-        sys.exit(1)
+# Application.bot_data 中保存事件循环延迟监控器的键
+LOOP_MONITOR_KEY = "loop_monitor"
+
+# 命令及其处理器
+COMMAND_HANDLERS = [
+    ("start", start),
+    ("help", help_command),
+    ("sync", sync_members),
+    ("register", register_member),
+    ("unregister", unregister_member),
+    ("submit", submit_report),
+    ("status", check_status),
+    ("summary", show_summary),
+    ("remind", send_reminder),
+    ("export", export_report),
+    ("members", list_members),
+    ("schedule", schedule_command),
+    ("exclude", exclude_user),
+    ("include", include_user),
+    ("excluded", list_excluded),
+]
+
+
+def build_application(token: str, services: ServiceContainer = None,
+                      base_url: str = None, shard: ShardSpec = None) -> Application:
+    """创建并配置 Telegram Application
+
+    Args:
+        token: Bot Token
+        services: 共享服务容器，默认新建
+        base_url: Bot API 地址，默认为官方地址（测试时可指向本地假服务）
+        shard: 分片部署时本进程负责的分片；此时不创建 Updater，更新由前端转发
+
+    Returns:
+        配置好处理器和定时任务的 Application
+    """
+    # 指标服务（端口为 0 时关闭；分片部署时每个分片使用 METRICS_PORT + 分片序号）
+    metrics_server = None
+    metrics_port = int(os.environ.get("METRICS_PORT", "0"))
+    if metrics_port > 0:
+        if shard is not None:
+            metrics_port += shard.index
+        metrics_server = start_metrics_server(
+            metrics_port, os.environ.get("METRICS_HOST", "127.0.0.1")
+        )
+
+    builder = Application.builder().token(token)
+    if base_url:
+        builder = builder.base_url(base_url)
+    if shard is not None:
+        builder = builder.updater(None)
+    if metrics_server is not None:
+        builder = builder.request(InstrumentedRequest(connection_pool_size=CONNECTION_POOL_SIZE))
+
+    # 有界更新队列：处理跟不上时对接收端形成背压，而不是无限堆积
+    queue_size = int(os.environ.get("UPDATE_QUEUE_SIZE", "1000"))
 
-    # 创建应用
-    application = Application.builder().token(token).build()
-
-    # 添加命令处理器
-    application.add_handler(CommandHandler("start", start))
-    application.add_handler(CommandHandler("help", help_command))
-    application.add_handler(CommandHandler("sync", sync_members))
-    application.add_handler(CommandHandler("register", register_member))
-    application.add_handler(CommandHandler("unregister", unregister_member))
-    application.add_handler(CommandHandler("submit", submit_report))
-    application.add_handler(CommandHandler("status", check_status))
-    application.add_handler(CommandHandler("summary", show_summary))
-    application.add_handler(CommandHandler("remind", send_reminder))
-    application.add_handler(CommandHandler("export", export_report))
-    application.add_handler(CommandHandler("members", list_members))
-    application.add_handler(CommandHandler("exclude", exclude_user))
-    application.add_handler(CommandHandler("include", include_user))
-    application.add_handler(CommandHandler("excluded", list_excluded))
-
-    # 添加消息处理器（检测周报关键词）
+    # 不同群组的更新并发处理，同一群组内保持到达顺序
+    max_concurrent = int(os.environ.get("MAX_CONCURRENT_UPDATES", "8"))
+    if max_concurrent > 1:
+        # 并发模式下 PTB 取出更新后不等待处理完成，普通队列会被立即取空；
+        # BacklogQueue 在已调度的更新达到 queue_size 时停止取出，
+        # 内存中的更新最多为 2 × queue_size（排队 + 已调度）
+        processor = PerChatUpdateProcessor(max_concurrent, max_backlog=queue_size)
+        builder = builder.concurrent_updates(processor)
+        builder = builder.update_queue(BacklogQueue(processor, maxsize=queue_size))
+        if metrics_server is not None:
+            register_update_gauges(processor)
+    else:
+        builder = builder.update_queue(asyncio.Queue(maxsize=queue_size))
+
+    application = builder.build()
+
+    # 创建进程级共享服务容器（配置只加载一次）
+    services = services or ServiceContainer(shard=shard)
+    application.bot_data[BOT_DATA_KEY] = services
+    if metrics_server is not None:
+        register_service_gauges(services)
+
+    # 添加命令处理器（绑定日志上下文；启用指标时记录每个处理器的耗时和异常）
+    for command, callback in COMMAND_HANDLERS:
+        application.add_handler(CommandHandler(
+            command, instrument_handler(command, with_log_context(command, callback))
+        ))
+
+    # 添加消息处理器（预筛选器在调度前完成关键词检测，普通聊天不会进入处理器）
+    report_filter = ReportMessageFilter(services.report_service)
+    application.bot_data[REPORT_FILTER_KEY] = report_filter
     application.add_handler(MessageHandler(
-        filters.TEXT & ~filters.COMMAND,
-        handle_message
+        filters.TEXT & ~filters.COMMAND & report_filter,
+        instrument_handler("report_message", with_log_context("report_message", handle_message))
     ))
 
     # 设置定时任务
     setup_scheduled_jobs(application)
 
+    # 事件循环延迟监控（间隔为 0 时关闭）
+    lag_interval = float(os.environ.get("LOOP_LAG_INTERVAL", "0.5"))
+    loop_monitor = None
+    if lag_interval > 0:
+        loop_monitor = LoopLagMonitor(
+            lag_interval, float(os.environ.get("LOOP_LAG_WARN", "0.1"))
+        )
+        application.bot_data[LOOP_MONITOR_KEY] = loop_monitor
+
     # 设置菜单命令
     async def post_init(application) -> None:
         """应用初始化后的回调"""
-        await setup_menu_commands(application)
+        # 分片部署时菜单命令由前端统一设置
+        if shard is None:
+            await setup_menu_commands(application)
+        if loop_monitor is not None:
+            loop_monitor.start()
+
+    async def post_shutdown(application) -> None:
+        """应用关闭后的回调：等待存储写操作完成并刷新尚未写回的配置"""
+        if loop_monitor is not None:
+            await loop_monitor.stop()
+            logger.info(f"事件循环延迟统计: {loop_monitor.get_stats()}")
+        if metrics_server is not None:
+            metrics_server.shutdown()
+        services.close()
 
     application.post_init = post_init
+    application.post_shutdown = post_shutdown
+
+    return application
+
+
+def get_webhook_settings() -> dict:
+    """从环境变量读取 Webhook 配置
+
+    Returns:
+        run_webhook 参数字典
+    """
+    url_path = os.environ.get("WEBHOOK_PATH", "telegram").strip("/")
+    public_url = os.environ.get("WEBHOOK_URL", "").rstrip("/")
+    secret_token = os.environ.get("WEBHOOK_SECRET")
+
+    if not public_url or not secret_token:
+        logger.error("Webhook 模式需要设置 WEBHOOK_URL 和 WEBHOOK_SECRET 环境变量")
+        print("错误: Webhook 模式需要设置 WEBHOOK_URL 和 WEBHOOK_SECRET 环境变量")
+        sys.exit(1)
+
+    return {
+        "listen": os.environ.get("WEBHOOK_LISTEN", "0.0.0.0"),
+        "port": int(os.environ.get("WEBHOOK_PORT", "8443")),
+        "url_path": url_path,
+        "webhook_url": f"{public_url}/{url_path}",
+        "secret_token": secret_token,
+    }
+
+
+def run_shard_worker(index: int, count: int, token: str, queue, base_url: str = None):
+    """分片工作进程入口
+
+    Args:
+        index: 分片序号
+        count: 分片总数
+        token: Bot Token
+        queue: 本分片的更新队列，收到 None 时退出
+        base_url: Bot API 地址
+    """
+    # spawn 启动的子进程不继承父进程的日志配置
+    configure_logging()
+    # 退出由前端通过队列通知，避免 Ctrl+C / SIGTERM 直接打断未完成的写入
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    asyncio.run(_serve_shard(ShardSpec(index, count), token, queue, base_url))
+
+
+async def _serve_shard(shard: ShardSpec, token: str, queue, base_url: str = None):
+    """运行分片工作进程的 Application，直到队列关闭"""
+    application = build_application(token, base_url=base_url, shard=shard)
+    services = application.bot_data[BOT_DATA_KEY]
+    owned = [gid for gid in services.config.get_groups() if shard.owns(gid)]
+    logger.info(f"{shard} 启动 (pid {os.getpid()})，负责 {len(owned)} 个群组")
+
+    await application.initialize()
+    await application.post_init(application)
+    await application.start()
+    try:
+        processed = await feed_updates(application, queue)
+    finally:
+        await application.stop()
+        await application.shutdown()
+        await application.post_shutdown(application)
+    logger.info(f"{shard} 已停止，共处理 {processed} 条更新")
+
+
+def run_sharded(token: str, count: int, mode: str, base_url: str = None):
+    """分片模式：前端接收更新，按群组转发到 count 个工作进程
+
+    Args:
+        token: Bot Token
+        count: 工作进程数
+        mode: 前端接收更新的方式 (polling / webhook)
+        base_url: Bot API 地址
+    """
+    ctx = multiprocessing.get_context("spawn")
+    queues = [ctx.Queue() for _ in range(count)]
+    workers = [
+        ctx.Process(target=run_shard_worker, args=(i, count, token, queues[i], base_url),
+                    name=f"workpilot-shard-{i}")
+        for i in range(count)
+    ]
+    for worker in workers:
+        worker.start()
+
+    # 前端只读配置，用于记录群组的分片分布
+    from src.models.config import Config
+    router = build_router_application(
+        token, queues, Config().get_groups().keys(), base_url=base_url
+    )
+
+    async def post_init(application) -> None:
+        """前端初始化后的回调"""
+        await setup_menu_commands(application)
+
+    router.post_init = post_init
+
+    try:
+        if mode == "webhook":
+            router.run_webhook(allowed_updates=ALLOWED_UPDATES, **get_webhook_settings())
+        else:
+            router.run_polling(allowed_updates=ALLOWED_UPDATES)
+    finally:
+        # 通知工作进程处理完已转发的更新后退出
+        for queue in queues:
+            queue.put(None)
+        for worker in workers:
+            worker.join()
+
+
+def main():
+    """主函数"""
+    configure_logging()
+    parser = argparse.ArgumentParser(description="WorkPilot 周报收集 Bot")
+    parser.add_argument(
+        "--mode", choices=["polling", "webhook"],
+        default=os.environ.get("BOT_MODE", "polling"),
+        help="接收更新的方式 (默认: polling)"
+    )
+    parser.add_argument(
+        "--shards", type=int, default=int(os.environ.get("BOT_SHARDS", "1")),
+        help="工作进程数，大于 1 时按群组分片处理 (默认: 1)"
+    )
+    args = parser.parse_args()
+
+    # 从环境变量获取 Bot Token
+    token = os.environ.get("TELEGRAM_BOT_TOKEN")
+
+    if not token:
+        logger.error("请设置 TELEGRAM_BOT_TOKEN 环境变量")
+        print("错误: 请设置 TELEGRAM_BOT_TOKEN 环境变量")
+        print("export TELEGRAM_BOT_TOKEN='your_bot_token_here'")
+        sys.exit(1)
+
+    # 周报存储仍使用旧版周标识时拒绝启动（各分片工作进程同样会检查）
+    try:
+        create_report_store().close()
+    except LegacyWeekKeysError as e:
+        logger.error(str(e))
+        print(f"错误: {e}")
+        sys.exit(1)
+
+    if args.shards > 1:
+        logger.info(f"Bot 启动中 ({args.mode} 模式，{args.shards} 个分片)...")
+        print("Bot 启动成功！按 Ctrl+C 停止")
+        run_sharded(token, args.shards, args.mode)
+        return
+
+    application = build_application(token)
 
     # 启动 Bot
-    logger.info("Bot 启动中...")
+    logger.info(f"Bot 启动中 ({args.mode} 模式)...")
     print("Bot 启动成功！按 Ctrl+C 停止")
-    application.run_polling(allowed_updates=Update.ALL_TYPES)
+    if args.mode == "webhook":
+        # Telegram 推送更新到本地 HTTP 服务，请求头中的 secret token 不匹配时拒绝
+        application.run_webhook(
+            allowed_updates=ALLOWED_UPDATES,
+            **get_webhook_settings()
+        )
+    else:
+        application.run_polling(allowed_updates=ALLOWED_UPDATES)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+周报数据迁移工具
+
+用法:
+    python migrate_reports.py sqlite [--reports-dir data/reports] [--db data/reports.db]
+    python migrate_reports.py weeks [--reports-dir data/reports] [--db data/reports.db] [--dry-run]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.models.report_store import ISO_WEEKS_MARKER
+from src.models.sqlite_store import SQLiteReportStore, import_json_tree
+from src.models.week_migration import rekey_json_tree, rekey_sqlite
+from src.utils.logger import configure_logging
+
+
+def migrate_to_sqlite(args):
+    """将 JSON 周报目录导入 SQLite 数据库"""
+    reports_dir = Path(args.reports_dir)
+    if not reports_dir.is_dir():
+        print(f"✗ 周报目录不存在: {reports_dir}")
+        sys.exit(1)
+    if not (reports_dir / ISO_WEEKS_MARKER).exists():
+        print("✗ 周报目录仍使用旧版周标识，请先运行: python migrate_reports.py weeks")
+        sys.exit(1)
+
+    store = SQLiteReportStore(Path(args.db))
+    try:
+        stats = import_json_tree(reports_dir, store)
+    finally:
+        store.close()
+
+    print(f"✓ 已导入 {stats['groups']} 个群组、{stats['weeks']} 周、"
+          f"{stats['reports']} 份周报到 {args.db}")
+    print("  设置环境变量 REPORT_STORAGE=sqlite 后重启 Bot 即可使用 SQLite 存储")
+
+
+def migrate_weeks(args):
+    """将旧版 %Y-W%W 周标识改为 ISO-8601 周标识（Bot 在迁移完成前拒绝启动）"""
+    reports_dir = Path(args.reports_dir)
+    if reports_dir.is_dir():
+        stats = rekey_json_tree(reports_dir, dry_run=args.dry_run)
+        if stats.get("skipped"):
+            print(f"✓ {reports_dir} 已使用 ISO 周标识，跳过")
+        else:
+            print(f"✓ {reports_dir}: {stats['groups']} 个群组、{stats['renamed']} 个周文件改名，"
+                  f"其中 {stats['merged']} 个与已有周合并")
+
+    db_file = Path(args.db)
+    if db_file.exists():
+        store = SQLiteReportStore(db_file, allow_legacy_weeks=True)
+        try:
+            stats = rekey_sqlite(store, dry_run=args.dry_run)
+        finally:
+            store.close()
+        if stats.get("skipped"):
+            print(f"✓ {db_file} 已使用 ISO 周标识，跳过")
+        else:
+            print(f"✓ {db_file}: {stats['weeks']} 个周标识、{stats['rows']} 份周报已迁移")
+
+    if args.dry_run:
+        print("  (--dry-run: 未修改任何数据)")
+
+
+def main():
+    configure_logging()
+    parser = argparse.ArgumentParser(description="WorkPilot 周报数据迁移工具")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    sqlite_parser = subparsers.add_parser("sqlite", help="将 JSON 周报导入 SQLite")
+    sqlite_parser.add_argument("--reports-dir", default="data/reports",
+                               help="JSON 周报目录 (默认: data/reports)")
+    sqlite_parser.add_argument("--db", default="data/reports.db",
+                               help="SQLite 数据库文件 (默认: data/reports.db)")
+    sqlite_parser.set_defaults(func=migrate_to_sqlite)
+
+    weeks_parser = subparsers.add_parser("weeks", help="将周标识迁移为 ISO-8601 周")
+    weeks_parser.add_argument("--reports-dir", default="data/reports",
+                              help="JSON/日志周报目录 (默认: data/reports)")
+    weeks_parser.add_argument("--db", default="data/reports.db",
+                              help="SQLite 数据库文件，存在时一并迁移 (默认: data/reports.db)")
+    weeks_parser.add_argument("--dry-run", action="store_true", help="只统计不修改")
+    weeks_parser.set_defaults(func=migrate_weeks)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
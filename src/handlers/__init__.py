@@ -1,6 +1,7 @@
 """Command and message handlers"""
 from .commands import *
 from .messages import *
+from .filters import ReportMessageFilter
 from .menu_setup import setup_menu_commands, get_menu_commands_description
 
-__all__ = ['setup_menu_commands', 'get_menu_commands_description']
+__all__ = ['setup_menu_commands', 'get_menu_commands_description', 'ReportMessageFilter']
@@ -2,65 +2,132 @@
 
 import logging
 from pathlib import Path
+from typing import Dict
 
 from telegram import Update
 from telegram.ext import ContextTypes
 from telegram.constants import ParseMode
+from telegram.helpers import escape_markdown
 
-from src.services.bot_service import BotService
-from src.services.report_service import ReportService
-from src.services.reminder_service import ReminderService
+from src.models.config import MemberDiff
+from src.services.container import get_services
+from src.services.schedule_service import parse_timezone
 from src.utils.logger import setup_logger
-from src.utils.time_utils import get_current_week
+from src.utils.text_render import chunk_blocks, send_chunks
+from src.utils.time_utils import parse_week_range
+
+
+WEEKDAY_NAMES = ["周一", "周二", "周三", "周四", "周五", "周六", "周日"]
+
+SCHEDULE_USAGE = (
+    "用法:\n"
+    "/schedule - 查看本群提醒时间\n"
+    "/schedule tz Asia/Shanghai - 设置时区\n"
+    "/schedule remind 4 17 - 设置提醒日和小时 (0=周一, 6=周日)\n"
+    "/schedule deadline 0 10 - 设置截止日和小时"
+)
+
+
+# 同步结果中每类最多列出的成员名
+MEMBER_LIST_LIMIT = 20
+
+# /exclude、/include 只作用于本群时的参数
+GROUP_SCOPE_ARGS = ("group", "本群")
 
 
 logger = setup_logger(__name__)
 
 
-# 创建服务实例
-bot_service = BotService()
-report_service = ReportService(bot_service)
-reminder_service = ReminderService(bot_service)
+async def _reply_blocks(update: Update, blocks):
+    """将文本块按 Telegram 上限分段后依次回复
+
+    Args:
+        update: Telegram 更新对象
+        blocks: 文本块列表
+    """
+    await send_chunks(
+        lambda chunk: update.message.reply_text(chunk, parse_mode=ParseMode.MARKDOWN),
+        chunk_blocks(blocks)
+    )
+
+
+async def _fetch_admins(context: ContextTypes.DEFAULT_TYPE, chat_id: int) -> Dict[int, str]:
+    """获取群管理员（不含 Bot 自己），需要 Bot 是管理员
+
+    Args:
+        context: 上下文对象
+        chat_id: 群组ID
+
+    Returns:
+        {user_id: 显示名}
+    """
+    admins = {}
+    for member in await context.bot.get_chat_administrators(chat_id):
+        if member.user.id == context.bot.id:
+            continue
+        name = member.user.full_name or member.user.username
+        if name:
+            admins[member.user.id] = name
+    return admins
+
+
+def _describe_member_diff(diff: MemberDiff, limit: int = MEMBER_LIST_LIMIT) -> str:
+    """描述一次成员同步的修改
+
+    Args:
+        diff: 成员修改
+        limit: 每类最多列出的成员数
+
+    Returns:
+        多行文本
+    """
+    def names(items) -> str:
+        items = list(items)
+        text = "、".join(items[:limit])
+        if len(items) > limit:
+            text += f" 等 {len(items)} 人"
+        return text
+
+    lines = []
+    if diff.added:
+        lines.append(f"➕ 新增: {names(diff.added.values())}")
+    if diff.renamed:
+        lines.append(f"✏️ 改名: {names(f'{old} → {new}' for old, new in diff.renamed.values())}")
+    if diff.removed:
+        lines.append(f"➖ 移除: {names(diff.removed.values())}")
+    if not lines:
+        lines.append("成员列表没有变化")
+    if diff.excluded:
+        lines.append(f"🚫 跳过排除列表中的 {diff.excluded} 人")
+    return "\n".join(lines)
 
 
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """处理 /start 命令"""
+    services = get_services(context)
     chat = update.effective_chat
     user = update.effective_user
 
     if chat.type in ['group', 'supergroup']:
         # 注册群组
-        bot_service.register_group(chat.id, chat.title)
+        await services.async_bot.register_group(chat.id, chat.title)
 
-        # 尝试获取群组成员列表
+        # 同步管理员到周报名单（需要 Bot 是管理员）
+        diff = None
         try:
-            # 获取群组成员（需要 Bot 是管理员）
-            members = await context.bot.get_chat_administrators(chat.id)
-
-            # 构建成员字典
-            members_dict = {}
-            for member in members:
-                # 跳过 Bot 自己
-                if member.user.id == context.bot.id:
-                    continue
-                # 包含所有管理员
-                if member.user.full_name or member.user.username:
-                    members_dict[member.user.id] = member.user.full_name or member.user.username
-
-            # 如果成功获取了管理员，保存到配置
-            if members_dict:
-                bot_service.sync_members_from_group(chat.id, members_dict)
-                member_count = len(members_dict)
+            admins = await _fetch_admins(context, chat.id)
+            if admins:
+                diff = await services.async_bot.sync_members(chat.id, admins)
         except Exception as e:
             logger.warning(f"无法获取群 {chat.id} 的成员列表: {e}")
-            member_count = 0
 
         # 发送欢迎消息
         help_text = f"👋 你好！我是周报收集助手\n\n"
         help_text += f"已注册群组: {chat.title}\n\n"
 
-        if member_count > 0:
-            help_text += f"✅ 已自动添加 {member_count} 位管理员到周报名单\n\n"
+        if diff is not None:
+            # 成员名中可能有 Markdown 特殊字符
+            help_text += f"✅ 已同步管理员到周报名单\n{escape_markdown(_describe_member_diff(diff))}\n\n"
         else:
             help_text += f"⚠️ 未获取到成员列表，请确保 Bot 是群管理员\n"
             help_text += f"或手动使用 /register 注册\n\n"
@@ -96,8 +163,12 @@ async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
 **管理命令:**
 • `/summary` - 查看周报汇总
 • `/remind` - 发送提醒
-• `/export` - 导出周报文件
+• `/export [周次|起始..结束] [gz]` - 导出周报文件
 • `/members` - 查看成员列表
+• `/schedule` - 查看或设置本群提醒时间和时区
+• `/exclude [group]` - 回复某人的消息，将其加入全局（或本群）排除列表
+• `/include [group]` - 回复某人的消息，将其移出全局（或本群）排除列表
+• `/excluded` - 查看排除列表
 
 **提交周报方式:**
 1. 使用 `/submit` 命令后跟周报内容
@@ -129,6 +200,7 @@ async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 async def sync_members(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """同步群组成员"""
+    services = get_services(context)
     chat = update.effective_chat
 
     if chat.type not in ['group', 'supergroup']:
@@ -136,24 +208,12 @@ async def sync_members(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
 
     try:
-        # 获取群组成员（需要 Bot 是管理员）
-        members = await context.bot.get_chat_administrators(chat.id)
-
-        # 构建成员字典
-        members_dict = {}
-        for member in members:
-            # 跳过 Bot 自己
-            if member.user.id == context.bot.id:
-                continue
-            # 包含所有管理员
-            if member.user.full_name or member.user.username:
-                members_dict[member.user.id] = member.user.full_name or member.user.username
-
-        # 保存到配置
-        bot_service.sync_members_from_group(chat.id, members_dict)
+        admins = await _fetch_admins(context, chat.id)
+        diff = await services.async_bot.sync_members(chat.id, admins)
 
         await update.message.reply_text(
-            f"✅ 已同步 {len(members_dict)} 位管理员\n\n"
+            f"✅ 已同步 {len(admins)} 位管理员\n"
+            f"{_describe_member_diff(diff)}\n\n"
             f"💡 说明:\n"
             f"由于 Telegram API 限制，Bot 只能获取管理员列表\n"
             f"普通成员请使用 /register 手动注册"
@@ -168,6 +228,7 @@ async def sync_members(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 async def register_member(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """注册成员（保留用于兼容）"""
+    services = get_services(context)
     chat = update.effective_chat
     user = update.effective_user
 
@@ -175,7 +236,11 @@ async def register_member(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("请在群组中使用此命令")
         return
 
-    bot_service.add_member(chat.id, user.id, user.full_name or user.username)
+    if await services.async_bot.run_read(services.config.is_user_excluded, user.id, chat.id):
+        await update.message.reply_text("你在排除列表中，不需要提交周报")
+        return
+
+    await services.async_bot.add_member(chat.id, user.id, user.full_name or user.username)
     await update.message.reply_text(
         f"✅ {user.full_name} 已注册！\n"
         f"每周请记得提交周报哦~"
@@ -184,6 +249,7 @@ async def register_member(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 async def unregister_member(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """取消注册"""
+    services = get_services(context)
     chat = update.effective_chat
     user = update.effective_user
 
@@ -191,12 +257,13 @@ async def unregister_member(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("请在群组中使用此命令")
         return
 
-    bot_service.remove_member(chat.id, user.id)
+    await services.async_bot.remove_member(chat.id, user.id)
     await update.message.reply_text(f"✅ {user.full_name} 已取消注册")
 
 
 async def submit_report(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """提交周报"""
+    services = get_services(context)
     chat = update.effective_chat
     user = update.effective_user
 
@@ -214,101 +281,125 @@ async def submit_report(update: Update, context: ContextTypes.DEFAULT_TYPE):
         )
         return
 
-    # 自动注册成员（如果还没注册）
-    bot_service.add_member(chat.id, user.id, user.full_name or user.username)
-
-    # 保存周报
-    bot_service.add_report(chat.id, user.id, user.full_name or user.username, content)
+    # 自动注册成员（如果还没注册）并保存周报
+    await services.async_bot.submit_report(
+        chat.id, user.id, user.full_name or user.username, content
+    )
 
     await update.message.reply_text(
         f"✅ 周报已收到！\n"
         f"提交者: {user.full_name}\n"
-        f"周次: {get_current_week()}"
+        f"周次: {services.report_manager.current_week(chat.id)}"
     )
 
 
 async def check_status(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """查看提交状态"""
+    services = get_services(context)
     chat = update.effective_chat
 
     if chat.type not in ['group', 'supergroup']:
         await update.message.reply_text("请在群组中使用此命令")
         return
 
-    status_text = report_service.get_status_text(chat.id)
-    await update.message.reply_text(status_text, parse_mode=ParseMode.MARKDOWN)
+    blocks = await services.async_bot.run_read(services.report_service.get_status_blocks, chat.id)
+    await _reply_blocks(update, blocks)
 
 
 async def show_summary(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """显示周报汇总"""
+    services = get_services(context)
     chat = update.effective_chat
 
     if chat.type not in ['group', 'supergroup']:
         await update.message.reply_text("请在群组中使用此命令")
         return
 
-    summary = report_service.get_summary_text(chat.id)
-
-    # 如果内容太长，分段发送
-    if len(summary) > 4000:
-        parts = [summary[i:i+4000] for i in range(0, len(summary), 4000)]
-        for part in parts:
-            await update.message.reply_text(part, parse_mode=ParseMode.MARKDOWN)
-    else:
-        await update.message.reply_text(summary, parse_mode=ParseMode.MARKDOWN)
+    # 按周报边界分段发送，单条不超过 Telegram 上限
+    blocks = await services.async_bot.run_read(services.report_service.get_summary_blocks, chat.id)
+    await _reply_blocks(update, blocks)
 
 
 async def send_reminder(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """发送提醒"""
+    services = get_services(context)
     chat = update.effective_chat
 
     if chat.type not in ['group', 'supergroup']:
         await update.message.reply_text("请在群组中使用此命令")
         return
 
-    pending = bot_service.get_pending_members(chat.id)
+    pending = await services.async_bot.get_pending_members(chat.id)
 
     if not pending:
         await update.message.reply_text("🎉 所有人都已提交周报！")
         return
 
-    reminder_text = reminder_service._build_reminder_text(pending)
+    reminder_text = services.reminder_service._build_reminder_text(pending)
 
-    await update.message.reply_text(reminder_text, parse_mode=ParseMode.MARKDOWN)
+    # 与定时提醒共用分发器，遵守同一套限速
+    await services.dispatcher.send(chat.id, lambda: update.message.reply_text(
+        reminder_text, parse_mode=ParseMode.MARKDOWN
+    ))
 
 
 async def export_report(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """导出周报"""
+    services = get_services(context)
     chat = update.effective_chat
 
     if chat.type not in ['group', 'supergroup']:
         await update.message.reply_text("请在群组中使用此命令")
         return
 
-    week = context.args[0] if context.args else None
-    export_file = report_service.get_export_file(chat.id, week)
+    # /export [周次 | 起始周..结束周] [gz]
+    args = list(context.args or [])
+    compress = "gz" in args
+    args = [arg for arg in args if arg != "gz"]
+
+    try:
+        weeks = parse_week_range(args[0]) if args else [services.report_manager.current_week(chat.id)]
+    except ValueError as e:
+        await update.message.reply_text(
+            f"❌ {e}\n"
+            "用法: /export [2026-W30 | 2026-W30..2026-W40] [gz]"
+        )
+        return
 
-    await update.message.reply_document(
-        document=open(export_file, 'rb'),
-        filename=export_file.name,
-        caption=f"📄 周报汇总文件 ({week or get_current_week()})"
+    export_file = await services.async_bot.export_report(
+        chat.id, weeks=weeks, compress=compress
     )
 
+    title = weeks[0] if len(weeks) == 1 else f"{weeks[0]}..{weeks[-1]}"
+    with open(export_file, 'rb') as document:
+        await update.message.reply_document(
+            document=document,
+            filename=export_file.name,
+            caption=f"📄 周报汇总文件 ({title})"
+        )
+
 
 async def list_members(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """列出成员"""
+    services = get_services(context)
     chat = update.effective_chat
 
     if chat.type not in ['group', 'supergroup']:
         await update.message.reply_text("请在群组中使用此命令")
         return
 
-    text = report_service.get_members_text(chat.id)
-    await update.message.reply_text(text, parse_mode=ParseMode.MARKDOWN)
+    blocks = await services.async_bot.run_read(services.report_service.get_members_blocks, chat.id)
+    await _reply_blocks(update, blocks)
+
+
+def _group_scope(args) -> bool:
+    """/exclude 和 /include 的参数是否指定只作用于本群"""
+    return bool(args) and args[0].lower() in GROUP_SCOPE_ARGS
 
 
 async def exclude_user(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """排除用户（不需要提交周报）"""
+    services = get_services(context)
     chat = update.effective_chat
     user = update.effective_user
 
@@ -316,26 +407,29 @@ async def exclude_user(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if not update.message.reply_to_message or not update.message.reply_to_message.from_user:
         await update.message.reply_text(
             "请回复要排除的用户消息，然后使用此命令\n"
-            "例如: 用户发送消息后，你回复该消息并发送 /exclude"
+            "例如: 用户发送消息后，你回复该消息并发送 /exclude\n"
+            "发送 /exclude group 只在本群排除"
         )
         return
 
     target_user = update.message.reply_to_message.from_user
+    group_only = _group_scope(context.args)
 
-    # 添加到排除列表
-    bot_service.config.add_excluded_user(target_user.id, target_user.full_name or target_user.username)
-
-    # 从当前群组成员中移除
-    bot_service.config.remove_member(chat.id, target_user.id)
+    # 添加到排除列表并从当前群组成员中移除
+    await services.async_bot.run_write(
+        services.bot_service.exclude_user,
+        chat.id, target_user.id, target_user.full_name or target_user.username, group_only
+    )
 
     await update.message.reply_text(
-        f"✅ {target_user.full_name} 已添加到排除列表\n"
-        f"他们不再需要提交周报了"
+        f"✅ {target_user.full_name} 已添加到{'本群' if group_only else ''}排除列表\n"
+        f"他们不再需要{'在本群' if group_only else ''}提交周报了"
     )
 
 
 async def include_user(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """从排除列表移除用户（恢复需要提交周报）"""
+    services = get_services(context)
     chat = update.effective_chat
     user = update.effective_user
 
@@ -343,32 +437,82 @@ async def include_user(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if not update.message.reply_to_message or not update.message.reply_to_message.from_user:
         await update.message.reply_text(
             "请回复要恢复的用户消息，然后使用此命令\n"
-            "例如: 用户发送消息后，你回复该消息并发送 /include"
+            "例如: 用户发送消息后，你回复该消息并发送 /include\n"
+            "发送 /include group 从本群排除列表移除"
         )
         return
 
     target_user = update.message.reply_to_message.from_user
+    group_only = _group_scope(context.args)
 
     # 从排除列表移除
-    bot_service.config.remove_excluded_user(target_user.id)
+    await services.async_bot.run_write(
+        services.bot_service.include_user, target_user.id, chat.id if group_only else None
+    )
 
     await update.message.reply_text(
-        f"✅ {target_user.full_name} 已从排除列表移除\n"
+        f"✅ {target_user.full_name} 已从{'本群' if group_only else ''}排除列表移除\n"
         f"他们现在需要提交周报了"
     )
 
 
 async def list_excluded(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """查看排除列表"""
-    excluded_users = bot_service.config.get_excluded_users()
+    services = get_services(context)
+    chat = update.effective_chat
+    group_id = chat.id if chat.type in ['group', 'supergroup'] else None
+    blocks = await services.async_bot.run_read(services.report_service.get_excluded_blocks, group_id)
+    await _reply_blocks(update, blocks)
 
-    if not excluded_users:
-        await update.message.reply_text("📋 排除列表为空，所有人都需要提交周报")
-        return
 
-    text = f"📋 **排除列表** ({len(excluded_users)}人)\n\n"
-    text += "以下用户不需要提交周报:\n"
-    for user_id, username in excluded_users.items():
-        text += f"• {username} (ID: {user_id})\n"
+def _parse_day_hour(args) -> tuple:
+    """解析 "星期 小时" 参数
+
+    Raises:
+        ValueError: 参数缺失或超出范围
+    """
+    if len(args) != 2:
+        raise ValueError("需要星期和小时两个参数")
+    day, hour = int(args[0]), int(args[1])
+    if not 0 <= day <= 6 or not 0 <= hour <= 23:
+        raise ValueError("星期应为 0-6，小时应为 0-23")
+    return day, hour
 
-    await update.message.reply_text(text, parse_mode=ParseMode.MARKDOWN)
+
+async def schedule_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """查看或修改本群的提醒时间"""
+    services = get_services(context)
+    chat = update.effective_chat
+
+    if chat.type not in ['group', 'supergroup']:
+        await update.message.reply_text("请在群组中使用此命令")
+        return
+
+    args = list(context.args or [])
+    if args:
+        try:
+            action = args[0].lower()
+            if action == "tz" and len(args) == 2:
+                parse_timezone(args[1])
+                fields = {"timezone": args[1]}
+            elif action == "remind":
+                day, hour = _parse_day_hour(args[1:])
+                fields = {"reminder_day": day, "reminder_hour": hour}
+            elif action == "deadline":
+                day, hour = _parse_day_hour(args[1:])
+                fields = {"deadline_day": day, "deadline_hour": hour}
+            else:
+                raise ValueError("未知的参数")
+        except ValueError as e:
+            await update.message.reply_text(f"❌ {e}\n{SCHEDULE_USAGE}")
+            return
+        # 调度任务在下一次检查时读取新设置，无需重启
+        await services.async_bot.run_write(services.config.set_group_schedule, chat.id, **fields)
+
+    settings = await services.async_bot.run_read(services.config.get_group_schedule, chat.id)
+    await update.message.reply_text(
+        f"⏰ 本群提醒时间 ({settings['timezone']})\n"
+        f"提醒: {WEEKDAY_NAMES[settings['reminder_day']]} {settings['reminder_hour']:02d}:00\n"
+        f"截止: {WEEKDAY_NAMES[settings['deadline_day']]} {settings['deadline_hour']:02d}:00\n\n"
+        f"{SCHEDULE_USAGE}"
+    )
@@ -0,0 +1,65 @@
+"""Custom update filters"""
+
+from telegram import Message
+from telegram.constants import ChatType
+from telegram.ext.filters import MessageFilter
+
+from src.services.report_service import ReportService
+from src.utils.metrics import REPORT_FILTER_MESSAGES
+
+
+# Application.bot_data 中保存周报消息过滤器的键
+REPORT_FILTER_KEY = "report_filter"
+
+
+class ReportMessageFilter(MessageFilter):
+    """周报消息预筛选过滤器
+
+    在处理器协程被调度之前完成群组类型、最小长度和关键词检查，
+    普通聊天消息只需一次关键词自动机扫描即被丢弃。
+    """
+
+    def __init__(self, report_service: ReportService, min_length: int = 11):
+        """初始化过滤器
+
+        Args:
+            report_service: 周报服务实例（提供关键词匹配器）
+            min_length: 周报消息的最小长度
+        """
+        super().__init__(name="ReportMessageFilter")
+        self.report_service = report_service
+        self.min_length = min_length
+        self.accepted = 0
+        self.filtered = 0
+
+    def filter(self, message: Message) -> bool:
+        """判断消息是否为周报
+
+        Args:
+            message: Telegram 消息对象
+
+        Returns:
+            是否交给周报处理器处理
+        """
+        text = message.text
+        is_report = (
+            text is not None
+            and message.chat.type in (ChatType.GROUP, ChatType.SUPERGROUP)
+            and len(text) >= self.min_length
+            and self.report_service.check_if_report_message(text)
+        )
+        if is_report:
+            self.accepted += 1
+            REPORT_FILTER_MESSAGES.inc(result="accepted")
+        else:
+            self.filtered += 1
+            REPORT_FILTER_MESSAGES.inc(result="filtered")
+        return is_report
+
+    def get_stats(self) -> dict:
+        """获取过滤统计
+
+        Returns:
+            {"accepted": int, "filtered": int}
+        """
+        return {"accepted": self.accepted, "filtered": self.filtered}
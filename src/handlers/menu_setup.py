@@ -25,6 +25,7 @@ async def setup_menu_commands(application):
             BotCommand("remind", "⏰ 发送提醒"),
             BotCommand("export", "📤 导出周报"),
             BotCommand("members", "👥 成员列表"),
+            BotCommand("schedule", "🕒 提醒时间"),
             BotCommand("exclude", "🚫 排除用户"),
             BotCommand("include", "✅ 恢复用户"),
             BotCommand("excluded", "📋 排除列表"),
@@ -54,6 +55,7 @@ def get_menu_commands_description():
         "remind": "手动提醒未提交成员",
         "export": "导出周报为 Markdown 文件",
         "members": "查看已注册成员列表",
+        "schedule": "查看或设置本群提醒时间和时区",
         "exclude": "排除用户（不需要提交周报）",
         "include": "恢复用户（需要提交周报）",
         "excluded": "查看排除列表",
@@ -1,72 +1,104 @@
 """Message handlers for Telegram bot"""
 
+import asyncio
 import logging
 
 from telegram import Update
 from telegram.ext import ContextTypes
 
-from src.services.bot_service import BotService
-from src.services.report_service import ReportService
+from src.services.container import get_services
 from src.utils.logger import setup_logger
 
 
 logger = setup_logger(__name__)
 
 
-# 创建服务实例
-bot_service = BotService()
-report_service = ReportService(bot_service)
-
-
 async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """处理普通消息，检测是否包含周报关键词
+    """处理周报消息
+
+    群组类型、长度和关键词检查已由 ReportMessageFilter 在调度前完成，
+    到达这里的消息都是周报。
 
     Args:
         update: Telegram 更新对象
         context: 上下文对象
     """
+    services = get_services(context)
     chat = update.effective_chat
     user = update.effective_user
     message = update.message
 
-    if not message or not message.text:
+    # 编辑过的消息不重复收录
+    if message is None:
         return
 
-    if chat.type not in ['group', 'supergroup']:
+    # 自动注册成员并保存周报（在存储写线程中执行，不阻塞事件循环）
+    await services.async_bot.submit_report(
+        chat.id, user.id, user.full_name or user.username, message.text
+    )
+
+    await message.reply_text(
+        f"✅ 检测到周报内容，已自动收录！\n"
+        f"提交者: {user.full_name}"
+    )
+    logger.info("自动收录周报: %s 在群 %s", user.full_name, chat.id)
+
+
+async def scheduled_reminder(context: ContextTypes.DEFAULT_TYPE):
+    """定时提醒任务：向到达各自提醒时间的群组发送提醒
+
+    Args:
+        context: 上下文对象
+    """
+    services = get_services(context)
+    schedule = services.schedule_service
+    # 配置修改（包括其他进程写入）在下一次检查时生效，无需重启
+    schedule.sync()
+    due = schedule.pop_due()
+    if not due:
         return
 
-    text = message.text
+    # 截止提醒检查它截止的那一周（通常是刚结束的上一周），而不是新的当前周
+    weeks = {group_id: week for group_id, _, week in due}
+    logger.info(f"{len(weeks)} 个群组到达提醒时间: {due[:20]}")
+    await services.reminder_service.send_reminders(context.bot, list(weeks), weeks)
 
-    # 检查是否包含周报关键词
-    is_report = report_service.check_if_report_message(text)
 
-    if is_report and len(text) > 10:  # 确保有足够的内容
-        # 自动注册成员
-        bot_service.add_member(chat.id, user.id, user.full_name or user.username)
+async def scheduled_week_check(context: ContextTypes.DEFAULT_TYPE):
+    """定时检查是否跨周，及时触发跨周事件（不依赖下一次请求）
 
-        # 保存周报
-        bot_service.add_report(
-            chat.id, user.id, user.full_name or user.username, text
-        )
+    Args:
+        context: 上下文对象
+    """
+    get_services(context).report_manager.clock.check()
 
-        await message.reply_text(
-            f"✅ 检测到周报内容，已自动收录！\n"
-            f"提交者: {user.full_name}"
-        )
-        logger.info(f"自动收录周报: {user.full_name} 在群 {chat.id}")
 
+async def scheduled_compaction(context: ContextTypes.DEFAULT_TYPE):
+    """定时折叠周报日志（仅日志存储后端）
 
-async def scheduled_reminder(context: ContextTypes.DEFAULT_TYPE):
-    """定时提醒任务
+    Args:
+        context: 上下文对象
+    """
+    services = get_services(context)
+    store = services.report_manager.store
+    # 折叠涉及磁盘读写，放到线程池中执行，避免阻塞事件循环
+    await asyncio.get_running_loop().run_in_executor(None, store.compact_all)
+
+
+async def scheduled_index_check(context: ContextTypes.DEFAULT_TYPE):
+    """定时核对未提交成员索引与完整计算结果，不一致时记录并重建
 
     Args:
         context: 上下文对象
     """
-    from ..services.reminder_service import ReminderService
-    from ..services.bot_service import BotService
+    services = get_services(context)
+    index = services.bot_service.pending_index
 
-    bot = context.bot
-    bot_service = BotService()
-    reminder_service = ReminderService(bot_service)
+    def check_all():
+        for group_id in services.config.membership.group_ids():
+            if services.shard is not None and not services.shard.owns(group_id):
+                continue
+            if not index.check(group_id)["consistent"]:
+                index.invalidate(group_id)
 
-    await reminder_service.send_reminder_to_all_groups(bot)
+    await services.async_bot.run_read(check_all)
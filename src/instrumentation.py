@@ -0,0 +1,144 @@
+"""Metrics instrumentation for handlers, Telegram API calls and service gauges"""
+
+import functools
+import logging
+import time
+from typing import Awaitable, Callable
+
+from telegram.request import HTTPXRequest
+
+from src.services.container import ServiceContainer
+from src.utils.logger import bind_log_context, setup_logger
+from src.update_processor import PerChatUpdateProcessor
+from src.utils.metrics import (
+    CONFIG_DIRTY, GROUPS, HANDLER_ERRORS, HANDLER_LATENCY, MEMBERS, REGISTRY, SUBMISSION_RATIO,
+    TELEGRAM_ERRORS, TELEGRAM_LATENCY, UPDATE_CHATS, UPDATES,
+)
+
+
+logger = setup_logger(__name__)
+
+
+# 与 ApplicationBuilder 默认的 Bot API 连接池大小一致
+CONNECTION_POOL_SIZE = 256
+
+
+def with_log_context(name: str, callback: Callable[..., Awaitable]) -> Callable[..., Awaitable]:
+    """为处理器回调绑定日志上下文（chat_id、user_id、command）
+
+    回调中的日志（包括转到存储线程执行的部分）都会带上这些字段；
+    启用 debug 级别时另记录一条带耗时 (duration) 的处理完成日志。
+
+    Args:
+        name: 处理器名称（命令名）
+        callback: 处理器协程函数
+
+    Returns:
+        包装后的回调
+    """
+    @functools.wraps(callback)
+    async def wrapper(update, context):
+        chat = update.effective_chat
+        user = update.effective_user
+        bind_log_context(
+            chat_id=chat.id if chat else None,
+            user_id=user.id if user else None,
+            command=name,
+        )
+        if not logger.isEnabledFor(logging.DEBUG):
+            return await callback(update, context)
+        start = time.perf_counter()
+        try:
+            return await callback(update, context)
+        finally:
+            duration = round(time.perf_counter() - start, 6)
+            logger.debug("处理完成: %s (%.1f ms)", name, duration * 1000,
+                         extra={"duration": duration})
+
+    return wrapper
+
+
+def instrument_handler(name: str, callback: Callable[..., Awaitable]) -> Callable[..., Awaitable]:
+    """为处理器回调记录耗时和异常数
+
+    指标未启用时原样返回回调，没有额外开销。
+
+    Args:
+        name: 处理器名称（命令名）
+        callback: 处理器协程函数
+
+    Returns:
+        包装后的回调
+    """
+    if not REGISTRY.enabled:
+        return callback
+
+    @functools.wraps(callback)
+    async def wrapper(update, context):
+        start = time.perf_counter()
+        try:
+            return await callback(update, context)
+        except Exception:
+            HANDLER_ERRORS.inc(handler=name)
+            raise
+        finally:
+            HANDLER_LATENCY.observe(time.perf_counter() - start, handler=name)
+
+    return wrapper
+
+
+class InstrumentedRequest(HTTPXRequest):
+    """记录每次 Bot API 调用耗时和失败的请求类"""
+
+    async def do_request(self, url: str, method: str, *args, **kwargs):
+        api_method = url.rsplit("/", 1)[-1]
+        start = time.perf_counter()
+        try:
+            code, payload = await super().do_request(url, method, *args, **kwargs)
+        except Exception as e:
+            TELEGRAM_ERRORS.inc(method=api_method, error=type(e).__name__)
+            raise
+        finally:
+            TELEGRAM_LATENCY.observe(time.perf_counter() - start, method=api_method)
+        if code >= 400:
+            TELEGRAM_ERRORS.inc(method=api_method, error=str(code))
+        return code, payload
+
+
+def register_service_gauges(services: ServiceContainer):
+    """注册抓取时计算的群组、成员、本周提交率和配置待写回状态指标
+
+    Args:
+        services: 服务容器
+    """
+    def collect():
+        groups = [
+            group_id for group_id in services.config.membership.group_ids()
+            if services.shard is None or services.shard.owns(group_id)
+        ]
+        expected = pending = 0
+        for group_id in groups:
+            members = services.bot_service.get_group_members(group_id)
+            expected += len(services.config.filter_excluded(members.ids, group_id))
+            pending += services.bot_service.count_pending_members(group_id)
+        GROUPS.set(len(groups))
+        MEMBERS.set(expected)
+        SUBMISSION_RATIO.set((expected - pending) / expected if expected else 0)
+        CONFIG_DIRTY.set(int(services.config.get_stats()["dirty"]))
+
+    REGISTRY.add_collector(collect)
+
+
+def register_update_gauges(processor: PerChatUpdateProcessor):
+    """注册抓取时读取的更新处理器队列深度指标
+
+    Args:
+        processor: 并发更新处理器
+    """
+    def collect():
+        stats = processor.get_stats()
+        for state in ("running", "waiting", "backlog"):
+            UPDATES.set(stats[state], state=state)
+        UPDATE_CHATS.set(stats["active_chats"])
+
+    REGISTRY.add_collector(collect)
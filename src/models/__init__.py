@@ -1,5 +1,14 @@
 """Data models for WorkPilot"""
-from .config import Config
+from .config import Config, MemberDiff
+from .membership import GroupMembers, MemberTable, Membership
 from .report import WeeklyReport
+from .report_cache import WeekCache
+from .report_store import (
+    ReportStore, JsonReportStore, LegacyWeekKeysError, StaleWriteError, create_report_store
+)
+from .journal_store import JournalReportStore
+from .sqlite_store import SQLiteReportStore
 
-__all__ = ['Config', 'WeeklyReport']
+__all__ = ['Config', 'MemberDiff', 'GroupMembers', 'MemberTable', 'Membership', 'WeeklyReport',
+           'ReportStore', 'JsonReportStore', 'JournalReportStore', 'SQLiteReportStore', 'WeekCache', 'StaleWriteError',
+           'LegacyWeekKeysError', 'create_report_store']
@@ -1,32 +1,304 @@
 """Configuration model"""
 
+import atexit
 import json
+import os
+import threading
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import (
+    Callable, Collection, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple, TypeVar
+)
+
+from src.models.membership import (
+    EXCLUDED_SECTION, GroupMembers, MemberTable, Membership, compact_groups,
+    encode_member_table, group_section
+)
+from src.utils.file_lock import FileLock
+from src.utils.file_utils import atomic_write_text
+from src.utils.logger import setup_logger
+from src.utils.metrics import CONFIG_EVENTS, STORAGE_BYTES, STORAGE_LATENCY
+
+
+logger = setup_logger(__name__)
+
+T = TypeVar("T")
+
+# 配置文件中记录写入版本号的键（加载时剥离，不出现在 data 中）
+VERSION_KEY = "_version"
+
+# 提醒时间设置项：全局默认值保存在配置顶层，群组可在 groups.<id>.schedule 中覆盖
+SCHEDULE_KEYS = ("timezone", "reminder_day", "reminder_hour", "deadline_day", "deadline_hour")
+
+# 提醒设置格式版本：1 起星期按 0=周一 计算。旧版配置文件中持久化的默认值
+# "reminder_day": 5 从未被读取（实际在周五提醒），加载时迁移为 4
+SCHEDULE_VERSION = 1
+LEGACY_REMINDER_DAY = 5
+
+# 顶层设置（提醒时间默认值、关键词等，groups 和 excluded_users 以外的键）的分区名
+SETTINGS_SECTION = "settings"
+
+
+class MemberDiff(NamedTuple):
+    """一次成员同步对群组成员表的修改"""
+
+    added: Dict[str, str]                # {user_id: 用户名}
+    renamed: Dict[str, Tuple[str, str]]  # {user_id: (原用户名, 新用户名)}
+    removed: Dict[str, str]              # {user_id: 用户名}
+    excluded: int                        # 因在排除列表中而跳过的成员数
+
+    @property
+    def changed(self) -> bool:
+        """成员表是否有修改"""
+        return bool(self.added or self.renamed or self.removed)
+
+
+def diff_members(current: Dict[str, str], incoming: Dict[str, str],
+                 excluded: Collection[str], prune: bool = False) -> MemberDiff:
+    """计算把 incoming 同步到现有成员表需要的修改
+
+    Args:
+        current: 现有成员 {user_id: 用户名}
+        incoming: 同步来源的成员 {user_id: 用户名}
+        excluded: 排除的用户ID（全局和本群排除列表），其中的成员不会加入
+        prune: 是否移除不在 incoming 中（或已在排除列表中）的现有成员
+
+    Returns:
+        成员修改
+    """
+    added = {}
+    renamed = {}
+    skipped = 0
+    for user_id, username in incoming.items():
+        if user_id in excluded:
+            skipped += 1
+            continue
+        old = current.get(user_id)
+        if old is None:
+            added[user_id] = username
+        elif old != username:
+            renamed[user_id] = (old, username)
+    removed = {}
+    if prune:
+        removed = {
+            user_id: username for user_id, username in current.items()
+            if user_id not in incoming or user_id in excluded
+        }
+    return MemberDiff(added, renamed, removed, skipped)
+
+
+def _changed_sections(old: dict, new: dict) -> List[str]:
+    """比较两份配置，返回内容不同的分区"""
+    old_groups = old.get("groups", {})
+    new_groups = new.get("groups", {})
+    changed = [
+        group_section(group_id) for group_id in old_groups.keys() | new_groups.keys()
+        if old_groups.get(group_id) != new_groups.get(group_id)
+    ]
+    if old.get("excluded_users") != new.get("excluded_users"):
+        changed.append(EXCLUDED_SECTION)
+    sectioned = ("groups", "excluded_users")
+    if ({k: v for k, v in old.items() if k not in sectioned}
+            != {k: v for k, v in new.items() if k not in sectioned}):
+        changed.append(SETTINGS_SECTION)
+    return changed
+
+
+def _file_token(stat: os.stat_result) -> Tuple[int, int, int]:
+    """根据文件状态生成变更标记（原子替换会改变 inode）"""
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
 
 
 class Config:
-    """配置管理类"""
+    """配置管理类
 
-    def __init__(self, config_file: Path = None):
+    支持两种持久化模式:
+    - 同步模式 (flush_interval=0): 每次修改立即写回文件
+    - 写回模式 (flush_interval>0): 修改只标记为脏，由后台线程在合并窗口结束后
+      原子写回，关闭时保证最后一次刷新
+
+    多个进程可以共享同一个配置文件：所有修改都以操作函数的形式通过 update()
+    执行并记录，写回时持有跨进程文件锁；如果文件在此期间被其他进程改写
+    （版本号/文件标记变化），先加载最新内容并重放本进程尚未写回的操作，
+    再写入新版本，而不是用过期的内存副本覆盖。
+    """
+
+    def __init__(self, config_file: Path = None, flush_interval: float = None,
+                 refresh_interval: float = None):
         """初始化配置
 
         Args:
             config_file: 配置文件路径
+            flush_interval: 写回合并窗口（秒），默认读取环境变量
+                CONFIG_FLUSH_INTERVAL，为 0 时每次修改立即保存
+            refresh_interval: 后台线程检查其他进程写入的间隔（秒），默认读取
+                环境变量 CONFIG_REFRESH_INTERVAL，为 0 时不自动检查
         """
-        self.config_file = config_file or Path("data/config.json")
+        self.config_file = Path(config_file or "data/config.json")
+        self._lock_file = self.config_file.with_name(self.config_file.name + ".lock")
+        if flush_interval is None:
+            flush_interval = float(os.environ.get("CONFIG_FLUSH_INTERVAL", "0"))
+        if refresh_interval is None:
+            refresh_interval = float(os.environ.get("CONFIG_REFRESH_INTERVAL", "2"))
+        self.flush_interval = flush_interval
+        self.refresh_interval = refresh_interval
+
+        self._version = 0
+        self._disk_token = None
+        # 所有群组成员表共用的用户名表，同名只保存一个字符串对象
+        self._names: Dict[str, str] = {}
+        # 尚未写回文件的修改操作，冲突时在最新配置上重放
+        self._pending_ops: List[Callable[[dict], object]] = []
         self.data = self._load_config()
 
+        self._lock = threading.RLock()
+        self._write_lock = threading.Lock()
+        self._dirty = False
+        self._mutations = 0
+        self._flushes = 0
+        self._replays = 0
+        self._reloads = 0
+        # 内存配置的修改计数（本进程修改或加载其他进程写入时递增），供调度等缓存判断是否需要重建
+        self._revision = 0
+        # 按分区的修改计数：只依赖某个群组的缓存（如成员表视图）不必因其他群组的修改而重建；
+        # 未声明修改范围的操作递增 _epoch，使所有分区失效
+        self._sections: Dict[str, int] = {}
+        self._epoch = 0
+        self._closed = False
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._flusher = None
+        self._refresher = None
+        # 成员表快照和排除列表的整数ID集合，读取方使用
+        self.membership = Membership(self)
+
+        if self.flush_interval > 0:
+            self._flusher = threading.Thread(
+                target=self._flush_loop, name="config-flusher", daemon=True
+            )
+            self._flusher.start()
+            atexit.register(self.close)
+        if self.refresh_interval > 0:
+            # 文件检查和解析放在后台线程中，读取方法（可能在事件循环中调用）只读内存
+            self._refresher = threading.Thread(
+                target=self._refresh_loop, name="config-refresher", daemon=True
+            )
+            self._refresher.start()
+
+        self._migrate_schedule()
+
+    def _migrate_schedule(self):
+        """一次性迁移旧版配置的提醒日，并写入 schedule_version 标记"""
+        migrated = []
+
+        def op(data: dict) -> bool:
+            if data.get("schedule_version", 0) >= SCHEDULE_VERSION:
+                return False
+            if data.get("reminder_day") == LEGACY_REMINDER_DAY:
+                data["reminder_day"] = 4
+                migrated.append(True)
+            data["schedule_version"] = SCHEDULE_VERSION
+            return True
+
+        self.update(op, (SETTINGS_SECTION,))
+        if migrated:
+            logger.warning(
+                "配置文件中的 reminder_day=5 是旧版默认值（实际在周五提醒），"
+                "已迁移为 4 (0=周一)；如需周六提醒请用 /schedule 或修改配置"
+            )
+
     def _load_config(self) -> dict:
         """加载配置文件
 
         Returns:
             配置字典
         """
-        if self.config_file.exists():
-            with open(self.config_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        return self._get_default_config()
+        data, self._version, self._disk_token = self._read_disk()
+        if data is None:
+            return self._get_default_config()
+        return data
+
+    def _read_disk(self) -> Tuple[Optional[dict], int, Optional[tuple]]:
+        """读取磁盘上的配置文件
+
+        群组成员表在加载时转换为 MemberTable，字符串键只存在于文件中。
+
+        Returns:
+            (配置字典, 版本号, 文件标记)，文件不存在时为 (None, 0, None)
+        """
+        try:
+            with STORAGE_LATENCY.time(component="config", op="read"):
+                with open(self.config_file, 'r', encoding='utf-8') as f:
+                    token = _file_token(os.fstat(f.fileno()))
+                    data = json.load(f)
+        except FileNotFoundError:
+            return None, 0, None
+        STORAGE_BYTES.inc(token[2], component="config", op="read")
+        version = data.pop(VERSION_KEY, 0)
+        compact_groups(data.get("groups", {}), self._names)
+        return data, version, token
+
+    def _disk_changed(self) -> bool:
+        """配置文件是否在上次读写之后被其他进程改写"""
+        try:
+            token = _file_token(os.stat(self.config_file))
+        except FileNotFoundError:
+            token = None
+        return token != self._disk_token
+
+    def _merge_from_disk(self) -> bool:
+        """文件被改写时加载最新内容并重放未写回的操作（调用方须持有 _write_lock）
+
+        Returns:
+            是否重新加载了文件
+        """
+        if not self._disk_changed():
+            return False
+        data, version, token = self._read_disk()
+        with self._lock:
+            if data is None:
+                # 文件被删除：以内存中的配置为准重新写出
+                self._disk_token = None
+                return False
+            for op in self._pending_ops:
+                op(data)
+            if self._pending_ops:
+                self._replays += 1
+                CONFIG_EVENTS.inc(event="replay")
+            self._touch(_changed_sections(self.data, data))
+            self.data = data
+            self._version = version
+            self._disk_token = token
+            self._reloads += 1
+            self._revision += 1
+        CONFIG_EVENTS.inc(event="reload")
+        return True
+
+    def refresh(self, blocking: bool = True) -> bool:
+        """立即检查并加载其他进程写入的配置
+
+        Args:
+            blocking: 正在写回时是否等待；为 False 时直接跳过本次检查
+
+        Returns:
+            是否重新加载了文件
+        """
+        if not self._write_lock.acquire(blocking=blocking):
+            return False
+        try:
+            return self._merge_from_disk()
+        finally:
+            self._write_lock.release()
+
+    def _refresh_loop(self):
+        """后台检查线程：每隔 refresh_interval 加载其他进程写入的配置
+
+        正在写回时跳过本次检查：写回本身会先合并磁盘上的最新内容。
+        """
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                self.refresh(blocking=False)
+            except Exception as e:
+                logger.error(f"重新加载配置文件失败: {e}")
 
     def _get_default_config(self) -> dict:
         """获取默认配置
@@ -35,21 +307,194 @@ class Config:
             默认配置字典
         """
         return {
-            "groups": {},  # group_id: {"name": str, "members": {user_id: username}}
+            "groups": {},  # group_id: {"name": str, "members": {user_id: username}}（内存中为 MemberTable）
             "admin_users": [],  # 管理员用户ID列表
             "excluded_users": {},  # 全局排除用户 {user_id: username} - 不需要提交周报的人
-            "reminder_day": 5,  # 周五提醒 (0=周一, 6=周日)
+            "timezone": "Asia/Shanghai",  # 提醒时间所在时区（群组可单独设置）
+            "reminder_day": 4,  # 周五提醒 (0=周一, 6=周日)
             "reminder_hour": 17,  # 下午5点提醒
             "deadline_day": 0,  # 周一截止
             "deadline_hour": 10,  # 上午10点截止
-            "report_keywords": ["周报", "#周报", "本周工作", "weekly report"]
+            "report_keywords": ["周报", "#周报", "本周工作", "weekly report"],
+            "report_keywords_ignore_case": False,  # 关键词匹配是否忽略大小写
+            "schedule_version": SCHEDULE_VERSION  # 提醒设置格式版本（星期 0=周一）
         }
 
     def save(self):
-        """保存配置到文件"""
-        self.config_file.parent.mkdir(exist_ok=True)
-        with open(self.config_file, 'w', encoding='utf-8') as f:
-            json.dump(self.data, f, ensure_ascii=False, indent=2)
+        """保存配置到文件
+
+        写回模式下只标记为脏，由后台线程合并写入；同步模式下立即写入。
+        """
+        with self._lock:
+            self._mutations += 1
+            self._dirty = True
+        CONFIG_EVENTS.inc(event="mutation")
+        if self._flusher is None:
+            self.flush()
+        else:
+            self._wakeup.set()
+
+    def update(self, op: Callable[[dict], T], touches: Iterable[str] = None) -> T:
+        """在锁内执行一次修改操作并保存
+
+        操作只能读写传入的配置字典，并且可以重复执行：与其他进程的写入
+        冲突时，它会在磁盘上的最新配置上重放。
+
+        Args:
+            op: 修改函数 op(data)，返回真值表示确有修改
+            touches: 操作修改的分区（group_section(...)、EXCLUDED_SECTION），
+                为 None 时视为可能修改任何分区
+
+        Returns:
+            op 的返回值；为假值时视为没有修改，不记录也不保存
+        """
+        with self._lock:
+            result = op(self.data)
+            if result:
+                self._pending_ops.append(op)
+                self._revision += 1
+                self._touch(touches)
+        if result:
+            self.save()
+        return result
+
+    def flush(self) -> bool:
+        """立即将未保存的修改原子写回文件
+
+        持有跨进程文件锁完成“检查版本 → 合并 → 写入”，期间其他进程的
+        写入被阻塞，不会丢失任何一方的修改。
+
+        Returns:
+            是否实际写入了文件
+        """
+        with self._write_lock:
+            with self._lock:
+                if not self._dirty:
+                    return False
+            with FileLock(self._lock_file):
+                self._merge_from_disk()
+                with self._lock:
+                    version = self._version + 1
+                    payload = json.dumps(
+                        {**self.data, VERSION_KEY: version}, ensure_ascii=False, indent=2,
+                        default=encode_member_table
+                    )
+                    self._compact_names()
+                    written_ops = len(self._pending_ops)
+                    self._dirty = False
+                try:
+                    with STORAGE_LATENCY.time(component="config", op="write"):
+                        atomic_write_text(self.config_file, payload)
+                    token = _file_token(os.stat(self.config_file))
+                    STORAGE_BYTES.inc(token[2], component="config", op="write")
+                except Exception:
+                    with self._lock:
+                        self._dirty = True
+                    raise
+            with self._lock:
+                self._version = version
+                self._disk_token = token
+                del self._pending_ops[:written_ops]
+                self._flushes += 1
+            CONFIG_EVENTS.inc(event="flush")
+        return True
+
+    def _flush_loop(self):
+        """后台刷新线程：等待修改，合并窗口结束后写回"""
+        while not self._stop.is_set():
+            self._wakeup.wait()
+            # 合并窗口内的后续修改只触发一次写入
+            self._stop.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"写回配置文件失败: {e}")
+
+    def close(self):
+        """停止后台刷新线程并执行最后一次刷新"""
+        if self._closed:
+            return
+        self._closed = True
+        self._stop.set()
+        if self._flusher is not None:
+            self._wakeup.set()
+            self._flusher.join()
+        if self._refresher is not None:
+            self._refresher.join()
+        self.flush()
+
+    def _compact_names(self):
+        """用户名表中不再被引用的名字（改名、移除成员后）过多时回收（调用方须持有 _lock）
+
+        原地修改：成员表持有的是同一个字典。
+        """
+        tables = [group.get("members") for group in self.data.get("groups", {}).values()]
+        tables = [table for table in tables if isinstance(table, MemberTable)]
+        if len(self._names) <= 2 * sum(len(table) for table in tables) + 64:
+            return
+        used = {}
+        for table in tables:
+            for username in table.names:
+                used[username] = username
+        self._names.clear()
+        self._names.update(used)
+
+    def username_count(self) -> int:
+        """共享用户名表中的用户名数"""
+        return len(self._names)
+
+    def get_stats(self) -> dict:
+        """获取持久化统计
+
+        Returns:
+            统计字典，coalesced 为被合并掉（节省）的写入次数，reloads 为
+            加载其他进程写入的次数，replays 为在新内容上重放未写回修改的次数
+        """
+        with self._lock:
+            return {
+                "mutations": self._mutations,
+                "flushes": self._flushes,
+                "coalesced": max(self._mutations - self._flushes, 0),
+                "dirty": self._dirty,
+                "version": self._version,
+                "reloads": self._reloads,
+                "replays": self._replays,
+            }
+
+    @property
+    def revision(self) -> int:
+        """内存配置的修改计数，值不变说明配置未变化"""
+        return self._revision
+
+    def _touch(self, sections: Optional[Iterable[str]]):
+        """递增分区修改计数（调用方须持有 _lock），sections 为 None 时所有分区失效"""
+        if sections is None:
+            self._epoch += 1
+            return
+        for section in sections:
+            self._sections[section] = self._sections.get(section, 0) + 1
+
+    def section_revision(self, *sections: str) -> tuple:
+        """获取分区的修改计数，值不变说明这些分区未变化
+
+        Args:
+            sections: 分区名
+
+        Returns:
+            修改计数元组
+        """
+        with self._lock:
+            return self._section_revision(sections)
+
+    def _section_revision(self, sections: Iterable[str]) -> tuple:
+        """分区修改计数（调用方须持有 _lock）"""
+        return (self._epoch,) + tuple(self._sections.get(section, 0) for section in sections)
+
+    @property
+    def reload_count(self) -> int:
+        """加载其他进程写入的次数，值变化说明内存配置被外部修改"""
+        return self._reloads
 
     def get_groups(self) -> Dict:
         """获取所有群组配置
@@ -59,6 +504,15 @@ class Config:
         """
         return self.data.get("groups", {})
 
+    def group_ids(self) -> List[int]:
+        """在锁内复制所有群组ID（写线程可能同时增删群组，调用方可以安全遍历）
+
+        Returns:
+            群组ID列表
+        """
+        with self._lock:
+            return [int(group_id) for group_id in self.data.get("groups", {})]
+
     def get_group(self, group_id: int) -> Optional[dict]:
         """获取指定群组配置
 
@@ -70,6 +524,23 @@ class Config:
         """
         return self.data.get("groups", {}).get(str(group_id))
 
+    def member_snapshot(self, group_id: int) -> GroupMembers:
+        """在锁内获取群组成员表的只读快照（与成员表共享数组，不复制）
+
+        Args:
+            group_id: 群组ID
+
+        Returns:
+            成员表快照，群组不存在时为空表
+        """
+        with self._lock:
+            group = self.data.get("groups", {}).get(str(group_id)) or {}
+            revision = self._section_revision((group_section(group_id),))
+            members = group.get("members")
+            if not isinstance(members, MemberTable):
+                members = MemberTable((members or {}).items(), self._names)
+            return members.snapshot(revision)
+
     def register_group(self, group_id: int, group_name: str):
         """注册新群组
 
@@ -77,25 +548,40 @@ class Config:
             group_id: 群组ID
             group_name: 群组名称
         """
-        if str(group_id) not in self.data["groups"]:
-            self.data["groups"][str(group_id)] = {
-                "name": group_name,
-                "members": {}
+        group_id_str = str(group_id)
+
+        def op(data: dict) -> bool:
+            if group_id_str in data["groups"]:
+                return False
+            data["groups"][group_id_str] = {
+                "name": group_name, "members": MemberTable(interned=self._names)
             }
-            self.save()
+            return True
 
-    def add_member(self, group_id: int, user_id: int, username: str):
+        self.update(op, (group_section(group_id),))
+
+    def add_member(self, group_id: int, user_id: int, username: str) -> bool:
         """添加成员到群组
 
         Args:
             group_id: 群组ID
             user_id: 用户ID
             username: 用户名
+
+        Returns:
+            成员表是否有变化（群组不存在或成员已存在且用户名相同时为 False）
         """
         group_id_str = str(group_id)
-        if group_id_str in self.data["groups"]:
-            self.data["groups"][group_id_str]["members"][str(user_id)] = username
-            self.save()
+        user_id_str = str(user_id)
+
+        def op(data: dict) -> bool:
+            group = data["groups"].get(group_id_str)
+            if group is None or group["members"].get(user_id_str) == username:
+                return False
+            group["members"][user_id_str] = username
+            return True
+
+        return self.update(op, (group_section(group_id),))
 
     def remove_member(self, group_id: int, user_id: int):
         """从群组移除成员
@@ -106,11 +592,116 @@ class Config:
         """
         group_id_str = str(group_id)
         user_id_str = str(user_id)
-        if group_id_str in self.data["groups"]:
-            members = self.data["groups"][group_id_str]["members"]
-            if user_id_str in members:
-                del members[user_id_str]
-                self.save()
+
+        def op(data: dict) -> bool:
+            group = data["groups"].get(group_id_str)
+            if group is None or user_id_str not in group["members"]:
+                return False
+            del group["members"][user_id_str]
+            return True
+
+        self.update(op, (group_section(group_id),))
+
+    def sync_members(self, group_id: int, members: Dict[int, str],
+                     prune: bool = False) -> MemberDiff:
+        """批量同步群组成员，在一次修改中应用与现有成员表的差异
+
+        全局或本群排除列表中的成员不会加入；没有差异时不写文件。群组不存在时以
+        "Unknown Group" 为名创建。
+
+        Args:
+            group_id: 群组ID
+            members: 同步来源的成员 {user_id: 用户名}
+            prune: 是否移除不在 members 中的现有成员（来源是完整成员列表时使用）
+
+        Returns:
+            实际应用的成员修改
+        """
+        group_id_str = str(group_id)
+        incoming = {str(user_id): username for user_id, username in members.items()}
+        applied = []
+
+        def op(data: dict) -> bool:
+            group = data["groups"].get(group_id_str)
+            created = group is None
+            if created:
+                group = data["groups"][group_id_str] = {
+                    "name": "Unknown Group", "members": MemberTable(interned=self._names)
+                }
+            current = group.get("members")
+            if current is None:
+                current = group["members"] = MemberTable(interned=self._names)
+            excluded = data.get("excluded_users", {}).keys() | group.get("excluded_users", {}).keys()
+            diff = diff_members(current, incoming, excluded, prune)
+            for user_id in diff.removed:
+                del current[user_id]
+            current.update(diff.added)
+            for user_id, (_, username) in diff.renamed.items():
+                current[user_id] = username
+            # 冲突重放时会基于最新配置重新计算，以第一次执行的结果为准
+            if not applied:
+                applied.append(diff)
+            return created or diff.changed
+
+        self.update(op, (group_section(group_id),))
+        return applied[0]
+
+    def get_group_schedule(self, group_id: int) -> dict:
+        """获取群组的提醒时间设置（未单独设置的项使用全局默认值）
+
+        Args:
+            group_id: 群组ID
+
+        Returns:
+            {"timezone", "reminder_day", "reminder_hour", "deadline_day", "deadline_hour"}
+        """
+        group = self.data.get("groups", {}).get(str(group_id)) or {}
+        overrides = group.get("schedule", {})
+        defaults = self._get_default_config()
+        return {
+            key: overrides.get(key, self.data.get(key, defaults[key]))
+            for key in SCHEDULE_KEYS
+        }
+
+    def get_group_timezone(self, group_id: int) -> str:
+        """获取群组所在时区（周次和提醒时间都按该时区计算）
+
+        Args:
+            group_id: 群组ID
+
+        Returns:
+            IANA 时区名
+        """
+        group = self.data.get("groups", {}).get(str(group_id)) or {}
+        timezone = group.get("schedule", {}).get("timezone")
+        return timezone or self.data.get("timezone", "Asia/Shanghai")
+
+    def set_group_schedule(self, group_id: int, **fields):
+        """修改群组的提醒时间设置
+
+        Args:
+            group_id: 群组ID
+            **fields: 要修改的项，键见 SCHEDULE_KEYS
+
+        Raises:
+            KeyError: 包含未知的设置项
+        """
+        unknown = set(fields) - set(SCHEDULE_KEYS)
+        if unknown:
+            raise KeyError(f"未知的提醒设置: {', '.join(sorted(unknown))}")
+        group_id_str = str(group_id)
+
+        def op(data: dict) -> bool:
+            group = data["groups"].get(group_id_str)
+            if group is None:
+                return False
+            schedule = group.setdefault("schedule", {})
+            if all(schedule.get(key) == value for key, value in fields.items()):
+                return False
+            schedule.update(fields)
+            return True
+
+        self.update(op, (group_section(group_id),))
 
     def get_report_keywords(self) -> List[str]:
         """获取周报关键词列表
@@ -120,44 +711,123 @@ class Config:
         """
         return self.data.get("report_keywords", ["周报", "#周报"])
 
-    def add_excluded_user(self, user_id: int, username: str):
-        """添加到全局排除列表
+    def get_report_keywords_ignore_case(self) -> bool:
+        """获取关键词匹配是否忽略大小写
+
+        Returns:
+            是否忽略大小写
+        """
+        return self.data.get("report_keywords_ignore_case", False)
+
+    def add_excluded_user(self, user_id: int, username: str, group_id: int = None):
+        """添加到排除列表
 
         Args:
             user_id: 用户ID
             username: 用户名
+            group_id: 群组ID，指定时只在该群组排除，否则加入全局排除列表
         """
-        self.data["excluded_users"][str(user_id)] = username
-        self.save()
-        logger.info(f"添加用户 {username} ({user_id}) 到排除列表")
-
-    def remove_excluded_user(self, user_id: int):
-        """从全局排除列表移除
+        user_id_str = str(user_id)
+        group_id_str = None if group_id is None else str(group_id)
+
+        def op(data: dict) -> bool:
+            if group_id_str is None:
+                excluded = data["excluded_users"]
+            else:
+                group = data["groups"].get(group_id_str)
+                if group is None:
+                    return False
+                excluded = group.setdefault("excluded_users", {})
+            if excluded.get(user_id_str) == username:
+                return False
+            excluded[user_id_str] = username
+            return True
+
+        if self.update(op, self.excluded_sections(group_id)):
+            scope = "排除列表" if group_id is None else f"群 {group_id} 的排除列表"
+            logger.info("添加用户 %s (%s) 到%s", username, user_id, scope)
+
+    def remove_excluded_user(self, user_id: int, group_id: int = None):
+        """从排除列表移除
 
         Args:
             user_id: 用户ID
+            group_id: 群组ID，指定时从该群组的排除列表移除，否则从全局排除列表移除
         """
         user_id_str = str(user_id)
-        if user_id_str in self.data["excluded_users"]:
-            del self.data["excluded_users"][user_id_str]
-            self.save()
-            logger.info(f"从排除列表移除用户 {user_id}")
+        group_id_str = None if group_id is None else str(group_id)
+
+        def op(data: dict) -> bool:
+            if group_id_str is None:
+                excluded = data["excluded_users"]
+            else:
+                excluded = data["groups"].get(group_id_str, {}).get("excluded_users", {})
+            if user_id_str not in excluded:
+                return False
+            del excluded[user_id_str]
+            return True
+
+        if self.update(op, self.excluded_sections(group_id)):
+            scope = "排除列表" if group_id is None else f"群 {group_id} 的排除列表"
+            logger.info("从%s移除用户 %s", scope, user_id)
+
+    def excluded_sections(self, group_id: int = None) -> Tuple[str, ...]:
+        """排除列表所在的分区（全局排除列表和群组配置）"""
+        if group_id is None:
+            return (EXCLUDED_SECTION,)
+        return (EXCLUDED_SECTION, group_section(group_id))
+
+    def excluded_snapshot(self, group_id: int = None) -> Tuple[tuple, List[str]]:
+        """在锁内复制排除的用户ID，供 Membership 构建整数ID集合
+
+        Args:
+            group_id: 群组ID，为 None 时只包括全局排除列表
+
+        Returns:
+            (排除列表分区的修改计数, [user_id])，包括全局和该群组排除列表中的用户
+        """
+        with self._lock:
+            user_ids = list(self.data.get("excluded_users", {}))
+            if group_id is not None:
+                group = self.data.get("groups", {}).get(str(group_id)) or {}
+                user_ids.extend(group.get("excluded_users", {}))
+            return self._section_revision(self.excluded_sections(group_id)), user_ids
 
-    def is_user_excluded(self, user_id: int) -> bool:
-        """检查用户是否在排除列表中
+    def is_user_excluded(self, user_id: int, group_id: int = None) -> bool:
+        """检查用户是否被排除
 
         Args:
             user_id: 用户ID
+            group_id: 群组ID，指定时同时检查该群组的排除列表
 
         Returns:
             是否被排除
         """
-        return str(user_id) in self.data.get("excluded_users", {})
+        return user_id in self.membership.excluded(group_id)
 
-    def get_excluded_users(self) -> Dict[str, str]:
-        """获取所有排除用户
+    def filter_excluded(self, member_ids: Iterable[int], group_id: int = None) -> Set[int]:
+        """用一次集合运算去掉被排除的成员
+
+        Args:
+            member_ids: 成员ID
+            group_id: 群组ID，指定时同时按该群组的排除列表过滤
+
+        Returns:
+            未被排除的成员ID
+        """
+        return set(member_ids).difference(self.membership.excluded(group_id))
+
+    def get_excluded_users(self, group_id: int = None) -> Dict[str, str]:
+        """获取排除用户
+
+        Args:
+            group_id: 群组ID，指定时返回该群组的排除列表，否则返回全局排除列表
 
         Returns:
-            排除用户字典 {user_id: username}
+            排除用户字典 {user_id: username} 的副本（在锁内复制，可以在其他线程中遍历）
         """
-        return self.data.get("excluded_users", {})
\ No newline at end of file
+        with self._lock:
+            if group_id is None:
+                return dict(self.data.get("excluded_users", {}))
+            group = self.data.get("groups", {}).get(str(group_id)) or {}
+            return dict(group.get("excluded_users", {}))
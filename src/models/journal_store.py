@@ -0,0 +1,363 @@
+"""Append-only journal report storage backend"""
+
+import json
+import os
+import threading
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Hashable, List, NamedTuple, Optional, Set
+
+from src.models.report_store import JsonReportStore
+from src.utils.file_utils import atomic_write_text
+from src.utils.logger import setup_logger
+
+
+logger = setup_logger(__name__)
+
+
+JOURNAL_NAME = "journal.jsonl"
+COMPACTING_SUFFIX = ".compacting"
+
+
+class _Position(NamedTuple):
+    """本进程读到的日志位置"""
+
+    inode: int
+    generation: int   # 日志头记录的折叠代数
+    offset: int       # 已读取的完整行的末尾
+    size: int         # 读取时的文件大小（末尾可能有尚未写完的行）
+
+
+class JournalReportStore(JsonReportStore):
+    """追加日志存储：每次提交追加一行到 <group>/journal.jsonl
+
+    周快照文件 (<group>/<week>.json) 的格式与 JsonReportStore 完全相同，
+    由 compact() 定期将日志折叠进快照。尚未折叠的日志条目保存在内存中，
+    读取时叠加在快照之上。
+
+    多进程共享时，追加持有群组文件锁的共享锁（O_APPEND 追加彼此不冲突），
+    折叠和整周覆盖持有排他锁，避免折叠改名日志时另一进程仍在向旧文件追加。
+    读取前检查日志文件的 inode 和大小，有变化时读取新增的行，其他进程
+    追加的条目随即可见。折叠后以新的日志文件重新开始，第一行记录递增的
+    折叠代数；读到更新的代数（或 inode 变化、文件消失）说明叠加层中的条目
+    都已折叠进快照，整个丢弃后从新日志的开头读取，不会遮住快照中更新的记录。
+    """
+
+    def __init__(self, reports_dir: Path = None, allow_legacy_weeks: bool = False):
+        """初始化日志存储，并重放所有未折叠的日志
+
+        Args:
+            reports_dir: 周报存储目录
+            allow_legacy_weeks: 允许打开尚未迁移为 ISO 周的目录（仅供迁移工具使用）
+
+        Raises:
+            LegacyWeekKeysError: 目录中有旧版周标识的数据且 allow_legacy_weeks 为 False
+        """
+        super().__init__(reports_dir, allow_legacy_weeks)
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        # {group_id(str): {week: {user_id(str): record}}}
+        self._pending: Dict[str, Dict[str, Dict[str, dict]]] = {}
+        self._positions: Dict[str, _Position] = {}
+        self._generations: Dict[str, int] = defaultdict(int)
+        self._replay_all()
+
+    def _group_lock(self, group_id) -> threading.Lock:
+        """获取群组级锁（追加与折叠互斥）
+
+        Args:
+            group_id: 群组ID
+
+        Returns:
+            群组锁
+        """
+        key = str(group_id)
+        with self._locks_guard:
+            lock = self._locks.get(key)
+            if lock is None:
+                lock = self._locks[key] = threading.Lock()
+            return lock
+
+    def _journal_file(self, group_id) -> Path:
+        """获取群组日志文件路径"""
+        return self.reports_dir / str(group_id) / JOURNAL_NAME
+
+    def _read_journal(self, path: Path):
+        """逐行读取日志文件，跳过日志头和崩溃时可能写坏的末行
+
+        Args:
+            path: 日志文件路径
+
+        Yields:
+            日志条目字典
+        """
+        if not path.exists():
+            return
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                entry = _parse_line(line, path)
+                if entry is not None and "week" in entry:
+                    yield entry
+
+    def _replay_all(self):
+        """启动时读取所有群组的日志；上次折叠中途崩溃留下的文件先完成折叠"""
+        for group_dir in self.reports_dir.iterdir():
+            if not group_dir.is_dir():
+                continue
+            journal = group_dir / JOURNAL_NAME
+            if journal.with_name(JOURNAL_NAME + COMPACTING_SUFFIX).exists():
+                self.compact(group_dir.name)
+            if not journal.exists():
+                continue
+            with self._group_lock(group_dir.name):
+                self._catch_up(group_dir.name)
+            overlay = self._pending.get(group_dir.name)
+            if overlay:
+                logger.info(f"重放群 {group_dir.name} 的周报日志: {len(overlay)} 周")
+
+    def _catch_up(self, group_id):
+        """日志文件有变化时读取新增的条目（调用方须持有群组锁）
+
+        inode 和大小都与上次读取时相同时只需一次 stat，不加文件锁。
+        """
+        key = str(group_id)
+        position = self._positions.get(key)
+        try:
+            stat = os.stat(self._journal_file(group_id))
+        except FileNotFoundError:
+            if position is not None or key in self._pending:
+                self._reset(key)
+            return
+        if position is not None and (stat.st_ino, stat.st_size) == (position.inode, position.size):
+            return
+        # 共享锁：不会读到折叠进行到一半的状态
+        with self._file_lock(group_id, shared=True):
+            self._read_tail_locked(group_id)
+
+    def _reset(self, key: str):
+        """丢弃叠加层和日志位置（其中的条目都已折叠进快照）"""
+        self._pending.pop(key, None)
+        self._positions.pop(key, None)
+        self._generations[key] += 1
+
+    def _read_tail_locked(self, group_id):
+        """读取日志中上次读取位置之后的完整行（调用方须持有群组锁和文件锁）"""
+        key = str(group_id)
+        journal = self._journal_file(group_id)
+        try:
+            f = open(journal, 'rb')
+        except FileNotFoundError:
+            self._reset(key)
+            return
+        with f:
+            inode = os.fstat(f.fileno()).st_ino
+            generation = _journal_generation(f)
+            position = self._positions.get(key)
+            if (position is None or position.inode != inode
+                    or position.generation != generation):
+                # 新的日志文件：之前读到的条目已被折叠（可能是其他进程），从头读取
+                if position is not None or key in self._pending:
+                    self._reset(key)
+                offset = 0
+            else:
+                offset = position.offset
+            f.seek(offset)
+            data = f.read()
+
+        # 只处理完整的行，末尾尚未写完的行留到下次读取
+        end = data.rfind(b"\n") + 1
+        count = 0
+        weeks = self._pending.setdefault(key, {})
+        for line in data[:end].decode('utf-8').splitlines():
+            entry = _parse_line(line, journal)
+            if entry is None or "week" not in entry:
+                continue
+            weeks.setdefault(entry["week"], {})[str(entry["user_id"])] = _to_record(entry)
+            count += 1
+        if not weeks:
+            del self._pending[key]
+        self._positions[key] = _Position(inode, generation, offset + end, offset + len(data))
+        if count:
+            self._generations[key] += 1
+
+    def load_week(self, group_id: int, week: str) -> dict:
+        # 持有群组锁读取快照和日志叠加层，不会与折叠交错（读到折叠前的快照和折叠后的空叠加层）
+        with self._group_lock(group_id):
+            self._catch_up(group_id)
+            data = super().load_week(group_id, week)
+            overlay = self._pending.get(str(group_id), {}).get(week)
+            if overlay:
+                data["reports"].update(overlay)
+        return data
+
+    def save_week(self, group_id: int, week: str, data: dict):
+        # 整周覆盖前先折叠日志，避免重启重放时旧日志覆盖新快照
+        with self._group_lock(group_id), self._file_lock(group_id):
+            self._compact_locked(group_id)
+            self._save_week_locked(group_id, week, data)
+
+    def upsert_report(self, group_id: int, week: str, user_id: int, record: dict):
+        entry = {"week": week, "user_id": int(user_id), **record}
+        line = (json.dumps(entry, ensure_ascii=False) + "\n").encode('utf-8')
+        journal = self._journal_file(group_id)
+
+        with self._group_lock(group_id):
+            if not journal.exists():
+                # 日志头须是第一行：创建时持有排他锁，其他进程不会抢先追加
+                with self._file_lock(group_id):
+                    if not journal.exists():
+                        _start_journal(journal, 1)
+            with self._file_lock(group_id, shared=True):
+                fd = os.open(journal, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                try:
+                    os.write(fd, line)
+                finally:
+                    os.close(fd)
+                # 连同其他进程在此之前追加的条目一起按文件顺序读入
+                self._read_tail_locked(group_id)
+
+    def version_token(self, group_id: int, week: str) -> Optional[Hashable]:
+        # 快照文件标记 + 该群内存日志的变化代数（包括读入其他进程追加的条目）
+        with self._group_lock(group_id):
+            self._catch_up(group_id)
+            generation = self._generations[str(group_id)]
+        return (super().version_token(group_id, week), generation)
+
+    def list_weeks(self, group_id: int) -> List[str]:
+        with self._group_lock(group_id):
+            self._catch_up(group_id)
+            pending = list(self._pending.get(str(group_id), {}).keys())
+        return sorted(set(super().list_weeks(group_id)).union(pending))
+
+    def submitted_user_ids(self, group_id: int, week: str) -> Set[str]:
+        with self._group_lock(group_id):
+            self._catch_up(group_id)
+            submitted = set(super().load_week(group_id, week)["reports"].keys())
+            submitted.update(self._pending.get(str(group_id), {}).get(week, {}).keys())
+        return submitted
+
+    def compact(self, group_id) -> int:
+        """将群组日志折叠进周快照文件
+
+        Args:
+            group_id: 群组ID
+
+        Returns:
+            折叠的日志条目数
+        """
+        with self._group_lock(group_id), self._file_lock(group_id):
+            return self._compact_locked(group_id)
+
+    def _compact_locked(self, group_id) -> int:
+        """折叠日志（调用方须持有群组锁和排他文件锁）
+
+        先将日志改名为 .compacting，折叠成功后删除；中途崩溃时
+        下次启动会再次折叠该文件，折叠操作是幂等的。上次折叠留下的
+        .compacting 先折叠，随后当前日志同样折叠，两者都完成后以递增的折叠代数
+        开始新的日志，并丢弃内存中的条目。
+        """
+        journal = self._journal_file(group_id)
+        compacting = journal.with_name(JOURNAL_NAME + COMPACTING_SUFFIX)
+        count = 0
+        generation = None
+        if compacting.exists():
+            generation = _file_generation(compacting)
+            count += self._fold(group_id, compacting)
+        if journal.exists():
+            os.replace(journal, compacting)
+            generation = max(generation or 0, _file_generation(compacting))
+            count += self._fold(group_id, compacting)
+
+        if generation is not None:
+            # 其他进程读到新的代数后丢弃各自的叠加层
+            _start_journal(journal, generation + 1)
+        # 日志文件都已折叠（或本进程追加的条目已被其他进程折叠进快照）
+        self._reset(str(group_id))
+        if count:
+            logger.info(f"已折叠群 {group_id} 的 {count} 条周报日志")
+        return count
+
+    def _fold(self, group_id, path: Path) -> int:
+        """将一个日志文件的条目写入周快照后删除该文件
+
+        Args:
+            group_id: 群组ID
+            path: 日志文件路径
+
+        Returns:
+            折叠的日志条目数
+        """
+        by_week = defaultdict(dict)
+        count = 0
+        for entry in self._read_journal(path):
+            by_week[entry["week"]][str(entry["user_id"])] = _to_record(entry)
+            count += 1
+
+        for week, reports in by_week.items():
+            data = self._read_week(group_id, week)
+            data["reports"].update(reports)
+            self._write_week(group_id, week, data, data.get("version", 0) + 1)
+
+        os.unlink(path)
+        return count
+
+    def compact_all(self) -> int:
+        """折叠所有群组的日志
+
+        Returns:
+            折叠的日志条目总数
+        """
+        total = 0
+        for group_id in list(self._pending.keys()):
+            try:
+                total += self.compact(group_id)
+            except Exception as e:
+                logger.error(f"折叠群 {group_id} 的周报日志失败: {e}")
+        return total
+
+    def close(self):
+        self.compact_all()
+
+
+def _parse_line(line, path: Path) -> Optional[dict]:
+    """解析一行日志，空行和损坏的行返回 None"""
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        return json.loads(line)
+    except json.JSONDecodeError:
+        logger.warning(f"跳过损坏的日志行: {path}")
+        return None
+
+
+def _journal_generation(f) -> int:
+    """读取已打开日志文件的折叠代数（第一行的日志头），旧版日志没有日志头时为 0"""
+    f.seek(0)
+    try:
+        header = json.loads(f.readline())
+    except ValueError:
+        return 0
+    if not isinstance(header, dict) or "week" in header:
+        return 0
+    return int(header.get("generation", 0))
+
+
+def _file_generation(path: Path) -> int:
+    """读取日志文件的折叠代数"""
+    with open(path, 'rb') as f:
+        return _journal_generation(f)
+
+
+def _start_journal(journal: Path, generation: int):
+    """以日志头开始新的日志文件（调用方须持有排他文件锁）"""
+    atomic_write_text(journal, json.dumps({"generation": generation}) + "\n")
+
+
+def _to_record(entry: dict) -> dict:
+    """将日志条目转换为周报记录"""
+    return {
+        "username": entry["username"],
+        "content": entry["content"],
+        "submitted_at": entry["submitted_at"]
+    }
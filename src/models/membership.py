@@ -0,0 +1,339 @@
+"""Compact integer-keyed group membership"""
+
+import threading
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping, MutableMapping
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+
+# Config 按分区记录修改计数的分区名：群组 groups/<id> 和全局排除列表
+EXCLUDED_SECTION = "excluded_users"
+
+
+def group_section(group_id) -> str:
+    """群组配置 (groups.<id>) 的分区名"""
+    return f"groups/{group_id}"
+
+
+def _sorted_index(ids: array) -> Tuple[array, array]:
+    """按用户ID排序的查找索引: (升序用户ID, 对应的插入位置)"""
+    order = sorted(range(len(ids)), key=ids.__getitem__)
+    return array("q", [ids[i] for i in order]), array("i", order)
+
+
+class GroupMembers:
+    """单个群组成员表的只读快照
+
+    成员ID按加入顺序保存在 array('q') 中（每人 8 字节，不创建 int 对象），
+    用户名按相同顺序保存为共享用户名表中的字符串引用；另有按ID排序的
+    索引用于二分查找。快照与 MemberTable 共享数组，MemberTable 修改前
+    先复制，快照本身不会变化，可以在其他线程中遍历。
+    """
+
+    __slots__ = ("revision", "ids", "names", "_sorted", "_positions")
+
+    def __init__(self, revision: tuple, ids: array, names: List[str],
+                 sorted_ids: array = None, positions: array = None):
+        """初始化成员表快照
+
+        Args:
+            revision: 快照时群组分区的修改计数 (Config.section_revision)
+            ids: 按加入顺序排列的成员ID
+            names: 与 ids 一一对应的用户名
+            sorted_ids: 升序排列的成员ID，默认由 ids 计算
+            positions: sorted_ids 中每个ID在 ids 中的位置
+        """
+        if sorted_ids is None:
+            sorted_ids, positions = _sorted_index(ids)
+        self.revision = revision
+        self.ids = ids
+        self.names = names
+        self._sorted = sorted_ids
+        self._positions = positions
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.ids)
+
+    def __contains__(self, user_id: int) -> bool:
+        ids = self._sorted
+        index = bisect_left(ids, user_id)
+        return index < len(ids) and ids[index] == user_id
+
+    def username(self, user_id: int) -> Optional[str]:
+        """获取成员用户名
+
+        Args:
+            user_id: 用户ID
+
+        Returns:
+            用户名，不是成员时返回 None
+        """
+        ids = self._sorted
+        index = bisect_left(ids, user_id)
+        if index < len(ids) and ids[index] == user_id:
+            return self.names[self._positions[index]]
+        return None
+
+    def items(self) -> Iterator[Tuple[int, str]]:
+        """按加入顺序遍历 (user_id, username)"""
+        return zip(self.ids, self.names)
+
+
+class MemberTable(MutableMapping):
+    """Config.data 中群组的成员表 (groups.<id>.members)
+
+    内存中只保存整数ID数组和共享用户名表中的引用；对外提供与配置文件中
+    {"用户ID": "用户名"} 相同的字符串键映射接口，配置修改操作和冲突重放
+    不需要区分两种格式，序列化时由 to_dict() 转换回字符串键。
+
+    修改须在 Config 的锁内进行。snapshot() 返回的快照与本表共享数组，
+    之后的第一次修改先复制数组（写时复制）。
+    """
+
+    __slots__ = ("_ids", "_names", "_sorted", "_positions", "_shared", "_interned")
+
+    def __init__(self, items: Iterable[Tuple[str, str]] = (),
+                 interned: Dict[str, str] = None):
+        """初始化成员表
+
+        Args:
+            items: (用户ID, 用户名) 序列，用户ID不重复（如配置文件中的成员字典）
+            interned: 共享用户名表，相同的用户名只保存一个字符串对象
+        """
+        self._interned = {} if interned is None else interned
+        self._ids = array("q")
+        self._names: List[str] = []
+        for user_id, username in items:
+            self._ids.append(int(user_id))
+            self._names.append(self._interned.setdefault(username, username))
+        self._sorted: Optional[array] = None
+        self._positions: Optional[array] = None
+        self._shared = False
+
+    def _index(self) -> array:
+        """获取按ID排序的查找索引，删除成员后首次查找时重建"""
+        if self._sorted is None:
+            self._sorted, self._positions = _sorted_index(self._ids)
+        return self._sorted
+
+    def _find(self, user_id: int) -> int:
+        """查找成员在 _ids 中的位置，不存在时返回 -1"""
+        ids = self._index()
+        index = bisect_left(ids, user_id)
+        if index < len(ids) and ids[index] == user_id:
+            return self._positions[index]
+        return -1
+
+    def _own(self):
+        """与快照共享数组时先复制，之后可以原地修改"""
+        if not self._shared:
+            return
+        self._ids = array("q", self._ids)
+        self._names = list(self._names)
+        if self._sorted is not None:
+            self._sorted = array("q", self._sorted)
+            self._positions = array("i", self._positions)
+        self._shared = False
+
+    def __getitem__(self, key) -> str:
+        try:
+            index = self._find(int(key))
+        except (TypeError, ValueError):
+            index = -1
+        if index < 0:
+            raise KeyError(key)
+        return self._names[index]
+
+    def __setitem__(self, key, username: str):
+        user_id = int(key)
+        username = self._interned.setdefault(username, username)
+        index = self._find(user_id)
+        self._own()
+        if index >= 0:
+            self._names[index] = username
+            return
+        self._ids.append(user_id)
+        self._names.append(username)
+        position = bisect_left(self._sorted, user_id)
+        self._sorted.insert(position, user_id)
+        self._positions.insert(position, len(self._ids) - 1)
+
+    def __delitem__(self, key):
+        try:
+            index = self._find(int(key))
+        except (TypeError, ValueError):
+            index = -1
+        if index < 0:
+            raise KeyError(key)
+        self._own()
+        del self._ids[index]
+        del self._names[index]
+        # 之后的成员位置都变了，下一次查找时重建索引
+        self._sorted = self._positions = None
+
+    def __contains__(self, key) -> bool:
+        try:
+            return self._find(int(key)) >= 0
+        except (TypeError, ValueError):
+            return False
+
+    def __iter__(self) -> Iterator[str]:
+        return map(str, self._ids)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, MemberTable):
+            return self._ids == other._ids and self._names == other._names
+        return Mapping.__eq__(self, other)
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"MemberTable({len(self)} members)"
+
+    def get(self, key, default=None):
+        try:
+            index = self._find(int(key))
+        except (TypeError, ValueError):
+            return default
+        return self._names[index] if index >= 0 else default
+
+    def items(self) -> Iterator[Tuple[str, str]]:
+        """按加入顺序遍历 (用户ID字符串, 用户名)"""
+        return zip(map(str, self._ids), self._names)
+
+    @property
+    def names(self) -> List[str]:
+        """按加入顺序排列的用户名（只读）"""
+        return self._names
+
+    def to_dict(self) -> Dict[str, str]:
+        """转换为配置文件中的字符串键字典"""
+        return dict(self.items())
+
+    def snapshot(self, revision: tuple) -> GroupMembers:
+        """获取与本表共享数组的只读快照
+
+        Args:
+            revision: 群组分区的修改计数
+
+        Returns:
+            成员表快照
+        """
+        self._index()
+        self._shared = True
+        return GroupMembers(revision, self._ids, self._names, self._sorted, self._positions)
+
+
+def compact_groups(groups: dict, interned: Dict[str, str]) -> dict:
+    """将配置文件中群组的成员字典原地转换为 MemberTable
+
+    Args:
+        groups: 配置中的 groups 字典
+        interned: 共享用户名表
+
+    Returns:
+        groups
+    """
+    for group in groups.values():
+        members = group.get("members")
+        if isinstance(members, dict):
+            group["members"] = MemberTable(members.items(), interned)
+    return groups
+
+
+def encode_member_table(obj):
+    """json.dumps 的 default 参数：将 MemberTable 序列化为字符串键字典"""
+    if isinstance(obj, MemberTable):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class Membership:
+    """配置中群组成员的只读快照和排除列表
+
+    Config.data 中的成员表本身就是紧凑的 MemberTable；这里按群组缓存它的
+    快照 (GroupMembers)，快照与成员表共享数组，不额外占用内存。读取方在
+    其他线程中遍历快照时不受写线程修改的影响，也不需要再做 str/int 转换。
+
+    排除列表保存为整数ID集合：全局排除列表与各群组排除列表的并集按群组
+    缓存，成员判断为 O(1)，整个成员表可以用一次集合运算过滤。
+
+    缓存项在对应分区的修改计数 (Config.section_revision) 变化后的下一次
+    访问时更新，其他群组的修改不会触发更新。
+    """
+
+    def __init__(self, config):
+        """初始化
+
+        Args:
+            config: 配置管理实例 (Config)
+        """
+        self.config = config
+        self._groups: Dict[int, GroupMembers] = {}
+        self._excluded: Dict[Optional[int], Tuple[tuple, FrozenSet[int]]] = {}
+        self._lock = threading.Lock()
+        self.rebuilds = 0
+
+    def group(self, group_id: int) -> GroupMembers:
+        """获取群组成员表快照
+
+        Args:
+            group_id: 群组ID
+
+        Returns:
+            成员表快照（群组不存在时为空表）
+        """
+        entry = self._groups.get(group_id)
+        if (entry is not None
+                and entry.revision == self.config.section_revision(group_section(group_id))):
+            return entry
+
+        entry = self.config.member_snapshot(group_id)
+        with self._lock:
+            self._groups[group_id] = entry
+            self.rebuilds += 1
+        return entry
+
+    def excluded(self, group_id: int = None) -> FrozenSet[int]:
+        """获取排除的用户ID
+
+        Args:
+            group_id: 群组ID，为 None 时只包括全局排除列表
+
+        Returns:
+            全局排除列表与群组排除列表中的用户ID
+        """
+        cached = self._excluded.get(group_id)
+        if (cached is not None and cached[0]
+                == self.config.section_revision(*self.config.excluded_sections(group_id))):
+            return cached[1]
+
+        revision, user_ids = self.config.excluded_snapshot(group_id)
+        excluded = frozenset(int(user_id) for user_id in user_ids)
+        self._excluded[group_id] = (revision, excluded)
+        return excluded
+
+    def group_ids(self) -> List[int]:
+        """获取所有群组ID"""
+        return self.config.group_ids()
+
+    def get_stats(self) -> dict:
+        """获取统计
+
+        Returns:
+            {"groups", "members", "usernames", "rebuilds"}，groups/members 为已缓存快照的
+            群组数和成员数，usernames 为共享用户名表的大小
+        """
+        with self._lock:
+            return {
+                "groups": len(self._groups),
+                "members": sum(len(entry) for entry in self._groups.values()),
+                "usernames": self.config.username_count(),
+                "rebuilds": self.rebuilds,
+            }
@@ -1,24 +1,71 @@
 """Weekly report model"""
 
-import json
+import gzip
+import os
+import tempfile
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Callable, Dict, Iterator, List, Optional, TextIO
 
-from src.utils.time_utils import get_current_week
+from src.models.report_cache import WeekCache, estimate_size
+from src.models.report_store import ReportStore, StaleWriteError, create_report_store
+from src.utils.metrics import STORAGE_BYTES, STORAGE_LATENCY
+from src.utils.text_render import render_summary
+from src.utils.time_utils import WEEK_CLOCK, WeekClock
+
+
+# 导出文件写缓冲大小
+EXPORT_BUFFER_SIZE = 64 * 1024
+
+# 整周读改写遇到并发更新时的最大重试次数
+UPDATE_RETRIES = 5
 
 
 class WeeklyReport:
     """周报数据管理类"""
 
-    def __init__(self, reports_dir: Path = None):
+    def __init__(self, reports_dir: Path = None, store: ReportStore = None,
+                 cache: WeekCache = None,
+                 timezone_for: Callable[[int], Optional[str]] = None,
+                 clock: WeekClock = None):
         """初始化周报管理
 
         Args:
-            reports_dir: 周报存储目录
+            reports_dir: 周报存储目录（导出文件也保存在此目录下）
+            store: 周报存储后端，默认按环境变量 REPORT_STORAGE 创建
+            cache: 周数据缓存，默认按环境变量 REPORT_CACHE_ENTRIES /
+                REPORT_CACHE_BYTES 创建
+            timezone_for: 返回群组时区名的函数，用于计算群组的当前周；
+                默认按服务器本地时间
+            clock: 周时钟，默认为进程共享的 WEEK_CLOCK
         """
         self.reports_dir = reports_dir or Path("data/reports")
         self.reports_dir.mkdir(parents=True, exist_ok=True)
+        self.store = store or create_report_store(reports_dir=self.reports_dir)
+        self.cache = cache or WeekCache(
+            max_entries=int(os.environ.get("REPORT_CACHE_ENTRIES", "256")),
+            max_bytes=int(os.environ.get("REPORT_CACHE_BYTES", str(32 * 1024 * 1024)))
+        )
+        self.timezone_for = timezone_for
+        self.clock = clock or WEEK_CLOCK
+        # 跨周后旧周的数据很少再被读取，提前腾出缓存空间
+        self.clock.subscribe(self._on_rollover)
+
+    def _on_rollover(self, old_week: str, new_week: str, tz: Optional[str]):
+        """跨周事件回调：丢弃旧周的缓存"""
+        self.cache.drop_week(old_week)
+
+    def current_week(self, group_id: int) -> str:
+        """获取群组所在时区的当前周
+
+        Args:
+            group_id: 群组ID
+
+        Returns:
+            周标识
+        """
+        tz = self.timezone_for(group_id) if self.timezone_for is not None else None
+        return self.clock.current(tz)
 
     def _get_group_dir(self, group_id: int) -> Path:
         """获取群组周报目录
@@ -33,47 +80,78 @@ class WeeklyReport:
         group_dir.mkdir(exist_ok=True)
         return group_dir
 
-    def _get_report_file(self, group_id: int, week: str = None) -> Path:
-        """获取周报文件路径
+    def load_reports(self, group_id: int, week: str = None) -> dict:
+        """加载某群的周报数据
 
         Args:
             group_id: 群组ID
             week: 周标识，默认为当前周
 
         Returns:
-            周报文件路径
+            周报数据字典（可能是缓存中的共享对象，调用方不应修改）
         """
         if week is None:
-            week = get_current_week()
-        return self._get_group_dir(group_id) / f"{week}.json"
+            week = self.current_week(group_id)
+
+        token = self.store.version_token(group_id, week)
+        data = self.cache.get(group_id, week, token)
+        if data is None:
+            with STORAGE_LATENCY.time(component="reports", op="read"):
+                data = self.store.load_week(group_id, week)
+            if STORAGE_BYTES.enabled:
+                STORAGE_BYTES.inc(estimate_size(data), component="reports", op="read")
+            self.cache.put(group_id, week, token, data)
+        return data
 
-    def load_reports(self, group_id: int, week: str = None) -> dict:
-        """加载某群的周报数据
+    def save_reports(self, group_id: int, data: dict, week: str = None):
+        """保存周报数据
 
         Args:
             group_id: 群组ID
+            data: 周报数据（带 "version" 时进行乐观并发检查）
             week: 周标识，默认为当前周
 
-        Returns:
-            周报数据字典
+        Raises:
+            StaleWriteError: data 基于的版本已被其他写者更新
         """
-        file_path = self._get_report_file(group_id, week)
-        if file_path.exists():
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        return {"week": week or get_current_week(), "reports": {}}
-
-    def save_reports(self, group_id: int, data: dict, week: str = None):
-        """保存周报数据
+        if week is None:
+            week = self.current_week(group_id)
+        with STORAGE_LATENCY.time(component="reports", op="write"):
+            self.store.save_week(group_id, week, data)
+        # 写入之后再失效：写入期间读到的旧数据带着旧版本标记，不会再命中
+        self.cache.invalidate(group_id, week)
+        if STORAGE_BYTES.enabled:
+            STORAGE_BYTES.inc(estimate_size(data), component="reports", op="write")
+
+    def update_reports(self, group_id: int, updater: Callable[[dict], None],
+                       week: str = None, retries: int = UPDATE_RETRIES) -> dict:
+        """对某周数据执行读改写，其他写者抢先更新时基于最新数据重试
 
         Args:
             group_id: 群组ID
-            data: 周报数据
+            updater: 原地修改周报数据的函数
             week: 周标识，默认为当前周
+            retries: 最大重试次数
+
+        Returns:
+            写入的周报数据
+
+        Raises:
+            StaleWriteError: 重试次数用尽
         """
-        file_path = self._get_report_file(group_id, week)
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        if week is None:
+            week = self.current_week(group_id)
+
+        for attempt in range(retries + 1):
+            # 绕过缓存直接读取存储，保证拿到的版本号是最新的
+            data = self.store.load_week(group_id, week)
+            updater(data)
+            try:
+                self.save_reports(group_id, data, week)
+                return data
+            except StaleWriteError:
+                if attempt == retries:
+                    raise
 
     def add_report(self, group_id: int, user_id: int, username: str,
                    content: str, week: str = None) -> bool:
@@ -90,17 +168,29 @@ class WeeklyReport:
             是否添加成功
         """
         if week is None:
-            week = get_current_week()
-        data = self.load_reports(group_id, week)
+            week = self.current_week(group_id)
+
+        with STORAGE_LATENCY.time(component="reports", op="upsert"):
+            self.store.upsert_report(group_id, week, user_id, {
+                "username": username,
+                "content": content,
+                "submitted_at": datetime.now().isoformat()
+            })
+        self.cache.invalidate(group_id, week)
+        if STORAGE_BYTES.enabled:
+            STORAGE_BYTES.inc(len(content.encode("utf-8")), component="reports", op="upsert")
+        return True
 
-        data["reports"][str(user_id)] = {
-            "username": username,
-            "content": content,
-            "submitted_at": datetime.now().isoformat()
-        }
+    def list_weeks(self, group_id: int) -> List[str]:
+        """列出某群有周报数据的所有周
 
-        self.save_reports(group_id, data, week)
-        return True
+        Args:
+            group_id: 群组ID
+
+        Returns:
+            周标识列表
+        """
+        return self.store.list_weeks(group_id)
 
     def get_pending_members(self, group_id: int,
                            members: Dict[str, str]) -> List[dict]:
@@ -113,8 +203,7 @@ class WeeklyReport:
         Returns:
             未提交成员列表
         """
-        data = self.load_reports(group_id)
-        submitted_ids = set(data["reports"].keys())
+        submitted_ids = self.load_reports(group_id)["reports"].keys()
 
         pending = []
         for user_id, username in members.items():
@@ -123,6 +212,26 @@ class WeeklyReport:
 
         return pending
 
+    def generate_summary_blocks(self, group_id: int, group_name: str,
+                                week: str = None,
+                                pending_members: List[dict] = None) -> List[str]:
+        """生成周报汇总文本块（每份周报一个块，便于按周报边界分段发送）
+
+        Args:
+            group_id: 群组ID
+            group_name: 群组名称
+            week: 周标识，默认为当前周
+            pending_members: 未提交成员列表
+
+        Returns:
+            文本块列表
+        """
+        if week is None:
+            week = self.current_week(group_id)
+
+        data = self.load_reports(group_id, week)
+        return render_summary(group_name, week, data["reports"], pending_members)
+
     def generate_summary(self, group_id: int, group_name: str,
                         week: str = None, pending_members: List[dict] = None) -> str:
         """生成周报汇总文本
@@ -136,63 +245,107 @@ class WeeklyReport:
         Returns:
             周报汇总文本
         """
-        if week is None:
-            week = get_current_week()
+        return "".join(self.generate_summary_blocks(
+            group_id, group_name, week, pending_members
+        ))
 
-        data = self.load_reports(group_id, week)
+    def close(self):
+        """关闭存储后端"""
+        self.clock.unsubscribe(self._on_rollover)
+        self.store.close()
 
-        summary = f"📊 **{group_name} - {week} 周报汇总**\n"
-        summary += f"{'=' * 40}\n\n"
+    def iter_markdown(self, group_id: int, group_name: str,
+                      weeks: List[str]) -> Iterator[str]:
+        """逐段生成 Markdown 周报汇总
 
-        if not data["reports"]:
-            summary += "暂无周报提交\n"
-        else:
-            for user_id, report in data["reports"].items():
-                summary += f"👤 **{report['username']}**\n"
-                summary += f"提交时间: {report['submitted_at']}\n"
-                summary += f"内容:\n{report['content']}\n"
-                summary += f"{'-' * 30}\n\n"
+        每次只持有一条周报，峰值内存与周报总数无关。
 
-        if pending_members:
-            summary += f"\n⚠️ **未提交周报的成员 ({len(pending_members)}人)**:\n"
-            for member in pending_members:
-                summary += f"- {member['username']}\n"
+        Args:
+            group_id: 群组ID
+            group_name: 群组名称
+            weeks: 周标识列表（升序）
+
+        Yields:
+            Markdown 文本片段
+        """
+        multi_week = len(weeks) > 1
+        title = f"{weeks[0]}..{weeks[-1]}" if multi_week else weeks[0]
+        heading = "###" if multi_week else "##"
+
+        yield f"# {group_name} - {title} 周报汇总\n\n"
+        yield f"生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
+        yield "---\n\n"
+
+        for week in weeks:
+            if multi_week:
+                yield f"## {week}\n\n"
+            for user_id, report in self.store.iter_reports(group_id, week):
+                yield (
+                    f"{heading} {report['username']}\n\n"
+                    f"**提交时间**: {report['submitted_at']}\n\n"
+                    f"{report['content']}\n\n"
+                    "---\n\n"
+                )
+
+    def write_markdown(self, stream: TextIO, group_id: int, group_name: str,
+                       weeks: List[str]):
+        """将 Markdown 周报汇总写入文件句柄或内存流
 
-        return summary
+        Args:
+            stream: 文本流（文件句柄、gzip 文本流或 io.StringIO）
+            group_id: 群组ID
+            group_name: 群组名称
+            weeks: 周标识列表（升序）
+        """
+        for chunk in self.iter_markdown(group_id, group_name, weeks):
+            stream.write(chunk)
 
     def export_to_markdown(self, group_id: int, group_name: str,
-                         week: str = None) -> Path:
+                           week: str = None, weeks: List[str] = None,
+                           compress: bool = False) -> Path:
         """导出周报为 Markdown 文件
 
         Args:
             group_id: 群组ID
             group_name: 群组名称
             week: 周标识，默认为当前周
+            weeks: 周标识列表（升序），指定时导出多周归档，忽略 week
+            compress: 是否使用 gzip 压缩
 
         Returns:
             导出文件路径
         """
-        if week is None:
-            week = get_current_week()
-
-        data = self.load_reports(group_id, week)
-
-        md_content = f"# {group_name} - {week} 周报汇总\n\n"
-        md_content += f"生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
-        md_content += "---\n\n"
-
-        if data["reports"]:
-            for user_id, report in data["reports"].items():
-                md_content += f"## {report['username']}\n\n"
-                md_content += f"**提交时间**: {report['submitted_at']}\n\n"
-                md_content += f"{report['content']}\n\n"
-                md_content += "---\n\n"
+        if not weeks:
+            weeks = [week or self.current_week(group_id)]
+        elif len(weeks) > 1:
+            # 多周归档只包含有数据的周
+            existing = set(self.store.list_weeks(group_id))
+            weeks = [w for w in weeks if w in existing] or weeks[:1]
 
         export_dir = self._get_group_dir(group_id) / "exports"
         export_dir.mkdir(exist_ok=True)
-        export_file = export_dir / f"{week}_summary.md"
-
-        with open(export_file, 'w', encoding='utf-8') as f:
-            f.write(md_content)
-
+        name = weeks[0] if len(weeks) == 1 else f"{weeks[0]}..{weeks[-1]}"
+        export_file = export_dir / f"{name}_summary.md{'.gz' if compress else ''}"
+
+        # 先写临时文件再改名，避免发送到写了一半的文件
+        fd, tmp_path = tempfile.mkstemp(dir=export_dir, suffix=".tmp")
+        try:
+            if compress:
+                with os.fdopen(fd, 'wb') as raw, \
+                        gzip.open(raw, 'wt', encoding='utf-8') as stream:
+                    self.write_markdown(stream, group_id, group_name, weeks)
+            else:
+                with os.fdopen(fd, 'w', encoding='utf-8',
+                               buffering=EXPORT_BUFFER_SIZE) as stream:
+                    self.write_markdown(stream, group_id, group_name, weeks)
+            os.replace(tmp_path, export_file)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+        if STORAGE_BYTES.enabled:
+            STORAGE_BYTES.inc(export_file.stat().st_size, component="reports", op="export")
         return export_file
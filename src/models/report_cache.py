@@ -0,0 +1,156 @@
+"""In-memory LRU cache of parsed week documents"""
+
+import threading
+from collections import OrderedDict
+from typing import Hashable, Optional, Tuple
+
+
+# 单条周报记录的估算额外开销（字典、键和时间戳字符串）
+RECORD_OVERHEAD = 160
+
+
+def estimate_size(data: dict) -> int:
+    """估算周数据占用的内存字节数
+
+    Args:
+        data: 周报数据
+
+    Returns:
+        估算字节数
+    """
+    size = RECORD_OVERHEAD
+    for record in data.get("reports", {}).values():
+        size += RECORD_OVERHEAD + len(record.get("content", "")) + len(record.get("username", ""))
+    return size
+
+
+class WeekCache:
+    """按 (group, week) 缓存已解析的周数据
+
+    每个条目附带存储后端给出的版本标记（如文件 mtime/size），
+    读取时标记不一致即视为外部修改并失效。容量同时受条目数和估算字节数限制。
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 32 * 1024 * 1024):
+        """初始化缓存
+
+        Args:
+            max_entries: 最大条目数，为 0 时禁用缓存
+            max_bytes: 最大估算字节数
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[Hashable, dict, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, group_id, week: str, token: Hashable) -> Optional[dict]:
+        """读取缓存
+
+        Args:
+            group_id: 群组ID
+            week: 周标识
+            token: 当前版本标记
+
+        Returns:
+            缓存的周数据，未命中或已过期时返回 None
+        """
+        key = (str(group_id), week)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            cached_token, data, size = entry
+            if token is None or cached_token != token:
+                self._remove(key)
+                self.invalidations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def put(self, group_id, week: str, token: Hashable, data: dict):
+        """写入缓存
+
+        Args:
+            group_id: 群组ID
+            week: 周标识
+            token: 数据对应的版本标记，为 None 时不缓存
+            data: 周数据
+        """
+        if self.max_entries <= 0 or token is None:
+            return
+        size = estimate_size(data)
+        if size > self.max_bytes:
+            return
+        key = (str(group_id), week)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (token, data, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, group_id, week: str):
+        """使某周缓存失效
+
+        Args:
+            group_id: 群组ID
+            week: 周标识
+        """
+        key = (str(group_id), week)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+                self.invalidations += 1
+
+    def drop_week(self, week: str) -> int:
+        """移除所有群组某周的缓存
+
+        Args:
+            week: 周标识
+
+        Returns:
+            移除的条目数
+        """
+        with self._lock:
+            keys = [key for key in self._entries if key[1] == week]
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _remove(self, key: Tuple[str, str]):
+        """移除条目（调用方须持有锁）"""
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def get_stats(self) -> dict:
+        """获取缓存统计
+
+        Returns:
+            统计字典
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
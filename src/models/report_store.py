@@ -0,0 +1,273 @@
+"""Report storage backends"""
+
+import json
+import os
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Hashable, Iterator, List, Optional, Set, Tuple
+
+from src.utils.file_lock import FileLock
+from src.utils.file_utils import atomic_write_text
+from src.utils.logger import setup_logger
+
+
+logger = setup_logger(__name__)
+
+
+# 群组目录下的跨进程锁文件
+LOCK_NAME = ".lock"
+
+# 周报目录下的标记文件：存在时表示周文件已使用 ISO 周标识命名
+ISO_WEEKS_MARKER = ".iso-weeks"
+
+
+class StaleWriteError(RuntimeError):
+    """整周覆盖写入时数据已被其他写者更新（乐观并发检查失败）"""
+
+
+class LegacyWeekKeysError(RuntimeError):
+    """存储中仍有旧版 %Y-W%W 周标识，需要先运行迁移"""
+
+
+class ReportStore(ABC):
+    """周报存储后端接口
+
+    周数据统一使用 {"week": str, "reports": {user_id(str): record}} 结构，
+    record 包含 username / content / submitted_at 三个字段。load_week 还会
+    附带 "version" 写入版本号，用于整周覆盖写入的乐观并发检查。
+    """
+
+    @abstractmethod
+    def load_week(self, group_id: int, week: str) -> dict:
+        """加载某群某周的周报数据
+
+        Args:
+            group_id: 群组ID
+            week: 周标识
+
+        Returns:
+            周报数据字典，不存在时返回空数据
+        """
+
+    @abstractmethod
+    def save_week(self, group_id: int, week: str, data: dict):
+        """整体保存某群某周的周报数据
+
+        Args:
+            group_id: 群组ID
+            week: 周标识
+            data: 周报数据；带 "version" 时只有版本与存储中一致才写入
+
+        Raises:
+            StaleWriteError: data 基于的版本已被其他写者更新
+        """
+
+    @abstractmethod
+    def upsert_report(self, group_id: int, week: str, user_id: int, record: dict):
+        """写入或覆盖单个成员的周报
+
+        Args:
+            group_id: 群组ID
+            week: 周标识
+            user_id: 用户ID
+            record: 周报记录
+        """
+
+    @abstractmethod
+    def list_weeks(self, group_id: int) -> List[str]:
+        """列出某群有周报数据的所有周
+
+        Args:
+            group_id: 群组ID
+
+        Returns:
+            按时间升序排列的周标识列表
+        """
+
+    def submitted_user_ids(self, group_id: int, week: str) -> Set[str]:
+        """获取某周已提交周报的用户ID集合
+
+        Args:
+            group_id: 群组ID
+            week: 周标识
+
+        Returns:
+            用户ID集合（字符串）
+        """
+        return set(self.load_week(group_id, week)["reports"].keys())
+
+    def iter_reports(self, group_id: int, week: str) -> Iterator[Tuple[str, dict]]:
+        """按提交顺序逐条遍历某周的周报
+
+        Args:
+            group_id: 群组ID
+            week: 周标识
+
+        Yields:
+            (user_id, record) 元组
+        """
+        yield from self.load_week(group_id, week)["reports"].items()
+
+    def version_token(self, group_id: int, week: str) -> Optional[Hashable]:
+        """获取某周数据的版本标记，用于判断缓存是否过期
+
+        Args:
+            group_id: 群组ID
+            week: 周标识
+
+        Returns:
+            版本标记，数据变化时随之变化；返回 None 表示不可缓存
+        """
+        return None
+
+    def close(self):
+        """释放存储资源"""
+
+
+class JsonReportStore(ReportStore):
+    """JSON 文件存储：data/reports/<group>/<week>.json
+
+    所有读改写都持有群组目录下的跨进程文件锁，并通过临时文件 + rename
+    原子替换，多个进程共享同一 data/ 目录时不会丢失提交；读取无需加锁。
+    """
+
+    def __init__(self, reports_dir: Path = None, allow_legacy_weeks: bool = False):
+        """初始化 JSON 存储
+
+        Args:
+            reports_dir: 周报存储目录
+            allow_legacy_weeks: 允许打开尚未迁移为 ISO 周的目录（仅供迁移工具使用）
+
+        Raises:
+            LegacyWeekKeysError: 目录中有旧版周标识的数据且 allow_legacy_weeks 为 False
+        """
+        self.reports_dir = reports_dir or Path("data/reports")
+        self.reports_dir.mkdir(parents=True, exist_ok=True)
+        if not allow_legacy_weeks:
+            self._check_week_format()
+
+    def _check_week_format(self):
+        """新目录直接标记为 ISO 周；已有旧版周数据时拒绝打开
+
+        在未迁移的目录中继续服务会以 ISO 周标识写入新文件，同一周的数据
+        分散在新旧两个标识下，之后的迁移也无法区分两者。
+        """
+        marker = self.reports_dir / ISO_WEEKS_MARKER
+        if marker.exists():
+            return
+        # 周快照文件和（日志存储的）日志文件都可能带旧版周标识
+        with FileLock(self.reports_dir / LOCK_NAME):
+            if marker.exists():
+                return
+            if any(path.is_file() and path.name != LOCK_NAME
+                   for path in self.reports_dir.glob("*/*")):
+                raise LegacyWeekKeysError(
+                    f"{self.reports_dir} 中的周报仍使用旧版周标识，请先运行 "
+                    "python migrate_reports.py weeks 迁移为 ISO 周"
+                )
+            marker.write_text("iso-8601\n", encoding='utf-8')
+
+    def _get_report_file(self, group_id: int, week: str) -> Path:
+        """获取周报文件路径
+
+        Args:
+            group_id: 群组ID
+            week: 周标识
+
+        Returns:
+            周报文件路径
+        """
+        return self.reports_dir / str(group_id) / f"{week}.json"
+
+    def _file_lock(self, group_id: int, shared: bool = False) -> FileLock:
+        """获取群组的跨进程文件锁
+
+        Args:
+            group_id: 群组ID
+            shared: 是否为共享锁
+
+        Returns:
+            文件锁（未加锁，用 with 获取）
+        """
+        return FileLock(self.reports_dir / str(group_id) / LOCK_NAME, shared=shared)
+
+    def _read_week(self, group_id: int, week: str) -> dict:
+        """读取周快照文件"""
+        file_path = self._get_report_file(group_id, week)
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"week": week, "reports": {}}
+
+    def _write_week(self, group_id: int, week: str, data: dict, version: int):
+        """以指定版本号原子写入周快照文件（调用方须持有文件锁）"""
+        atomic_write_text(
+            self._get_report_file(group_id, week),
+            json.dumps({**data, "version": version}, ensure_ascii=False, indent=2)
+        )
+
+    def _save_week_locked(self, group_id: int, week: str, data: dict):
+        """整周覆盖写入（调用方须持有文件锁），成功后 data 的版本号更新为新版本"""
+        current = self._read_week(group_id, week).get("version", 0)
+        expected = data.get("version")
+        if expected is not None and expected != current:
+            raise StaleWriteError(
+                f"群 {group_id} {week} 的周报已被更新 (版本 {expected} -> {current})"
+            )
+        self._write_week(group_id, week, data, current + 1)
+        data["version"] = current + 1
+
+    def load_week(self, group_id: int, week: str) -> dict:
+        return self._read_week(group_id, week)
+
+    def save_week(self, group_id: int, week: str, data: dict):
+        with self._file_lock(group_id):
+            self._save_week_locked(group_id, week, data)
+
+    def upsert_report(self, group_id: int, week: str, user_id: int, record: dict):
+        # 在锁内重新读取最新快照，其他进程的提交不会被覆盖
+        with self._file_lock(group_id):
+            data = self._read_week(group_id, week)
+            data["reports"][str(user_id)] = record
+            self._write_week(group_id, week, data, data.get("version", 0) + 1)
+
+    def version_token(self, group_id: int, week: str) -> Optional[Hashable]:
+        try:
+            stat = os.stat(self._get_report_file(group_id, week))
+        except FileNotFoundError:
+            return "missing"
+        # 每次写入都是临时文件 + rename，inode 必然变化；mtime 粒度较粗的文件系统上
+        # 两次同样大小的写入可能得到相同的 (mtime, size)
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def list_weeks(self, group_id: int) -> List[str]:
+        group_dir = self.reports_dir / str(group_id)
+        if not group_dir.is_dir():
+            return []
+        return sorted(p.stem for p in group_dir.glob("*.json"))
+
+
+def create_report_store(backend: str = None, reports_dir: Path = None) -> ReportStore:
+    """根据配置创建周报存储后端
+
+    Args:
+        backend: 后端名称 (json / journal / sqlite)，默认读取环境变量 REPORT_STORAGE
+        reports_dir: 周报存储目录
+
+    Returns:
+        存储后端实例
+    """
+    backend = (backend or os.environ.get("REPORT_STORAGE", "json")).lower()
+    reports_dir = reports_dir or Path("data/reports")
+
+    if backend == "json":
+        return JsonReportStore(reports_dir)
+    if backend == "journal":
+        from src.models.journal_store import JournalReportStore
+        return JournalReportStore(reports_dir)
+    if backend == "sqlite":
+        from src.models.sqlite_store import SQLiteReportStore
+        db_file = Path(os.environ.get("REPORT_DB", reports_dir.parent / "reports.db"))
+        return SQLiteReportStore(db_file)
+    raise ValueError(f"未知的周报存储后端: {backend}")
@@ -0,0 +1,351 @@
+"""SQLite report storage backend"""
+
+import json
+import sqlite3
+import threading
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Hashable, Iterator, List, Optional, Set, Tuple
+
+from src.models.report_store import LegacyWeekKeysError, ReportStore, StaleWriteError
+from src.utils.logger import setup_logger
+
+
+logger = setup_logger(__name__)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    group_id     INTEGER NOT NULL,
+    week         TEXT    NOT NULL,
+    user_id      INTEGER NOT NULL,
+    username     TEXT    NOT NULL,
+    content      TEXT    NOT NULL,
+    submitted_at TEXT    NOT NULL,
+    PRIMARY KEY (group_id, week, user_id)
+);
+CREATE INDEX IF NOT EXISTS idx_reports_week ON reports (week);
+CREATE INDEX IF NOT EXISTS idx_reports_user ON reports (user_id);
+CREATE TABLE IF NOT EXISTS week_versions (
+    group_id INTEGER NOT NULL,
+    week     TEXT    NOT NULL,
+    version  INTEGER NOT NULL,
+    PRIMARY KEY (group_id, week)
+);
+"""
+
+# 每次写入（整周覆盖或单条 upsert）递增该周的写入版本号，用于整周覆盖的乐观并发检查
+BUMP_VERSION_SQL = """
+INSERT INTO week_versions (group_id, week, version) VALUES (?, ?, 1)
+ON CONFLICT (group_id, week) DO UPDATE SET version = version + 1
+"""
+
+UPSERT_SQL = """
+INSERT INTO reports (group_id, week, user_id, username, content, submitted_at)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (group_id, week, user_id) DO UPDATE SET
+    username = excluded.username,
+    content = excluded.content,
+    submitted_at = excluded.submitted_at
+"""
+
+# PRAGMA user_version 取值：周标识已使用 ISO 周
+ISO_WEEKS_VERSION = 1
+
+# iter_reports 每批读取的行数
+ITER_BATCH_SIZE = 256
+
+
+class SQLiteReportStore(ReportStore):
+    """SQLite 存储：单表 + (group, week, user) 主键，WAL 模式
+
+    每次提交是一条单行 upsert，不再读写整周数据。week_versions 表记录每个
+    (群组, 周) 的写入版本号，整周覆盖写入在同一个写事务内检查版本，与 JSON
+    存储一样支持乐观并发检查。
+    """
+
+    def __init__(self, db_file: Path = None, allow_legacy_weeks: bool = False):
+        """初始化 SQLite 存储
+
+        Args:
+            db_file: 数据库文件路径
+            allow_legacy_weeks: 允许打开尚未迁移为 ISO 周的数据库（仅供迁移工具使用）
+
+        Raises:
+            LegacyWeekKeysError: 数据库中有旧版周标识的数据且 allow_legacy_weeks 为 False
+        """
+        self.db_file = Path(db_file or "data/reports.db")
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # 本连接按群组的写入代数：data_version 不反映本连接自己的提交
+        self._generations: Dict[int, int] = defaultdict(int)
+        self._epoch = 0
+        self._conn = sqlite3.connect(
+            str(self.db_file), isolation_level=None, check_same_thread=False
+        )
+        # 多个进程共享数据库时，写锁被占用最多等待 5 秒而不是立即报错
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        if not allow_legacy_weeks:
+            try:
+                self._check_week_format()
+            except BaseException:
+                self._conn.close()
+                raise
+
+    def _check_week_format(self):
+        """新数据库直接标记为 ISO 周；已有旧版周标识的数据时拒绝打开"""
+        if self.uses_iso_weeks():
+            return
+        # 写事务内检查，避免与同时启动的其他进程或迁移工具交错
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            if self._conn.execute("PRAGMA user_version").fetchone()[0] < ISO_WEEKS_VERSION:
+                if self._conn.execute("SELECT 1 FROM reports LIMIT 1").fetchone():
+                    raise LegacyWeekKeysError(
+                        f"{self.db_file} 中的周报仍使用旧版周标识，请先运行 "
+                        "python migrate_reports.py weeks 迁移为 ISO 周"
+                    )
+                self._conn.execute(f"PRAGMA user_version={ISO_WEEKS_VERSION}")
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def uses_iso_weeks(self) -> bool:
+        """数据库中的周标识是否已是 ISO 周"""
+        with self._lock:
+            return self._conn.execute("PRAGMA user_version").fetchone()[0] >= ISO_WEEKS_VERSION
+
+    def _week_version(self, group_id: int, week: str) -> int:
+        """读取某周的写入版本号（调用方须持有 _lock）"""
+        row = self._conn.execute(
+            "SELECT version FROM week_versions WHERE group_id = ? AND week = ?",
+            (group_id, week)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def load_week(self, group_id: int, week: str) -> dict:
+        with self._lock:
+            # 版本号与周报在同一个读事务中读取，保证两者对应
+            self._conn.execute("BEGIN")
+            try:
+                version = self._week_version(group_id, week)
+                rows = self._conn.execute(
+                    "SELECT user_id, username, content, submitted_at FROM reports "
+                    "WHERE group_id = ? AND week = ? ORDER BY rowid",
+                    (group_id, week)
+                ).fetchall()
+            finally:
+                self._conn.execute("COMMIT")
+        reports = {}
+        for user_id, username, content, submitted_at in rows:
+            reports[str(user_id)] = {
+                "username": username,
+                "content": content,
+                "submitted_at": submitted_at
+            }
+        return {"week": week, "reports": reports, "version": version}
+
+    def save_week(self, group_id: int, week: str, data: dict):
+        rows = [
+            (group_id, week, int(user_id), record["username"],
+             record["content"], record["submitted_at"])
+            for user_id, record in data.get("reports", {}).items()
+        ]
+        expected = data.get("version")
+        with self._lock:
+            # 版本检查与覆盖写入在同一个写事务中，其他连接无法在两者之间提交
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                current = self._week_version(group_id, week)
+                if expected is not None and expected != current:
+                    raise StaleWriteError(
+                        f"群 {group_id} {week} 的周报已被更新 (版本 {expected} -> {current})"
+                    )
+                self._conn.execute(
+                    "DELETE FROM reports WHERE group_id = ? AND week = ?",
+                    (group_id, week)
+                )
+                self._conn.executemany(UPSERT_SQL, rows)
+                self._conn.execute(BUMP_VERSION_SQL, (group_id, week))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            # 提交之后再递增：在此之前读到旧数据的缓存条目带着旧代数，不会再命中
+            self._generations[int(group_id)] += 1
+        data["version"] = current + 1
+
+    def upsert_report(self, group_id: int, week: str, user_id: int, record: dict):
+        with self._lock:
+            # 同时递增版本号：基于旧版本的整周覆盖写入不会抹掉这条提交
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(UPSERT_SQL, (
+                    group_id, week, int(user_id), record["username"],
+                    record["content"], record["submitted_at"]
+                ))
+                self._conn.execute(BUMP_VERSION_SQL, (group_id, week))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._generations[int(group_id)] += 1
+
+    def list_weeks(self, group_id: int) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT week FROM reports WHERE group_id = ? ORDER BY week",
+                (group_id,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def submitted_user_ids(self, group_id: int, week: str) -> Set[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT user_id FROM reports WHERE group_id = ? AND week = ?",
+                (group_id, week)
+            ).fetchall()
+        return {str(row[0]) for row in rows}
+
+    def iter_reports(self, group_id: int, week: str) -> Iterator[Tuple[str, dict]]:
+        # 按主键分批读取，内存占用与该周周报数量无关
+        last_rowid = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT rowid, user_id, username, content, submitted_at FROM reports "
+                    "WHERE group_id = ? AND week = ? AND rowid > ? ORDER BY rowid LIMIT ?",
+                    (group_id, week, last_rowid, ITER_BATCH_SIZE)
+                ).fetchall()
+            if not rows:
+                return
+            for rowid, user_id, username, content, submitted_at in rows:
+                yield str(user_id), {
+                    "username": username,
+                    "content": content,
+                    "submitted_at": submitted_at
+                }
+            last_rowid = rows[-1][0]
+
+    def all_weeks(self) -> List[str]:
+        """列出所有群组出现过的周标识
+
+        Returns:
+            周标识列表
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT DISTINCT week FROM reports ORDER BY week").fetchall()
+        return [row[0] for row in rows]
+
+    def week_submissions(self) -> Dict[str, List[str]]:
+        """列出所有群组出现过的周标识及其周报的提交时间（迁移时判断周标识格式）
+
+        Returns:
+            {周标识: [提交时间, ...]}
+        """
+        weeks: Dict[str, List[str]] = defaultdict(list)
+        with self._lock:
+            for week, submitted_at in self._conn.execute(
+                    "SELECT week, submitted_at FROM reports ORDER BY week"):
+                weeks[week].append(submitted_at)
+        return dict(weeks)
+
+    def rekey_weeks(self, plan: Dict[str, str]) -> Optional[int]:
+        """在一个事务中按映射修改周标识
+
+        目标周已有同一用户的记录时保留提交时间较晚的一份。调用方须保证
+        映射按顺序执行时，目标周不是尚未处理的源周。
+
+        Args:
+            plan: {旧周标识: 新周标识}，按执行顺序排列；完成后数据库标记为 ISO 周
+
+        Returns:
+            迁移的行数；数据库已被其他进程迁移时返回 None，不做任何修改
+        """
+        moved = 0
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # 计划是在事务外生成的，持有写锁后再确认没有被并发的迁移抢先
+                if self._conn.execute("PRAGMA user_version").fetchone()[0] >= ISO_WEEKS_VERSION:
+                    self._conn.execute("ROLLBACK")
+                    return None
+                for old_week, new_week in plan.items():
+                    moved += self._conn.execute(
+                        "SELECT COUNT(*) FROM reports WHERE week = ?", (old_week,)
+                    ).fetchone()[0]
+                    self._conn.execute(
+                        "INSERT INTO reports "
+                        "(group_id, week, user_id, username, content, submitted_at) "
+                        "SELECT group_id, ?, user_id, username, content, submitted_at "
+                        "FROM reports WHERE week = ? ORDER BY rowid "
+                        "ON CONFLICT (group_id, week, user_id) DO UPDATE SET "
+                        "username = excluded.username, content = excluded.content, "
+                        "submitted_at = excluded.submitted_at "
+                        "WHERE excluded.submitted_at > reports.submitted_at",
+                        (new_week, old_week)
+                    )
+                    self._conn.execute("DELETE FROM reports WHERE week = ?", (old_week,))
+                    self._conn.execute(
+                        "INSERT INTO week_versions (group_id, week, version) "
+                        "SELECT group_id, ?, 1 FROM week_versions WHERE week = ? "
+                        "ON CONFLICT (group_id, week) DO UPDATE SET version = version + 1",
+                        (new_week, old_week)
+                    )
+                    self._conn.execute("DELETE FROM week_versions WHERE week = ?", (old_week,))
+                self._conn.execute(f"PRAGMA user_version={ISO_WEEKS_VERSION}")
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            # 迁移涉及所有群组
+            self._epoch += 1
+        return moved
+
+    def version_token(self, group_id: int, week: str) -> Optional[Hashable]:
+        # data_version 只在其他连接（如其他进程）提交后变化，
+        # 本连接的写入由该群的写入代数反映
+        with self._lock:
+            data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            return (data_version, self._epoch, self._generations[int(group_id)])
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def import_json_tree(reports_dir: Path, store: SQLiteReportStore) -> dict:
+    """将 JSON 周报目录一次性导入 SQLite
+
+    导入是幂等的：重复运行会以 JSON 文件内容覆盖同一周的记录。
+
+    Args:
+        reports_dir: JSON 周报目录 (data/reports)
+        store: 目标 SQLite 存储
+
+    Returns:
+        导入统计 {"groups": int, "weeks": int, "reports": int}
+    """
+    stats = {"groups": 0, "weeks": 0, "reports": 0}
+    for group_dir in sorted(Path(reports_dir).iterdir()):
+        if not group_dir.is_dir():
+            continue
+        try:
+            group_id = int(group_dir.name)
+        except ValueError:
+            continue
+        stats["groups"] += 1
+        for week_file in sorted(group_dir.glob("*.json")):
+            with open(week_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            # JSON 文件的版本号与数据库中的版本号无关，导入为无条件覆盖
+            data.pop("version", None)
+            store.save_week(group_id, week_file.stem, data)
+            stats["weeks"] += 1
+            stats["reports"] += len(data.get("reports", {}))
+        logger.info(f"已导入群 {group_id} 的周报数据")
+    return stats
@@ -0,0 +1,186 @@
+"""Re-key stored reports from legacy %Y-W%W week keys to ISO-8601 weeks"""
+
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Collection, Dict, Iterable, List
+
+from src.models.journal_store import JOURNAL_NAME, JournalReportStore
+from src.models.report_store import ISO_WEEKS_MARKER, LOCK_NAME
+from src.models.sqlite_store import SQLiteReportStore
+from src.utils.file_lock import FileLock
+from src.utils.file_utils import atomic_write_text
+from src.utils.logger import setup_logger
+from src.utils.time_utils import LEGACY_WEEK_FORMAT, WEEK_PATTERN, legacy_week_to_iso, week_key
+
+
+logger = setup_logger(__name__)
+
+
+def written_as_iso(week: str, submitted_at: Iterable[str]) -> bool:
+    """根据周报的提交时间判断该周标识是否已是 ISO 周标识
+
+    旧版本在未迁移的目录中会以 ISO 周标识写入新数据，文件名本身无法区分；
+    周报总是提交到当时的当前周，多数提交日期落在哪种周标识的范围内，
+    该周就是以哪种格式写入的。
+
+    Args:
+        week: 周标识
+        submitted_at: 该周各份周报的提交时间 (ISO 格式字符串)
+
+    Returns:
+        是否为 ISO 周标识；没有可判断的提交时间时返回 False
+    """
+    iso = legacy = 0
+    for timestamp in submitted_at:
+        try:
+            day = datetime.fromisoformat(timestamp).date()
+        except (TypeError, ValueError):
+            continue
+        if week_key(day) == week:
+            iso += 1
+        elif day.strftime(LEGACY_WEEK_FORMAT) == week:
+            legacy += 1
+    return iso > legacy
+
+
+def plan_rekey(weeks: List[str], iso_weeks: Collection[str] = ()) -> Dict[str, str]:
+    """计算旧周标识到 ISO 周标识的映射
+
+    旧版第 0 周与上一年最后一周是同一周，会映射到同一个 ISO 周。
+
+    Args:
+        weeks: 周标识列表
+        iso_weeks: 其中已经以 ISO 周标识写入的周（见 written_as_iso），保持不变
+
+    Returns:
+        {旧周标识: ISO 周标识}，按旧周标识降序排列，只包含需要改名的周
+    """
+    plan = {}
+    for week in sorted(weeks, reverse=True):
+        if week in iso_weeks:
+            continue
+        new_week = legacy_week_to_iso(week)
+        if new_week != week:
+            plan[week] = new_week
+    # 按旧周标识降序处理时，目标周不会是尚未迁移的旧周（对 2000-2040 年逐日验证过）；
+    # 跳过的 ISO 周只会作为目标出现，与同一周的旧数据合并
+    return plan
+
+
+def merge_reports(target: dict, source: dict) -> dict:
+    """合并两份周报记录，同一用户保留提交时间较晚的一份
+
+    Args:
+        target: {user_id: record}，原地修改
+        source: {user_id: record}
+
+    Returns:
+        target
+    """
+    for user_id, record in source.items():
+        current = target.get(user_id)
+        if current is None or record.get("submitted_at", "") > current.get("submitted_at", ""):
+            target[user_id] = record
+    return target
+
+
+def rekey_json_tree(reports_dir: Path, dry_run: bool = False) -> dict:
+    """将 JSON/日志存储目录中的周文件改为 ISO 周标识
+
+    Bot 拒绝打开未迁移的目录；迁移全程持有目录级文件锁，与同时启动的
+    Bot 互斥。日志存储的未折叠条目会先折叠进周文件；已经以 ISO 周标识写入的
+    周保持不变。完成后写入标记文件，重复运行不会再次改名。
+
+    Args:
+        reports_dir: 周报存储目录 (data/reports)
+        dry_run: 只统计不修改
+
+    Returns:
+        {"groups", "renamed", "merged"}；已迁移过时返回 {"skipped": True}
+    """
+    reports_dir = Path(reports_dir)
+    marker = reports_dir / ISO_WEEKS_MARKER
+    if marker.exists():
+        return {"skipped": True}
+    with FileLock(reports_dir / LOCK_NAME):
+        if marker.exists():
+            return {"skipped": True}
+        return _rekey_json_tree_locked(reports_dir, dry_run)
+
+
+def _rekey_json_tree_locked(reports_dir: Path, dry_run: bool) -> dict:
+    """迁移 JSON/日志存储目录（调用方须持有目录级文件锁）"""
+    if not dry_run and any(reports_dir.glob(f"*/{JOURNAL_NAME}*")):
+        JournalReportStore(reports_dir, allow_legacy_weeks=True).close()
+
+    stats = {"groups": 0, "renamed": 0, "merged": 0}
+    for group_dir in sorted(reports_dir.iterdir()):
+        if not group_dir.is_dir():
+            continue
+        weeks = [p.stem for p in group_dir.glob("*.json") if WEEK_PATTERN.match(p.stem)]
+        iso_weeks = set()
+        for week in weeks:
+            with open(group_dir / f"{week}.json", 'r', encoding='utf-8') as f:
+                reports = json.load(f).get("reports", {})
+            if written_as_iso(week, (r.get("submitted_at") for r in reports.values())):
+                iso_weeks.add(week)
+        plan = plan_rekey(weeks, iso_weeks)
+        if not plan:
+            continue
+        stats["groups"] += 1
+        existing = set(weeks)
+        with FileLock(group_dir / LOCK_NAME):
+            for old_week, new_week in plan.items():
+                old_file = group_dir / f"{old_week}.json"
+                new_file = group_dir / f"{new_week}.json"
+                merge = new_week in existing
+                existing.discard(old_week)
+                existing.add(new_week)
+                stats["renamed"] += 1
+                stats["merged"] += merge
+                if dry_run:
+                    continue
+                with open(old_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if merge:
+                    with open(new_file, 'r', encoding='utf-8') as f:
+                        target = json.load(f)
+                    data["reports"] = merge_reports(target.get("reports", {}),
+                                                    data.get("reports", {}))
+                    data["version"] = max(data.get("version", 0), target.get("version", 0)) + 1
+                data["week"] = new_week
+                atomic_write_text(new_file, json.dumps(data, ensure_ascii=False, indent=2))
+                os.remove(old_file)
+        logger.info(f"群 {group_dir.name}: {len(plan)} 个周文件已改为 ISO 周标识")
+
+    if not dry_run:
+        (reports_dir / ISO_WEEKS_MARKER).write_text("iso-8601\n", encoding='utf-8')
+    return stats
+
+
+def rekey_sqlite(store: SQLiteReportStore, dry_run: bool = False) -> dict:
+    """将 SQLite 数据库中的周标识改为 ISO 周标识（在一个事务中完成）
+
+    Args:
+        store: SQLite 存储
+        dry_run: 只统计不修改
+
+    Returns:
+        {"weeks", "rows"}，dry_run 时 rows 为 0；已迁移过时返回 {"skipped": True}
+    """
+    if store.uses_iso_weeks():
+        return {"skipped": True}
+    submissions = {
+        week: times for week, times in store.week_submissions().items()
+        if WEEK_PATTERN.match(week)
+    }
+    iso_weeks = {week for week, times in submissions.items() if written_as_iso(week, times)}
+    plan = plan_rekey(list(submissions), iso_weeks)
+    if dry_run:
+        return {"weeks": len(plan), "rows": 0}
+    rows = store.rekey_weeks(plan)
+    if rows is None:
+        return {"skipped": True}
+    return {"weeks": len(plan), "rows": rows}
@@ -1,11 +1,14 @@
 """Scheduler configuration for automated tasks"""
 
 import logging
-from datetime import time
+import os
 
 from telegram.ext import Application
 
-from src.handlers.messages import scheduled_reminder
+from src.handlers.messages import (
+    scheduled_compaction, scheduled_index_check, scheduled_reminder, scheduled_week_check
+)
+from src.services.container import BOT_DATA_KEY
 from src.utils.logger import setup_logger
 
 
@@ -20,23 +23,43 @@ def setup_scheduled_jobs(application: Application):
     """
     job_queue = application.job_queue
 
-    # 每周五下午5点提醒 (北京时间 17:00 = UTC 09:00)
-    reminder_time = time(hour=9, minute=0)
-
-    job_queue.run_daily(
+    # 各群组按自己的时区和提醒时间触发：到期队列保存在 ScheduleService 中，
+    # 这里只需一个定时检查堆顶的任务
+    tick = float(os.environ.get("REMINDER_TICK_INTERVAL", "30"))
+    job_queue.run_repeating(
         scheduled_reminder,
-        time=reminder_time,
-        days=(4,),  # 周五 (0=周一, 4=周五)
-        name="friday_reminder"
+        interval=tick,
+        first=0,
+        name="group_reminders"
     )
 
-    # 周一上午再提醒一次 (北京时间 09:00 = UTC 01:00)
-    deadline_time = time(hour=1, minute=0)
-    job_queue.run_daily(
-        scheduled_reminder,
-        time=deadline_time,
-        days=(0,),  # 周一
-        name="monday_reminder"
+    # 跨周检查：周一 0 点后一分钟内通知缓存和索引丢弃旧周数据
+    job_queue.run_repeating(
+        scheduled_week_check,
+        interval=60,
+        first=60,
+        name="week_rollover"
     )
 
+    # 日志存储后端：定期将追加日志折叠进周快照文件
+    services = application.bot_data.get(BOT_DATA_KEY)
+    if services is not None and hasattr(services.report_manager.store, "compact_all"):
+        interval = float(os.environ.get("JOURNAL_COMPACT_INTERVAL", "300"))
+        job_queue.run_repeating(
+            scheduled_compaction,
+            interval=interval,
+            first=interval,
+            name="journal_compaction"
+        )
+
+    # 可选：定期核对未提交成员索引（默认关闭）
+    check_interval = float(os.environ.get("PENDING_CHECK_INTERVAL", "0"))
+    if check_interval > 0:
+        job_queue.run_repeating(
+            scheduled_index_check,
+            interval=check_interval,
+            first=check_interval,
+            name="pending_index_check"
+        )
+
     logger.info("定时任务已设置")
@@ -1,6 +1,12 @@
 """Business logic services"""
 from .bot_service import BotService
+from .async_bot_service import AsyncBotService
 from .report_service import ReportService
 from .reminder_service import ReminderService
+from .schedule_service import ScheduleService
+from .pending_index import PendingIndex
+from .dispatcher import SendDispatcher, TokenBucket
+from .container import ServiceContainer, get_services
 
-__all__ = ['BotService', 'ReportService', 'ReminderService']
+__all__ = ['BotService', 'AsyncBotService', 'ReportService', 'ReminderService', 'ScheduleService',
+           'PendingIndex', 'SendDispatcher', 'TokenBucket', 'ServiceContainer', 'get_services']
@@ -0,0 +1,139 @@
+"""Async facade over BotService - storage I/O off the event loop"""
+
+import asyncio
+import contextvars
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, TypeVar
+
+from src.models.config import MemberDiff
+from src.models.membership import GroupMembers
+from src.services.bot_service import BotService
+from src.utils.logger import setup_logger
+
+
+logger = setup_logger(__name__)
+
+T = TypeVar("T")
+
+
+class AsyncBotService:
+    """BotService 的异步门面
+
+    处理器中的存储调用（读写周报文件、保存配置、导出）都是同步磁盘 I/O，
+    直接在 async 处理器中调用会阻塞整个事件循环。门面把这些调用放到线程中执行:
+
+    - 写操作进入单个写线程，按提交顺序串行执行，不会出现两个线程同时
+      读改写同一个周报文件；
+    - 读操作和导出进入有界读线程池，可以并发执行。
+
+    处理器 await 写操作完成后再发起读操作，因此总能读到自己刚写入的数据。
+    """
+
+    def __init__(self, bot_service: BotService, max_workers: int = None):
+        """初始化异步门面
+
+        Args:
+            bot_service: Bot 服务实例
+            max_workers: 读线程池大小，默认读取 STORAGE_READ_WORKERS 环境变量
+        """
+        if max_workers is None:
+            max_workers = int(os.environ.get("STORAGE_READ_WORKERS", "4"))
+
+        self.bot_service = bot_service
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="storage-writer")
+        self._readers = ThreadPoolExecutor(max_workers=max_workers,
+                                           thread_name_prefix="storage-reader")
+        self._closed = False
+
+    async def run_read(self, func: Callable[..., T], *args, **kwargs) -> T:
+        """在读线程池中执行同步函数
+
+        Args:
+            func: 同步函数
+            *args: 位置参数
+            **kwargs: 关键字参数
+
+        Returns:
+            函数返回值
+        """
+        loop = asyncio.get_running_loop()
+        # 带上调用方的上下文（日志字段等），run_in_executor 本身不会传递
+        call = functools.partial(contextvars.copy_context().run, func, *args, **kwargs)
+        return await loop.run_in_executor(self._readers, call)
+
+    async def run_write(self, func: Callable[..., T], *args, **kwargs) -> T:
+        """在写线程中按提交顺序执行同步函数
+
+        Args:
+            func: 同步函数
+            *args: 位置参数
+            **kwargs: 关键字参数
+
+        Returns:
+            函数返回值
+        """
+        loop = asyncio.get_running_loop()
+        # 带上调用方的上下文（日志字段等），run_in_executor 本身不会传递
+        call = functools.partial(contextvars.copy_context().run, func, *args, **kwargs)
+        return await loop.run_in_executor(self._writer, call)
+
+    async def register_group(self, group_id: int, group_name: str) -> bool:
+        """注册群组"""
+        return await self.run_write(self.bot_service.register_group, group_id, group_name)
+
+    async def add_member(self, group_id: int, user_id: int, username: str):
+        """添加成员"""
+        await self.run_write(self.bot_service.add_member, group_id, user_id, username)
+
+    async def remove_member(self, group_id: int, user_id: int):
+        """移除成员"""
+        await self.run_write(self.bot_service.remove_member, group_id, user_id)
+
+    async def submit_report(self, group_id: int, user_id: int,
+                            username: str, content: str) -> bool:
+        """自动注册成员并保存周报（一次写线程调度完成）
+
+        Args:
+            group_id: 群组ID
+            user_id: 用户ID
+            username: 用户名
+            content: 周报内容
+
+        Returns:
+            是否添加成功
+        """
+        def submit():
+            self.bot_service.add_member(group_id, user_id, username)
+            return self.bot_service.add_report(group_id, user_id, username, content)
+
+        return await self.run_write(submit)
+
+    async def sync_members(self, group_id: int, members: Dict[int, str],
+                           prune: bool = False) -> MemberDiff:
+        """批量同步群组成员，返回成员修改"""
+        return await self.run_write(self.bot_service.sync_members, group_id, members, prune)
+
+    async def get_pending_members(self, group_id: int, week: str = None) -> List[dict]:
+        """获取未提交成员（week 默认为当前周）"""
+        return await self.run_read(self.bot_service.get_pending_members, group_id, None, week)
+
+    async def get_group_members(self, group_id: int) -> GroupMembers:
+        """获取群组成员"""
+        return await self.run_read(self.bot_service.get_group_members, group_id)
+
+    async def export_report(self, group_id: int, week: str = None,
+                            weeks: list = None, compress: bool = False):
+        """导出周报（导出写入独立文件，放在读线程池中执行）"""
+        return await self.run_read(
+            self.bot_service.export_report, group_id, week, weeks=weeks, compress=compress
+        )
+
+    def close(self):
+        """等待排队中的写操作完成并关闭线程池（可重复调用）"""
+        if self._closed:
+            return
+        self._closed = True
+        self._writer.shutdown(wait=True)
+        self._readers.shutdown(wait=True)
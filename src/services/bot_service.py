@@ -3,10 +3,11 @@
 import logging
 from typing import Dict
 
-from src.models.config import Config
+from src.models.config import Config, MemberDiff
+from src.models.membership import GroupMembers
 from src.models.report import WeeklyReport
+from src.services.pending_index import PendingIndex
 from src.utils.logger import setup_logger
-from src.utils.time_utils import get_current_week
 
 
 logger = setup_logger(__name__)
@@ -23,7 +24,14 @@ class BotService:
             report_manager: 周报管理实例
         """
         self.config = config or Config()
-        self.report_manager = report_manager or WeeklyReport()
+        self.report_manager = report_manager or WeeklyReport(
+            timezone_for=self.config.get_group_timezone
+        )
+        self.pending_index = PendingIndex(self.config, self.report_manager)
+
+    def close(self):
+        """释放未提交成员索引（配置和周报存储由创建者负责关闭）"""
+        self.pending_index.close()
 
     def register_group(self, group_id: int, group_name: str) -> bool:
         """注册群组
@@ -47,8 +55,11 @@ class BotService:
             user_id: 用户ID
             username: 用户名
         """
-        self.config.add_member(group_id, user_id, username)
-        logger.info(f"添加成员 {username} ({user_id}) 到群 {group_id}")
+        # 每次收录周报都会调用，成员已存在时配置未变化，不需要更新未提交索引
+        if not self.config.add_member(group_id, user_id, username):
+            return
+        self.pending_index.on_member_added(group_id, user_id, username)
+        logger.debug("添加成员 %s (%s) 到群 %s", username, user_id, group_id)
 
     def remove_member(self, group_id: int, user_id: int):
         """移除成员
@@ -58,6 +69,7 @@ class BotService:
             user_id: 用户ID
         """
         self.config.remove_member(group_id, user_id)
+        self.pending_index.on_member_removed(group_id, user_id)
         logger.info(f"移除成员 {user_id} 从群 {group_id}")
 
     def add_report(self, group_id: int, user_id: int,
@@ -77,72 +89,109 @@ class BotService:
             group_id, user_id, username, content
         )
         if success:
-            logger.info(f"用户 {username} ({user_id}) 在群 {group_id} 提交了周报")
+            self.pending_index.on_report_added(group_id, user_id)
+            logger.info("用户 %s (%s) 在群 %s 提交了周报", username, user_id, group_id,
+                        extra={"chat_id": group_id, "user_id": user_id,
+                               "week": self.report_manager.current_week(group_id)})
         return success
 
-    def get_pending_members(self, group_id: int, all_members: dict = None) -> list:
+    def get_pending_members(self, group_id: int, all_members: dict = None,
+                            week: str = None) -> list:
         """获取未提交成员（排除在排除列表中的人）
 
         Args:
             group_id: 群组ID
-            all_members: 所有成员字典 {user_id: username}，如果为 None 则从配置读取
+            all_members: 所有成员字典 {user_id: username}，如果为 None 则从
+                未提交成员索引读取
+            week: 周标识，默认为当前周（只在 all_members 为 None 时使用）
 
         Returns:
             未提交成员列表
         """
         if all_members is None:
-            group_config = self.config.get_group(group_id) or {}
-            all_members = group_config.get("members", {})
+            return self.pending_index.get_pending(group_id, week)
 
-        # 过滤掉排除列表中的用户
-        filtered_members = {}
-        for user_id, username in all_members.items():
-            if not self.config.is_user_excluded(int(user_id)):
-                filtered_members[user_id] = username
+        # 一次集合运算过滤掉全局和本群排除列表中的用户
+        required = self.config.filter_excluded(map(int, all_members), group_id)
+        filtered_members = {
+            user_id: username for user_id, username in all_members.items()
+            if int(user_id) in required
+        }
 
         return self.report_manager.get_pending_members(group_id, filtered_members)
 
-    def sync_members_from_group(self, group_id: int, members_dict: dict):
-        """从群组同步成员列表
+    def count_pending_members(self, group_id: int) -> int:
+        """获取未提交成员数
+
+        Args:
+            group_id: 群组ID
+
+        Returns:
+            未提交成员数
+        """
+        return self.pending_index.count_pending(group_id)
+
+    def exclude_user(self, group_id: int, user_id: int, username: str,
+                     group_only: bool = False):
+        """将用户加入排除列表并移出当前群组
+
+        Args:
+            group_id: 群组ID
+            user_id: 用户ID
+            username: 用户名
+            group_only: 是否只在当前群组排除（否则加入全局排除列表）
+        """
+        scope = group_id if group_only else None
+        self.config.add_excluded_user(user_id, username, scope)
+        self.pending_index.on_user_excluded(user_id, scope)
+        self.remove_member(group_id, user_id)
+
+    def include_user(self, user_id: int, group_id: int = None):
+        """将用户移出排除列表
+
+        Args:
+            user_id: 用户ID
+            group_id: 群组ID，指定时从该群组的排除列表移除，否则从全局排除列表移除
+        """
+        self.config.remove_excluded_user(user_id, group_id)
+        self.pending_index.on_user_included(user_id, group_id)
+
+    def sync_members(self, group_id: int, members: Dict[int, str],
+                     prune: bool = False) -> MemberDiff:
+        """批量同步群组成员（一次配置修改，没有变化时不写文件）
 
         Args:
             group_id: 群组ID
-            members_dict: 成员字典 {user_id: username}
-        """
-        group_id_str = str(group_id)
-        if group_id_str not in self.config.data["groups"]:
-            self.config.data["groups"][group_id_str] = {
-                "name": "Unknown Group",
-                "members": {}
-            }
-
-        # 更新成员列表（保留已有的成员信息）
-        current_members = self.config.data["groups"][group_id_str].get("members", {})
-        for user_id, username in members_dict.items():
-            # 只添加新成员或更新用户名
-            # 但跳过排除列表中的用户
-            if not self.config.is_user_excluded(int(user_id)):
-                if str(user_id) not in current_members or current_members[str(user_id)] != username:
-                    current_members[str(user_id)] = username
-
-        self.config.data["groups"][group_id_str]["members"] = current_members
-        self.config.save()
-
-        # 统计有效成员（排除被排除的）
-        excluded_count = sum(1 for uid in members_dict.keys() if self.config.is_user_excluded(int(uid)))
-        logger.info(f"同步群 {group_id} 成员列表，共 {len(members_dict)} 人（排除 {excluded_count} 人）")
-
-    def get_group_members(self, group_id: int) -> Dict[str, str]:
+            members: 成员字典 {user_id: username}
+            prune: 是否移除不在 members 中的现有成员
+
+        Returns:
+            新增、改名和移除的成员
+        """
+        diff = self.config.sync_members(group_id, members, prune)
+        for user_id, username in diff.added.items():
+            self.pending_index.on_member_added(group_id, int(user_id), username)
+        for user_id, (_, username) in diff.renamed.items():
+            self.pending_index.on_member_added(group_id, int(user_id), username)
+        for user_id in diff.removed:
+            self.pending_index.on_member_removed(group_id, int(user_id))
+        logger.info(
+            "同步群 %s 成员: 共 %d 人，新增 %d，改名 %d，移除 %d，排除 %d",
+            group_id, len(members), len(diff.added), len(diff.renamed),
+            len(diff.removed), diff.excluded
+        )
+        return diff
+
+    def get_group_members(self, group_id: int) -> GroupMembers:
         """获取群组成员
 
         Args:
             group_id: 群组ID
 
         Returns:
-            成员字典 {user_id: username}
+            成员表快照（按加入顺序，可用 items() 遍历 (user_id, username)）
         """
-        group_config = self.config.get_group(group_id) or {}
-        return group_config.get("members", {})
+        return self.config.membership.group(group_id)
 
     def generate_summary(self, group_id: int, week: str = None) -> str:
         """生成周报汇总
@@ -162,6 +211,24 @@ class BotService:
             group_id, group_name, week, pending_members
         )
 
+    def generate_summary_blocks(self, group_id: int, week: str = None) -> list:
+        """生成周报汇总文本块
+
+        Args:
+            group_id: 群组ID
+            week: 周标识，默认为当前周
+
+        Returns:
+            文本块列表
+        """
+        group_config = self.config.get_group(group_id) or {}
+        group_name = group_config.get("name", "未知群组")
+        pending_members = self.get_pending_members(group_id)
+
+        return self.report_manager.generate_summary_blocks(
+            group_id, group_name, week, pending_members
+        )
+
     def get_report_stats(self, group_id: int, week: str = None) -> dict:
         """获取周报统计信息
 
@@ -176,18 +243,21 @@ class BotService:
         members = self.get_group_members(group_id)
 
         return {
-            "week": week or get_current_week(),
+            "week": week or self.report_manager.current_week(group_id),
             "submitted": len(data["reports"]),
             "total": len(members),
             "reports": data["reports"]
         }
 
-    def export_report(self, group_id: int, week: str = None):
+    def export_report(self, group_id: int, week: str = None,
+                      weeks: list = None, compress: bool = False):
         """导出周报
 
         Args:
             group_id: 群组ID
             week: 周标识，默认为当前周
+            weeks: 周标识列表，指定时导出多周归档
+            compress: 是否 gzip 压缩
 
         Returns:
             导出文件路径
@@ -196,7 +266,7 @@ class BotService:
         group_name = group_config.get("name", "未知群组")
 
         return self.report_manager.export_to_markdown(
-            group_id, group_name, week
+            group_id, group_name, week, weeks=weeks, compress=compress
         )
 
     def get_report_keywords(self) -> list:
@@ -0,0 +1,66 @@
+"""Service container - Process-wide shared services"""
+
+from telegram.ext import ContextTypes
+
+from src.models.config import Config
+from src.models.report import WeeklyReport
+from src.services.async_bot_service import AsyncBotService
+from src.services.bot_service import BotService
+from src.services.dispatcher import SendDispatcher
+from src.services.report_service import ReportService
+from src.services.reminder_service import ReminderService
+from src.services.schedule_service import ScheduleService
+
+
+# Application.bot_data 中保存服务容器的键
+BOT_DATA_KEY = "services"
+
+
+class ServiceContainer:
+    """进程级共享服务容器
+
+    配置只加载一次，所有处理器和定时任务共享同一份内存状态和周报存储，
+    避免多份 Config 副本互相覆盖。
+    """
+
+    def __init__(self, config: Config = None, report_manager: WeeklyReport = None,
+                 shard=None):
+        """初始化服务容器
+
+        Args:
+            config: 配置管理实例
+            report_manager: 周报管理实例
+            shard: 分片部署时本进程负责的分片 (ShardSpec)，None 表示负责全部群组
+        """
+        self.shard = shard
+        self.config = config or Config()
+        self.report_manager = report_manager or WeeklyReport(
+            timezone_for=self.config.get_group_timezone
+        )
+        self.bot_service = BotService(self.config, self.report_manager)
+        self.async_bot = AsyncBotService(self.bot_service)
+        self.report_service = ReportService(self.bot_service)
+        self.dispatcher = SendDispatcher()
+        self.reminder_service = ReminderService(
+            self.bot_service, self.dispatcher, self.async_bot, shard
+        )
+        self.schedule_service = ScheduleService(self.config, shard)
+
+    def close(self):
+        """关闭容器，完成排队中的写操作，刷新尚未写回的配置并释放周报存储"""
+        self.async_bot.close()
+        self.bot_service.close()
+        self.config.close()
+        self.report_manager.close()
+
+
+def get_services(context: ContextTypes.DEFAULT_TYPE) -> ServiceContainer:
+    """从上下文获取共享服务容器
+
+    Args:
+        context: 上下文对象
+
+    Returns:
+        服务容器实例
+    """
+    return context.bot_data[BOT_DATA_KEY]
@@ -0,0 +1,196 @@
+"""Send dispatcher - Rate-limit-aware concurrent message fan-out"""
+
+import asyncio
+import os
+import time
+from datetime import timedelta
+from typing import Awaitable, Callable, Dict, Iterable
+
+from telegram.error import RetryAfter
+
+from src.utils.logger import setup_logger
+from src.utils.metrics import SEND_FAILURES, TELEGRAM_RETRIES
+from src.utils.stats import summarize
+
+
+logger = setup_logger(__name__)
+
+
+class TokenBucket:
+    """异步令牌桶限速器"""
+
+    def __init__(self, rate: float, capacity: float = 1):
+        """初始化令牌桶
+
+        Args:
+            rate: 每秒补充的令牌数
+            capacity: 桶容量（允许的突发量）
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+
+    def _refill(self, now: float):
+        """按流逝时间补充令牌"""
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def pause(self, seconds: float):
+        """暂停发放令牌（用于服务端要求的 RetryAfter）
+
+        Args:
+            seconds: 暂停秒数
+        """
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+        # 暂停期间不补充令牌：暂停结束时只发放重试所需的一个令牌，之后按速率补充，
+        # 否则结束时会攒满整个桶，立即突发发送并再次触发限流
+        self._tokens = min(1, self.capacity)
+        self._updated = self._blocked_until
+
+    async def acquire(self):
+        """获取一个令牌，不足时等待"""
+        while True:
+            now = time.monotonic()
+            if now < self._blocked_until:
+                await asyncio.sleep(self._blocked_until - now)
+                continue
+            self._refill(now)
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class SendDispatcher:
+    """消息分发器
+
+    对所有群组并发发送消息，同时遵守 Telegram 的全局和单聊天发送频率限制：
+    - 并发数由信号量限制
+    - 全局和每个聊天各有一个令牌桶
+    - 遇到 RetryAfter 时按服务端给出的时间暂停该聊天后重试
+    """
+
+    def __init__(self, max_concurrency: int = None, global_rate: float = None,
+                 per_chat_rate: float = None, max_retries: int = 3):
+        """初始化分发器
+
+        Args:
+            max_concurrency: 最大并发数，默认读取环境变量 SEND_CONCURRENCY (16)
+            global_rate: 全局每秒发送数，默认读取 SEND_GLOBAL_RATE (30)
+            per_chat_rate: 单聊天每秒发送数，默认读取 SEND_CHAT_RATE (约 20 条/分钟)
+            max_retries: RetryAfter 最大重试次数
+        """
+        self.max_concurrency = max_concurrency or int(os.environ.get("SEND_CONCURRENCY", "16"))
+        global_rate = global_rate or float(os.environ.get("SEND_GLOBAL_RATE", "30"))
+        self.per_chat_rate = per_chat_rate or float(os.environ.get("SEND_CHAT_RATE", "0.33"))
+        self.max_retries = max_retries
+
+        self._global_bucket = TokenBucket(global_rate, capacity=global_rate)
+        self._chat_buckets: Dict[int, TokenBucket] = {}
+
+        self.sent = 0
+        self.failed = 0
+        self.retries = 0
+
+    def _chat_bucket(self, chat_id: int) -> TokenBucket:
+        """获取聊天级令牌桶"""
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            # 群组允许短时突发 3 条，长期速率受 per_chat_rate 限制
+            bucket = self._chat_buckets[chat_id] = TokenBucket(self.per_chat_rate, capacity=3)
+        return bucket
+
+    async def send(self, chat_id: int, send_fn: Callable[[], Awaitable]):
+        """限速发送一条消息
+
+        Args:
+            chat_id: 目标聊天ID
+            send_fn: 无参协程工厂，执行实际发送（重试时会再次调用）
+
+        Returns:
+            send_fn 的返回值
+        """
+        chat_bucket = self._chat_bucket(chat_id)
+        for attempt in range(self.max_retries + 1):
+            await chat_bucket.acquire()
+            await self._global_bucket.acquire()
+            try:
+                result = await send_fn()
+                self.sent += 1
+                return result
+            except RetryAfter as e:
+                if attempt >= self.max_retries:
+                    self.failed += 1
+                    SEND_FAILURES.inc()
+                    raise
+                delay = e.retry_after
+                if isinstance(delay, timedelta):
+                    delay = delay.total_seconds()
+                self.retries += 1
+                TELEGRAM_RETRIES.inc()
+                logger.warning(f"聊天 {chat_id} 触发限流，{delay} 秒后重试")
+                chat_bucket.pause(delay)
+            except Exception:
+                self.failed += 1
+                SEND_FAILURES.inc()
+                raise
+
+    async def run_all(self, chat_ids: Iterable[int],
+                      worker: Callable[[int], Awaitable]) -> dict:
+        """对多个聊天并发执行任务
+
+        单个聊天失败不影响其他聊天。
+
+        Args:
+            chat_ids: 聊天ID列表
+            worker: 以聊天ID为参数的协程函数，内部应通过 send() 发送消息
+
+        Returns:
+            本次运行报告 {"total", "failed", "duration", "latency": {...}}
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        latencies = []
+        failures = 0
+
+        async def run_one(chat_id: int):
+            nonlocal failures
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    await worker(chat_id)
+                except Exception as e:
+                    failures += 1
+                    logger.error(f"向聊天 {chat_id} 分发失败: {e}")
+                finally:
+                    latencies.append(time.perf_counter() - start)
+
+        started = time.perf_counter()
+        chat_ids = list(chat_ids)
+        await asyncio.gather(*(run_one(chat_id) for chat_id in chat_ids))
+
+        report = {
+            "total": len(chat_ids),
+            "failed": failures,
+            "duration": time.perf_counter() - started,
+            "latency": summarize(latencies),
+        }
+        logger.info(
+            f"分发完成: {report['total']} 个聊天，失败 {failures} 个，"
+            f"耗时 {report['duration']:.2f}s，"
+            f"p50 {report['latency']['p50']:.3f}s / p99 {report['latency']['p99']:.3f}s"
+        )
+        return report
+
+    def get_stats(self) -> dict:
+        """获取累计发送统计
+
+        Returns:
+            统计字典
+        """
+        return {
+            "sent": self.sent,
+            "failed": self.failed,
+            "retries": self.retries,
+        }
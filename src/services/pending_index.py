@@ -0,0 +1,236 @@
+"""Pending-member index - Incrementally maintained per-group pending sets"""
+
+import threading
+from typing import Dict, List, Optional, Set
+
+from src.models.config import Config
+from src.models.report import WeeklyReport
+from src.utils.logger import setup_logger
+
+
+logger = setup_logger(__name__)
+
+
+class _Entry:
+    """单个群组当前周的索引条目"""
+
+    __slots__ = ("week", "token", "reloads", "pending", "submitted")
+
+    def __init__(self, week: str, token, reloads: int,
+                 pending: Dict[int, str], submitted: Set[int]):
+        self.week = week
+        self.token = token
+        self.reloads = reloads
+        self.pending = pending
+        self.submitted = submitted
+
+
+class PendingIndex:
+    """按群组维护当前周的未提交成员
+
+    每个群组的未提交成员在首次查询时完整计算一次，之后由提交周报、增删成员
+    和排除列表变化增量更新，查询只需复制结果 (O(k))，计数为 O(1)。
+
+    条目以整数ID为键，按成员加入顺序排列；成员表来自配置的成员表快照
+    (Config.membership)，只有存储返回的已提交ID在重建时转换一次。
+
+    其他进程的修改无法增量感知：条目记录了构建时的周报存储版本标记和
+    配置重新加载次数，任一变化（或跨周）时该群组在下一次查询时重建。
+    """
+
+    def __init__(self, config: Config, report_manager: WeeklyReport):
+        """初始化索引
+
+        Args:
+            config: 配置管理实例
+            report_manager: 周报管理实例
+        """
+        self.config = config
+        self.report_manager = report_manager
+        self._entries: Dict[int, _Entry] = {}
+        self._lock = threading.RLock()
+        self.rebuilds = 0
+        report_manager.clock.subscribe(self._on_rollover)
+
+    def _on_rollover(self, old_week: str, new_week: str, tz: Optional[str]):
+        """跨周事件回调：丢弃旧周的条目，下一次查询时按新周重建"""
+        with self._lock:
+            for group_id in [g for g, entry in self._entries.items() if entry.week == old_week]:
+                del self._entries[group_id]
+
+    def close(self):
+        """取消跨周事件订阅并清空索引（周时钟为进程共享，不取消会一直持有本索引）"""
+        self.report_manager.clock.unsubscribe(self._on_rollover)
+        with self._lock:
+            self._entries.clear()
+
+    def _token(self, group_id: int, week: str):
+        return self.report_manager.store.version_token(group_id, week)
+
+    def _compute(self, group_id: int, week: str) -> tuple:
+        """完整计算群组的 (未提交成员, 已提交ID)"""
+        members = self.config.membership.group(group_id)
+        submitted = {
+            int(user_id) for user_id in self.report_manager.store.submitted_user_ids(group_id, week)
+        }
+        required = self.config.filter_excluded(members.ids, group_id)
+        required.difference_update(submitted)
+        pending = {
+            user_id: username for user_id, username in members.items() if user_id in required
+        }
+        return pending, submitted
+
+    def _entry(self, group_id: int) -> _Entry:
+        """获取有效的索引条目，过期时重建（调用方须持有 _lock）"""
+        week = self.report_manager.current_week(group_id)
+        token = self._token(group_id, week)
+        reloads = self.config.reload_count
+        entry = self._entries.get(group_id)
+        if (entry is None or entry.week != week or token is None
+                or entry.token != token or entry.reloads != reloads):
+            pending, submitted = self._compute(group_id, week)
+            entry = _Entry(week, token, reloads, pending, submitted)
+            self._entries[group_id] = entry
+            self.rebuilds += 1
+        return entry
+
+    def get_pending(self, group_id: int, week: str = None) -> List[dict]:
+        """获取未提交成员
+
+        Args:
+            group_id: 群组ID
+            week: 周标识，默认为当前周；其他周（如截止提醒对应的上一周）
+                不经过索引，直接完整计算
+
+        Returns:
+            未提交成员列表 [{"user_id", "username"}]
+        """
+        with self._lock:
+            if week is not None and week != self.report_manager.current_week(group_id):
+                pending, _ = self._compute(group_id, week)
+            else:
+                pending = self._entry(group_id).pending
+            return [
+                {"user_id": user_id, "username": username}
+                for user_id, username in pending.items()
+            ]
+
+    def count_pending(self, group_id: int) -> int:
+        """获取未提交成员数
+
+        Args:
+            group_id: 群组ID
+
+        Returns:
+            未提交成员数
+        """
+        with self._lock:
+            return len(self._entry(group_id).pending)
+
+    def _cached(self, group_id: int) -> Optional[_Entry]:
+        """获取已建立的当前周条目，不存在时返回 None（无需增量更新，查询时会完整计算）"""
+        entry = self._entries.get(group_id)
+        if entry is None or entry.week != self.report_manager.current_week(group_id):
+            return None
+        return entry
+
+    def on_member_added(self, group_id: int, user_id: int, username: str):
+        """成员加入群组后调用"""
+        with self._lock:
+            entry = self._cached(group_id)
+            if entry is None:
+                return
+            if user_id in entry.submitted or self.config.is_user_excluded(user_id, group_id):
+                entry.pending.pop(user_id, None)
+            else:
+                entry.pending[user_id] = username
+
+    def on_member_removed(self, group_id: int, user_id: int):
+        """成员移出群组后调用"""
+        with self._lock:
+            entry = self._cached(group_id)
+            if entry is not None:
+                entry.pending.pop(user_id, None)
+
+    def on_report_added(self, group_id: int, user_id: int, week: str = None):
+        """周报写入存储后调用
+
+        Args:
+            group_id: 群组ID
+            user_id: 用户ID
+            week: 周报所属周，默认为当前周
+        """
+        with self._lock:
+            entry = self._cached(group_id)
+            if entry is None or (week is not None and week != entry.week):
+                return
+            entry.submitted.add(user_id)
+            entry.pending.pop(user_id, None)
+            # 本进程的写入已经反映在索引中，记录写入后的版本标记
+            entry.token = self._token(group_id, entry.week)
+
+    def _scoped(self, group_id: Optional[int]) -> List[tuple]:
+        """受排除列表变化影响的 (群组ID, 条目)（调用方须持有 _lock）"""
+        if group_id is None:
+            return list(self._entries.items())
+        entry = self._entries.get(group_id)
+        return [] if entry is None else [(group_id, entry)]
+
+    def on_user_excluded(self, user_id: int, group_id: int = None):
+        """用户加入排除列表后调用
+
+        Args:
+            user_id: 用户ID
+            group_id: 群组排除列表所属的群组，为 None 时表示全局排除列表
+        """
+        with self._lock:
+            for _, entry in self._scoped(group_id):
+                entry.pending.pop(user_id, None)
+
+    def on_user_included(self, user_id: int, group_id: int = None):
+        """用户移出排除列表后调用（仍在另一个排除列表中的群组不受影响）
+
+        Args:
+            user_id: 用户ID
+            group_id: 群组排除列表所属的群组，为 None 时表示全局排除列表
+        """
+        with self._lock:
+            for entry_group_id, entry in self._scoped(group_id):
+                if (user_id in entry.submitted
+                        or self.config.is_user_excluded(user_id, entry_group_id)):
+                    continue
+                username = self.config.membership.group(entry_group_id).username(user_id)
+                if username is not None:
+                    entry.pending[user_id] = username
+
+    def invalidate(self, group_id: int = None):
+        """丢弃群组（默认全部）的索引，下一次查询时完整计算
+
+        Args:
+            group_id: 群组ID
+        """
+        with self._lock:
+            if group_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(group_id, None)
+
+    def check(self, group_id: int) -> dict:
+        """将索引与完整计算的结果比较
+
+        Args:
+            group_id: 群组ID
+
+        Returns:
+            {"consistent", "missing", "extra"}，missing 为索引漏掉的未提交成员ID，
+            extra 为索引中多出的成员ID
+        """
+        with self._lock:
+            entry = self._entry(group_id)
+            expected, _ = self._compute(group_id, entry.week)
+            indexed = set(entry.pending)
+        missing = sorted(set(expected) - indexed)
+        extra = sorted(indexed - set(expected))
+        if missing or extra:
+            logger.warning(f"群 {group_id} 未提交成员索引不一致: 缺少 {missing}，多出 {extra}")
+        return {"consistent": not missing and not extra, "missing": missing, "extra": extra}
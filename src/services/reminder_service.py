@@ -1,12 +1,14 @@
 """Reminder service - Handle scheduled reminders"""
 
 import logging
-from typing import List
+from typing import Dict, List
 
 from telegram import Bot
 from telegram.constants import ParseMode
 
+from src.services.async_bot_service import AsyncBotService
 from src.services.bot_service import BotService
+from src.services.dispatcher import SendDispatcher
 from src.utils.logger import setup_logger
 
 
@@ -16,60 +18,107 @@ logger = setup_logger(__name__)
 class ReminderService:
     """提醒服务类"""
 
-    def __init__(self, bot_service: BotService):
+    def __init__(self, bot_service: BotService, dispatcher: SendDispatcher = None,
+                 async_bot: AsyncBotService = None, shard=None):
         """初始化提醒服务
 
         Args:
             bot_service: Bot 服务实例
+            dispatcher: 消息分发器
+            async_bot: 异步门面，提供时在存储线程中读取未提交成员
+            shard: 分片部署时本进程负责的分片，只提醒属于本分片的群组
         """
         self.bot_service = bot_service
+        self.dispatcher = dispatcher or SendDispatcher()
+        self.async_bot = async_bot
+        self.shard = shard
 
-    async def send_reminder_to_group(self, bot: Bot, group_id: int):
-        """向指定群组发送提醒
+    async def _remind_group(self, bot: Bot, group_id: int, week: str = None):
+        """向指定群组发送提醒，失败时抛出异常
 
         Args:
             bot: Telegram Bot 实例
             group_id: 群组ID
+            week: 检查提交情况的周，默认为当前周
         """
-        pending = self.bot_service.get_pending_members(group_id)
+        if self.async_bot is not None:
+            pending = await self.async_bot.get_pending_members(group_id, week)
+        else:
+            pending = self.bot_service.get_pending_members(group_id, week=week)
 
         if not pending:
             logger.info(f"群 {group_id} 所有人都已提交周报")
             return
 
-        reminder_text = self._build_reminder_text(pending)
+        # 只有不是当前周（如截止提醒检查的上一周）时才在提醒中写明周标识
+        if week == self.bot_service.report_manager.current_week(group_id):
+            week = None
+        reminder_text = self._build_reminder_text(pending, week)
+
+        await self.dispatcher.send(group_id, lambda: bot.send_message(
+            chat_id=group_id,
+            text=reminder_text,
+            parse_mode=ParseMode.MARKDOWN
+        ))
+        logger.info(f"已向群 {group_id} 发送提醒")
+
+    async def send_reminder_to_group(self, bot: Bot, group_id: int):
+        """向指定群组发送提醒
 
+        Args:
+            bot: Telegram Bot 实例
+            group_id: 群组ID
+        """
         try:
-            await bot.send_message(
-                chat_id=group_id,
-                text=reminder_text,
-                parse_mode=ParseMode.MARKDOWN
-            )
-            logger.info(f"已向群 {group_id} 发送提醒")
+            await self._remind_group(bot, group_id)
         except Exception as e:
             logger.error(f"发送提醒失败 (群 {group_id}): {e}")
 
-    async def send_reminder_to_all_groups(self, bot: Bot):
-        """向所有群组发送提醒
+    async def send_reminder_to_all_groups(self, bot: Bot) -> dict:
+        """向所有群组并发发送提醒
 
         Args:
             bot: Telegram Bot 实例
+
+        Returns:
+            分发报告（耗时分位数和失败数）
         """
-        groups = self.bot_service.get_all_groups()
+        group_ids = [
+            group_id for group_id in self.bot_service.config.group_ids()
+            if self.shard is None or self.shard.owns(group_id)
+        ]
+        return await self.send_reminders(bot, group_ids)
 
-        for group_id in groups.keys():
-            await self.send_reminder_to_group(bot, int(group_id))
+    async def send_reminders(self, bot: Bot, group_ids: List[int],
+                             weeks: Dict[int, str] = None) -> dict:
+        """向指定的多个群组并发发送提醒
+
+        Args:
+            bot: Telegram Bot 实例
+            group_ids: 群组ID列表
+            weeks: 各群组检查提交情况的周 {群组ID: 周标识}，未列出的群组为当前周
+
+        Returns:
+            分发报告（耗时分位数和失败数）
+        """
+        weeks = weeks or {}
+        return await self.dispatcher.run_all(
+            group_ids,
+            lambda group_id: self._remind_group(bot, group_id, weeks.get(group_id))
+        )
 
-    def _build_reminder_text(self, pending_members: List[dict]) -> str:
+    def _build_reminder_text(self, pending_members: List[dict], week: str = None) -> str:
         """构建提醒消息文本
 
         Args:
             pending_members: 未提交成员列表
+            week: 周标识，为 None 时表示本周
 
         Returns:
             提醒消息文本
         """
-        reminder_text = "⏰ **周报提醒**\n\n以下同学还未提交本周周报，请尽快提交：\n\n"
+        label = f" {week} " if week else "本周"
+        reminder_text = f"⏰ **周报提醒**\n\n以下同学还未提交{label}周报，请尽快提交：\n\n"
 
         mentions = []
         for member in pending_members:
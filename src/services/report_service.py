@@ -2,12 +2,14 @@
 
 import logging
 from pathlib import Path
+from typing import List
 
 from telegram.constants import ParseMode
 
 from src.services.bot_service import BotService
+from src.utils.keyword_matcher import KeywordMatcher
 from src.utils.logger import setup_logger
-from src.utils.time_utils import get_current_week
+from src.utils.text_render import render_excluded, render_members, render_status
 
 
 logger = setup_logger(__name__)
@@ -23,37 +25,52 @@ class ReportService:
             bot_service: Bot 服务实例
         """
         self.bot_service = bot_service
+        self._matcher = None
+        self._matcher_key = None
 
-    def get_status_text(self, group_id: int, week: str = None) -> str:
-        """获取状态文本
+    def get_status_blocks(self, group_id: int, week: str = None) -> List[str]:
+        """获取状态文本块
 
         Args:
             group_id: 群组ID
             week: 周标识，默认为当前周
 
         Returns:
-            状态文本
+            文本块列表
         """
         if week is None:
-            week = get_current_week()
+            week = self.bot_service.report_manager.current_week(group_id)
 
         stats = self.bot_service.get_report_stats(group_id, week)
         pending_members = self.bot_service.get_pending_members(group_id)
 
-        status_text = f"📊 **{week} 周报状态**\n\n"
-        status_text += f"已提交: {stats['submitted']}/{stats['total']}\n\n"
+        return render_status(
+            week, stats['submitted'], stats['total'], stats['reports'], pending_members
+        )
 
-        if stats['reports']:
-            status_text += "✅ **已提交:**\n"
-            for user_id, report in stats['reports'].items():
-                status_text += f"  • {report['username']}\n"
+    def get_status_text(self, group_id: int, week: str = None) -> str:
+        """获取状态文本
 
-        if pending_members:
-            status_text += f"\n⏳ **未提交 ({len(pending_members)}人):**\n"
-            for member in pending_members:
-                status_text += f"  • {member['username']}\n"
+        Args:
+            group_id: 群组ID
+            week: 周标识，默认为当前周
 
-        return status_text
+        Returns:
+            状态文本
+        """
+        return "".join(self.get_status_blocks(group_id, week))
+
+    def get_summary_blocks(self, group_id: int, week: str = None) -> List[str]:
+        """获取汇总文本块（每份周报一个块）
+
+        Args:
+            group_id: 群组ID
+            week: 周标识，默认为当前周
+
+        Returns:
+            文本块列表
+        """
+        return self.bot_service.generate_summary_blocks(group_id, week)
 
     def get_summary_text(self, group_id: int, week: str = None) -> str:
         """获取汇总文本
@@ -65,7 +82,18 @@ class ReportService:
         Returns:
             汇总文本
         """
-        return self.bot_service.generate_summary(group_id, week)
+        return "".join(self.get_summary_blocks(group_id, week))
+
+    def get_members_blocks(self, group_id: int) -> List[str]:
+        """获取成员列表文本块
+
+        Args:
+            group_id: 群组ID
+
+        Returns:
+            文本块列表
+        """
+        return render_members(self.bot_service.get_group_members(group_id).names)
 
     def get_members_text(self, group_id: int) -> str:
         """获取成员列表文本
@@ -76,28 +104,35 @@ class ReportService:
         Returns:
             成员列表文本
         """
-        members = self.bot_service.get_group_members(group_id)
+        return "".join(self.get_members_blocks(group_id))
 
-        if not members:
-            return "暂无注册成员，请使用 /register 注册"
+    def get_excluded_blocks(self, group_id: int = None) -> List[str]:
+        """获取排除列表文本块
 
-        text = f"👥 **已注册成员 ({len(members)}人)**\n\n"
-        for user_id, username in members.items():
-            text += f"• {username}\n"
+        Args:
+            group_id: 群组ID，指定时同时列出该群组的排除列表
 
-        return text
+        Returns:
+            文本块列表
+        """
+        config = self.bot_service.config
+        group_excluded = config.get_excluded_users(group_id) if group_id is not None else None
+        return render_excluded(config.get_excluded_users(), group_excluded)
 
-    def get_export_file(self, group_id: int, week: str = None) -> Path:
+    def get_export_file(self, group_id: int, week: str = None,
+                        weeks: list = None, compress: bool = False) -> Path:
         """获取导出文件路径
 
         Args:
             group_id: 群组ID
             week: 周标识，默认为当前周
+            weeks: 周标识列表，指定时导出多周归档
+            compress: 是否 gzip 压缩
 
         Returns:
             导出文件路径
         """
-        return self.bot_service.export_report(group_id, week)
+        return self.bot_service.export_report(group_id, week, weeks, compress)
 
     def check_if_report_message(self, text: str) -> bool:
         """检查消息是否包含周报关键词
@@ -108,5 +143,20 @@ class ReportService:
         Returns:
             是否是周报消息
         """
-        keywords = self.bot_service.get_report_keywords()
-        return any(keyword in text for keyword in keywords)
+        return self.get_keyword_matcher().search(text)
+
+    def get_keyword_matcher(self) -> KeywordMatcher:
+        """获取编译好的关键词匹配器，关键词配置变化时重新编译
+
+        Returns:
+            关键词匹配器
+        """
+        key = (
+            tuple(self.bot_service.get_report_keywords()),
+            self.bot_service.config.get_report_keywords_ignore_case()
+        )
+        if key != self._matcher_key:
+            self._matcher = KeywordMatcher(key[0], ignore_case=key[1])
+            self._matcher_key = key
+            logger.info(f"关键词匹配器已编译: {len(key[0])} 个关键词")
+        return self._matcher
@@ -0,0 +1,275 @@
+"""Schedule service - Per-group, timezone-aware reminder due-queue"""
+
+import heapq
+import os
+import time
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from src.models.config import SETTINGS_SECTION, Config
+from src.models.membership import group_section
+from src.utils.logger import setup_logger
+from src.utils.time_utils import week_key
+
+
+logger = setup_logger(__name__)
+
+
+# 提醒类型：提醒日的首次提醒和截止时的最后提醒
+REMINDER = "reminder"
+DEADLINE = "deadline"
+
+
+def parse_timezone(name: str) -> ZoneInfo:
+    """解析 IANA 时区名
+
+    Args:
+        name: 时区名 (如 Asia/Shanghai)
+
+    Returns:
+        时区对象
+
+    Raises:
+        ValueError: 时区不存在
+    """
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"未知的时区: {name}") from None
+
+
+def spread_offset(group_id: int, spread: int) -> int:
+    """计算群组在提醒时刻之后的固定错峰秒数
+
+    使用 crc32 而不是 hash()：结果与进程无关，重启后群组的提醒时刻不变。
+
+    Args:
+        group_id: 群组ID
+        spread: 错峰窗口（秒），为 0 时不错峰
+
+    Returns:
+        0..spread-1 之间的秒数
+    """
+    if spread <= 0:
+        return 0
+    return zlib.crc32(str(group_id).encode()) % spread
+
+
+def next_fire_time(tz: ZoneInfo, weekday: int, hour: int, offset: int, after: float) -> float:
+    """计算 after 之后下一次“每周 weekday 的 hour 点 + offset 秒”的时刻
+
+    Args:
+        tz: 时区
+        weekday: 星期 (0=周一, 6=周日)
+        hour: 当地小时
+        offset: 错峰秒数
+        after: 起始时刻 (UNIX 时间戳)
+
+    Returns:
+        下一次触发的 UNIX 时间戳（严格晚于 after）
+    """
+    local = datetime.fromtimestamp(after, tz)
+    day = local.date() + timedelta(days=(weekday - local.weekday()) % 7)
+    while True:
+        # 每次按当地日期重新构造，跨夏令时切换时仍落在当地的同一钟点
+        fire = datetime(day.year, day.month, day.day, hour, tzinfo=tz).timestamp() + offset
+        if fire > after:
+            return fire
+        day += timedelta(days=7)
+
+
+class GroupSchedule(NamedTuple):
+    """群组解析后的提醒时间"""
+
+    timezone: str
+    reminder_day: int
+    reminder_hour: int
+    deadline_day: int
+    deadline_hour: int
+    offset: int
+
+
+class ScheduleService:
+    """按群组时区和提醒时间调度提醒的到期队列
+
+    所有群组的下一次提醒时刻保存在一个最小堆中，定时任务每次只检查堆顶，
+    取出一个到期项并放入它的下一次时刻都是 O(log n)。配置变化时按分区修改
+    计数找出配置有变化的群组，只重新解析和计算这些群组；全局默认值变化时
+    所有群组都要检查。旧的堆项通过代数标记失效，在弹出时丢弃。
+    """
+
+    def __init__(self, config: Config, shard=None, spread: int = None):
+        """初始化调度服务
+
+        Args:
+            config: 配置管理实例
+            shard: 分片部署时本进程负责的分片，只调度属于本分片的群组
+            spread: 同一时刻的群组错峰窗口（秒），默认读取环境变量 REMINDER_SPREAD
+        """
+        self.config = config
+        self.shard = shard
+        if spread is None:
+            spread = int(os.environ.get("REMINDER_SPREAD", "600"))
+        self.spread = spread
+        # 堆项: (触发时刻, 群组ID, 提醒类型, 代数)
+        self._heap: List[Tuple[float, int, str, int]] = []
+        self._schedules: Dict[int, GroupSchedule] = {}
+        self._generations: Dict[int, int] = {}
+        # 群组上次解析时的 (顶层设置, 群组配置) 分区修改计数
+        self._sections: Dict[int, tuple] = {}
+        self._revision = None
+        self._fired = 0
+
+    def _resolve(self, group_id: int) -> GroupSchedule:
+        """读取群组设置并校验，无效的时区回退到 UTC"""
+        settings = self.config.get_group_schedule(group_id)
+        tz_name = settings["timezone"]
+        try:
+            parse_timezone(tz_name)
+        except ValueError as e:
+            logger.warning(f"群 {group_id} {e}，使用 UTC")
+            tz_name = "UTC"
+        return GroupSchedule(
+            tz_name,
+            int(settings["reminder_day"]) % 7,
+            int(settings["reminder_hour"]) % 24,
+            int(settings["deadline_day"]) % 7,
+            int(settings["deadline_hour"]) % 24,
+            spread_offset(group_id, self.spread),
+        )
+
+    def _push(self, group_id: int, kind: str, after: float):
+        """放入群组某类提醒的下一次触发时刻"""
+        schedule = self._schedules[group_id]
+        if kind == REMINDER:
+            day, hour = schedule.reminder_day, schedule.reminder_hour
+        else:
+            day, hour = schedule.deadline_day, schedule.deadline_hour
+        fire = next_fire_time(parse_timezone(schedule.timezone), day, hour, schedule.offset, after)
+        heapq.heappush(self._heap, (fire, group_id, kind, self._generations[group_id]))
+
+    def sync(self, now: float = None) -> int:
+        """配置变化时更新群组的提醒时刻
+
+        Args:
+            now: 当前时刻 (UNIX 时间戳)，默认为系统时间
+
+        Returns:
+            重新调度的群组数
+        """
+        revision = self.config.revision
+        if revision == self._revision:
+            return 0
+        self._revision = revision
+        now = time.time() if now is None else now
+
+        owned = [
+            group_id for group_id in self.config.group_ids()
+            if self.shard is None or self.shard.owns(group_id)
+        ]
+        settings = self.config.section_revision(SETTINGS_SECTION)
+        changed = 0
+        for group_id in owned:
+            sections = (settings, self.config.section_revision(group_section(group_id)))
+            if self._sections.get(group_id) == sections:
+                continue
+            self._sections[group_id] = sections
+            schedule = self._resolve(group_id)
+            if self._schedules.get(group_id) == schedule:
+                continue
+            self._schedules[group_id] = schedule
+            self._generations[group_id] = self._generations.get(group_id, 0) + 1
+            self._push(group_id, REMINDER, now)
+            self._push(group_id, DEADLINE, now)
+            changed += 1
+
+        # 已删除的群组：丢弃设置，堆中的旧项在弹出时因找不到代数而被跳过
+        for group_id in set(self._schedules) - set(owned):
+            del self._schedules[group_id]
+            del self._generations[group_id]
+            self._sections.pop(group_id, None)
+
+        # 失效项过多时重建堆，避免频繁修改设置导致堆无限增长
+        if len(self._heap) > 4 * max(len(self._schedules), 16):
+            self._heap = [
+                entry for entry in self._heap
+                if self._generations.get(entry[1]) == entry[3]
+            ]
+            heapq.heapify(self._heap)
+
+        if changed:
+            logger.info(f"已更新 {changed} 个群组的提醒时间，共调度 {len(self._schedules)} 个群组")
+        return changed
+
+    def target_week(self, group_id: int, kind: str, fire: float) -> str:
+        """计算一次提醒针对的周
+
+        提醒针对触发当天所在的周；截止提醒针对它截止的那一周，即截止时刻之前
+        最近一次提醒日所在的周。例如周五提醒、周一 10:00 截止时，截止提醒
+        触发时已是新的一周，检查的是上一周的提交情况。
+
+        Args:
+            group_id: 群组ID（须已调度）
+            kind: 提醒类型
+            fire: 触发时刻 (UNIX 时间戳)
+
+        Returns:
+            周标识
+        """
+        schedule = self._schedules[group_id]
+        local = datetime.fromtimestamp(fire - schedule.offset, parse_timezone(schedule.timezone))
+        if kind == DEADLINE:
+            days_back = (schedule.deadline_day - schedule.reminder_day) % 7
+            if days_back == 0 and schedule.deadline_hour <= schedule.reminder_hour:
+                days_back = 7
+            local -= timedelta(days=days_back)
+        return week_key(local.date())
+
+    def pop_due(self, now: float = None) -> List[Tuple[int, str, str]]:
+        """取出所有到期的提醒，并放入它们的下一次时刻
+
+        错过多次触发（如进程暂停）时只提醒一次，下一次时刻从 now 开始计算。
+
+        Args:
+            now: 当前时刻 (UNIX 时间戳)，默认为系统时间
+
+        Returns:
+            到期的 (群组ID, 提醒类型, 针对的周) 列表，按触发时刻排序
+        """
+        now = time.time() if now is None else now
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            fire, group_id, kind, generation = heapq.heappop(self._heap)
+            if self._generations.get(group_id) != generation:
+                continue
+            due.append((group_id, kind, self.target_week(group_id, kind, fire)))
+            self._push(group_id, kind, now)
+        self._fired += len(due)
+        return due
+
+    def next_fire(self) -> Optional[datetime]:
+        """获取最近一次有效提醒的时刻
+
+        Returns:
+            UTC 时间，没有调度任何群组时返回 None
+        """
+        while self._heap and self._generations.get(self._heap[0][1]) != self._heap[0][3]:
+            heapq.heappop(self._heap)
+        if not self._heap:
+            return None
+        return datetime.fromtimestamp(self._heap[0][0], timezone.utc)
+
+    def get_stats(self) -> dict:
+        """获取调度统计
+
+        Returns:
+            {"groups", "queued", "fired", "next_fire"}，queued 包含尚未清理的失效项
+        """
+        return {
+            "groups": len(self._schedules),
+            "queued": len(self._heap),
+            "fired": self._fired,
+            "next_fire": self.next_fire(),
+        }
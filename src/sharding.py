@@ -0,0 +1,187 @@
+"""Sharded deployment - route updates to worker processes by chat"""
+
+import asyncio
+import os
+from typing import Dict, Iterable, List
+
+from telegram import Update
+from telegram.ext import Application, ContextTypes, TypeHandler
+
+from src.utils.logger import setup_logger
+
+
+logger = setup_logger(__name__)
+
+
+# Application.bot_data 中保存分片路由器的键
+ROUTER_KEY = "shard_router"
+
+
+def shard_for(chat_id: int, count: int) -> int:
+    """计算聊天所属的分片
+
+    使用取模而不是 hash()：结果与进程、Python 版本无关，重启后群组仍落在同一分片。
+
+    Args:
+        chat_id: 聊天ID（群组ID为负数）
+        count: 分片总数
+
+    Returns:
+        分片序号 (0..count-1)
+    """
+    return int(chat_id) % count
+
+
+class ShardSpec:
+    """当前进程负责的分片"""
+
+    __slots__ = ("index", "count")
+
+    def __init__(self, index: int, count: int):
+        """初始化分片描述
+
+        Args:
+            index: 分片序号
+            count: 分片总数
+        """
+        self.index = index
+        self.count = count
+
+    def owns(self, chat_id) -> bool:
+        """判断群组是否属于本分片
+
+        Args:
+            chat_id: 群组ID（整数或配置中的字符串键）
+
+        Returns:
+            是否属于本分片
+        """
+        return shard_for(int(chat_id), self.count) == self.index
+
+    def __str__(self) -> str:
+        return f"shard {self.index}/{self.count}"
+
+
+def describe_shards(group_ids: Iterable, count: int) -> Dict[int, List[int]]:
+    """计算群组在各分片上的分布
+
+    Args:
+        group_ids: 群组ID序列
+        count: 分片总数
+
+    Returns:
+        {分片序号: [群组ID]}，包含没有群组的分片
+    """
+    membership = {index: [] for index in range(count)}
+    for group_id in group_ids:
+        membership[shard_for(int(group_id), count)].append(int(group_id))
+    return membership
+
+
+class ShardRouter:
+    """前端路由器：把更新按聊天转发到对应工作进程的队列
+
+    前端 Application 按顺序处理更新，同一聊天的更新按到达顺序进入同一个队列，
+    工作进程内部仍保持按聊天串行，因此整体顺序不变。
+    """
+
+    def __init__(self, queues: list):
+        """初始化路由器
+
+        Args:
+            queues: 每个分片一个 multiprocessing 队列
+        """
+        self.queues = queues
+        self.routed = [0] * len(queues)
+
+    async def route(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """转发一条更新（TypeHandler 回调）
+
+        Args:
+            update: Telegram 更新对象
+            context: 上下文对象
+        """
+        chat = update.effective_chat
+        # 没有聊天的更新（当前未订阅）固定交给 0 号分片
+        index = shard_for(chat.id, len(self.queues)) if chat is not None else 0
+        self.queues[index].put(update.to_dict())
+        self.routed[index] += 1
+
+    def get_stats(self) -> List[dict]:
+        """获取各分片负载
+
+        Returns:
+            每个分片的 {"shard", "routed", "backlog"}，backlog 为队列中尚未被
+            工作进程取走的更新数（平台不支持时为 None）
+        """
+        stats = []
+        for index, queue in enumerate(self.queues):
+            try:
+                backlog = queue.qsize()
+            except NotImplementedError:  # macOS 不支持 qsize
+                backlog = None
+            stats.append({"shard": index, "routed": self.routed[index], "backlog": backlog})
+        return stats
+
+    async def log_stats(self, context: ContextTypes.DEFAULT_TYPE):
+        """定时记录各分片负载（JobQueue 回调）
+
+        Args:
+            context: 上下文对象
+        """
+        logger.info(f"分片负载: {self.get_stats()}")
+
+
+def build_router_application(token: str, queues: list, group_ids: Iterable = (),
+                             base_url: str = None) -> Application:
+    """创建分片前端 Application（只接收和转发更新）
+
+    Args:
+        token: Bot Token
+        queues: 每个分片一个 multiprocessing 队列
+        group_ids: 已知群组ID，用于启动时记录分片分布
+        base_url: Bot API 地址
+
+    Returns:
+        前端 Application
+    """
+    builder = Application.builder().token(token)
+    if base_url:
+        builder = builder.base_url(base_url)
+    application = builder.build()
+
+    router = ShardRouter(queues)
+    application.bot_data[ROUTER_KEY] = router
+    application.add_handler(TypeHandler(Update, router.route))
+
+    membership = describe_shards(group_ids, len(queues))
+    for index, groups in membership.items():
+        logger.info(f"分片 {index}: {len(groups)} 个群组 {groups[:20]}")
+
+    interval = float(os.environ.get("SHARD_STATS_INTERVAL", "60"))
+    if interval > 0 and application.job_queue is not None:
+        application.job_queue.run_repeating(
+            router.log_stats, interval=interval, first=interval, name="shard_stats"
+        )
+    return application
+
+
+async def feed_updates(application: Application, queue) -> int:
+    """工作进程：从分片队列读取更新并放入 Application 的更新队列
+
+    Args:
+        application: 工作进程的 Application（已启动，无 Updater）
+        queue: 本分片的 multiprocessing 队列，收到 None 时结束
+
+    Returns:
+        处理的更新数
+    """
+    loop = asyncio.get_running_loop()
+    count = 0
+    while True:
+        # 阻塞读取放到线程中，事件循环继续处理已收到的更新
+        data = await loop.run_in_executor(None, queue.get)
+        if data is None:
+            return count
+        await application.update_queue.put(Update.de_json(data, application.bot))
+        count += 1
@@ -0,0 +1,180 @@
+"""Per-chat ordered concurrent update processing"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Dict, Optional
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+from src.utils.logger import setup_logger
+from src.utils.metrics import UPDATE_WAIT, UPDATES_PROCESSED
+from src.utils.stats import summarize
+
+
+logger = setup_logger(__name__)
+
+
+# 保留最近多少次等待时间样本用于计算分位数
+WAIT_SAMPLES = 1024
+
+
+class _ChatSlot:
+    """单个聊天的串行锁及排队数"""
+
+    __slots__ = ("lock", "waiting")
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.waiting = 0
+
+
+class PerChatUpdateProcessor(BaseUpdateProcessor):
+    """按聊天串行、跨聊天并发的更新处理器
+
+    同一群组的更新严格按到达顺序处理（提交和状态查询保持有序），
+    不同群组并行处理，总并发数不超过 max_concurrent_updates。
+
+    基类的信号量在 do_process_update 之前获取，如果用它限制并发，
+    同一聊天排队的更新会占满名额、饿死其他聊天；因此真正的并发上限在拿到
+    聊天锁之后再获取。
+
+    PTB 在并发模式下为取出的每个更新直接创建任务，不等待处理完成，
+    基类信号量只能让多出的任务等待，无法限制任务数。已调度（排队 + 处理中）
+    的更新数 (max_backlog) 由 BacklogQueue 在取出更新之前限制：积压达到上限时
+    更新留在队列中，队列满后接收端 (polling / webhook / 分片前端) 的 put 随之等待。
+    """
+
+    def __init__(self, max_concurrent_updates: int, max_backlog: int = 1024):
+        """初始化处理器
+
+        Args:
+            max_concurrent_updates: 同时处理的最大更新数
+            max_backlog: 已调度（排队 + 处理中）的最大更新数，需配合 BacklogQueue 使用
+        """
+        self._concurrency = max_concurrent_updates
+        self.max_backlog = max(max_backlog, max_concurrent_updates)
+        super().__init__(self.max_backlog)
+        self._running_slots = asyncio.BoundedSemaphore(max_concurrent_updates)
+        self._backlog = asyncio.Semaphore(self.max_backlog)
+        self._reserved = 0
+        self._chats: Dict[Optional[int], _ChatSlot] = {}
+        self._waits = deque(maxlen=WAIT_SAMPLES)
+        self.running = 0
+        self.waiting = 0
+        self.max_waiting = 0
+        self.processed = 0
+
+    @property
+    def max_concurrent_updates(self) -> int:
+        """同时处理的最大更新数"""
+        return self._concurrency
+
+    async def reserve(self):
+        """为即将取出的更新占用一个积压名额，积压达到上限时等待"""
+        await self._backlog.acquire()
+        self._reserved += 1
+
+    def release(self):
+        """归还一个积压名额（更新处理完成或取出失败时调用）"""
+        if self._reserved > 0:
+            self._reserved -= 1
+            self._backlog.release()
+
+    async def do_process_update(self, update: object, coroutine: "Awaitable[Any]") -> None:
+        """按聊天串行处理更新
+
+        Args:
+            update: 更新对象
+            coroutine: 处理该更新的协程
+        """
+        chat_id = None
+        if isinstance(update, Update) and update.effective_chat is not None:
+            chat_id = update.effective_chat.id
+
+        slot = self._chats.get(chat_id)
+        if slot is None:
+            slot = self._chats[chat_id] = _ChatSlot()
+
+        enqueued = time.perf_counter()
+        started = False
+        slot.waiting += 1
+        self.waiting += 1
+        self.max_waiting = max(self.max_waiting, self.waiting)
+        try:
+            async with slot.lock:
+                async with self._running_slots:
+                    started = True
+                    self.waiting -= 1
+                    slot.waiting -= 1
+                    wait = time.perf_counter() - enqueued
+                    self._waits.append(wait)
+                    UPDATE_WAIT.observe(wait)
+                    self.running += 1
+                    try:
+                        await coroutine
+                    finally:
+                        self.running -= 1
+                        self.processed += 1
+                        UPDATES_PROCESSED.inc()
+        finally:
+            if not started:
+                # 排队期间被取消（如关闭时），修正计数
+                self.waiting -= 1
+                slot.waiting -= 1
+            # 聊天空闲后释放其锁，避免字典随聊天数无限增长
+            if slot.waiting == 0 and not slot.lock.locked():
+                self._chats.pop(chat_id, None)
+            self.release()
+
+    async def initialize(self) -> None:
+        """初始化处理器"""
+        logger.info(f"并发更新处理已启用: 最多 {self._concurrency} 个并发，按聊天串行")
+
+    async def shutdown(self) -> None:
+        """关闭处理器"""
+
+    def get_stats(self) -> dict:
+        """获取队列深度和等待时间统计
+
+        Returns:
+            统计字典，wait 为最近更新从调度到开始处理的等待时间分位数（秒）
+        """
+        return {
+            "running": self.running,
+            "waiting": self.waiting,
+            "max_waiting": self.max_waiting,
+            "active_chats": len(self._chats),
+            "processed": self.processed,
+            "max_concurrent": self._concurrency,
+            "backlog": self._reserved,
+            "max_backlog": self.max_backlog,
+            "wait": summarize(self._waits),
+        }
+
+
+class BacklogQueue(asyncio.Queue):
+    """限制已调度更新数的更新队列 (Application.update_queue)
+
+    get() 先向处理器占用积压名额再取出更新，名额在更新处理完成后归还；
+    积压达到上限时更新留在队列中，队列满时接收端的 put() 等待，形成背压。
+    """
+
+    def __init__(self, processor: PerChatUpdateProcessor, maxsize: int = 0):
+        """初始化队列
+
+        Args:
+            processor: 并发更新处理器
+            maxsize: 尚未调度的最大更新数，0 表示不限
+        """
+        super().__init__(maxsize)
+        self.processor = processor
+
+    async def get(self):
+        await self.processor.reserve()
+        try:
+            return await super().get()
+        except BaseException:
+            self.processor.release()
+            raise
@@ -1,5 +1,12 @@
 """Utility functions"""
 from .logger import setup_logger
-from .time_utils import get_current_week
+from .time_utils import WEEK_CLOCK, WeekClock, get_current_week
+from .file_utils import atomic_write_text
+from .file_lock import FileLock
+from .keyword_matcher import KeywordMatcher
+from .loop_monitor import LoopLagMonitor
+from .metrics import REGISTRY, MetricsRegistry, start_metrics_server
 
-__all__ = ['setup_logger', 'get_current_week']
+__all__ = ['setup_logger', 'get_current_week', 'WeekClock', 'WEEK_CLOCK', 'atomic_write_text',
+           'FileLock', 'KeywordMatcher', 'LoopLagMonitor', 'REGISTRY', 'MetricsRegistry',
+           'start_metrics_server']
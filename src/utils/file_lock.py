@@ -0,0 +1,93 @@
+"""Cross-process advisory file locks"""
+
+import os
+import time
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows：没有 fcntl，退化为无锁（仅支持单进程部署）
+    fcntl = None
+
+from src.utils.logger import setup_logger
+
+
+logger = setup_logger(__name__)
+
+if fcntl is None:
+    logger.warning("当前平台不支持 fcntl，文件锁已禁用，请勿让多个进程共享 data/ 目录")
+
+
+class FileLock:
+    """基于 fcntl.flock 的跨进程建议锁
+
+    锁加在独立的 .lock 文件上，而不是数据文件本身：数据文件通过
+    临时文件 + rename 原子替换，替换后 inode 变化，锁在旧 inode 上会失效。
+
+    每次进入都重新打开锁文件，因此同一进程内的不同线程之间同样互斥。
+
+    用法:
+        with FileLock(path):            # 排他锁（读改写）
+            ...
+        with FileLock(path, shared=True):  # 共享锁（与排他锁互斥，彼此不互斥）
+            ...
+    """
+
+    def __init__(self, path: Path, shared: bool = False, timeout: float = None):
+        """初始化文件锁
+
+        Args:
+            path: 锁文件路径（不存在时自动创建）
+            shared: 是否为共享锁
+            timeout: 等待超时（秒），None 表示一直等待
+        """
+        self.path = Path(path)
+        self.shared = shared
+        self.timeout = timeout
+        self._fd = None
+
+    def acquire(self):
+        """获取锁
+
+        Raises:
+            TimeoutError: 超时仍未获取到锁
+        """
+        if fcntl is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        mode = fcntl.LOCK_SH if self.shared else fcntl.LOCK_EX
+        try:
+            if self.timeout is None:
+                fcntl.flock(fd, mode)
+            else:
+                deadline = time.monotonic() + self.timeout
+                while True:
+                    try:
+                        fcntl.flock(fd, mode | fcntl.LOCK_NB)
+                        break
+                    except BlockingIOError:
+                        if time.monotonic() >= deadline:
+                            raise TimeoutError(f"获取文件锁超时: {self.path}")
+                        time.sleep(0.01)
+        except BaseException:
+            os.close(fd)
+            raise
+        self._fd = fd
+
+    def release(self):
+        """释放锁"""
+        if self._fd is None:
+            return
+        try:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
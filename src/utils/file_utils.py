@@ -0,0 +1,34 @@
+"""File utility functions"""
+
+import os
+import tempfile
+from pathlib import Path
+
+
+def atomic_write_text(path: Path, text: str, encoding: str = 'utf-8'):
+    """原子写入文本文件（临时文件 + rename）
+
+    写入过程中崩溃不会留下半截文件，读者要么看到旧内容，要么看到新内容。
+
+    Args:
+        path: 目标文件路径
+        text: 文件内容
+        encoding: 文件编码
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(
+        dir=path.parent, prefix=f".{path.name}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, 'w', encoding=encoding) as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
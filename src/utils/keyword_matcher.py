@@ -0,0 +1,92 @@
+"""Compiled multi-keyword matcher"""
+
+import re
+from typing import Iterable, Optional
+
+
+class KeywordMatcher:
+    """多关键词匹配器
+
+    将关键词构建成前缀树，再编译为一个因式分解后的正则表达式
+    （共享前缀只比较一次），对每条消息只做一次 C 层扫描，
+    代替逐个关键词的 ``keyword in text``。
+    """
+
+    def __init__(self, keywords: Iterable[str], ignore_case: bool = False):
+        """编译关键词
+
+        Args:
+            keywords: 关键词列表
+            ignore_case: 是否忽略大小写（使用 casefold，支持多语言）
+        """
+        self.ignore_case = ignore_case
+        self.keywords = tuple(keywords)
+
+        normalized = {self._normalize(k) for k in self.keywords}
+        self._match_all = "" in normalized
+        normalized.discard("")
+        self._pattern = re.compile(_trie_to_regex(_build_trie(normalized))) if normalized else None
+
+    def _normalize(self, text: str) -> str:
+        """按大小写设置规范化文本"""
+        return text.casefold() if self.ignore_case else text
+
+    def search(self, text: str) -> bool:
+        """检查文本是否包含任一关键词
+
+        Args:
+            text: 消息文本
+
+        Returns:
+            是否命中
+        """
+        if self._match_all:
+            return True
+        if self._pattern is None:
+            return False
+        return self._pattern.search(self._normalize(text)) is not None
+
+    def find(self, text: str) -> Optional[str]:
+        """返回文本中第一个命中的关键词（规范化后的形式，命中位置取最短关键词）
+
+        Args:
+            text: 消息文本
+
+        Returns:
+            命中的关键词，未命中返回 None
+        """
+        if self._pattern is None:
+            return "" if self._match_all else None
+        match = self._pattern.search(self._normalize(text))
+        return match.group(0) if match else None
+
+
+_END = ""
+
+
+def _build_trie(words: Iterable[str]) -> dict:
+    """构建字符前缀树，_END 键标记单词结束"""
+    root = {}
+    for word in words:
+        node = root
+        for char in word:
+            node = node.setdefault(char, {})
+        node[_END] = {}
+    return root
+
+
+def _trie_to_regex(node: dict) -> str:
+    """将前缀树转换为等价的正则表达式
+
+    只需判断是否命中，因此当前缀本身已是完整关键词时，
+    更长的关键词分支可以直接剪掉。
+    """
+    if _END in node:
+        return ""
+    branches = [
+        re.escape(char) + _trie_to_regex(child)
+        for char, child in sorted(node.items())
+    ]
+    if len(branches) == 1:
+        return branches[0]
+    return "(?:" + "|".join(branches) + ")"
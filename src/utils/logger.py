@@ -1,21 +1,178 @@
-"""Logger configuration"""
+"""Logger configuration - queue-based logging with JSON lines output"""
 
+import atexit
+import contextvars
+import json
 import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+from datetime import datetime, timezone
 from pathlib import Path
+from typing import Dict, Optional
 
 
-def setup_logger(name: str = __name__, level: int = logging.INFO) -> logging.Logger:
-    """配置并返回 logger 实例
+# 结构化字段：可通过 extra= 传入，或由 bind_log_context() 绑定到当前更新
+CONTEXT_FIELDS = ("chat_id", "user_id", "command", "week", "duration")
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# 当前更新的日志上下文（每个更新在独立任务中处理，互不影响）
+_log_context: contextvars.ContextVar[Dict[str, object]] = contextvars.ContextVar(
+    "log_context", default={}
+)
+
+_configure_lock = threading.Lock()
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[logging.Handler] = None
+
+
+def bind_log_context(**fields):
+    """为当前任务绑定结构化日志字段，之后该任务中的日志都会带上这些字段
+
+    Args:
+        **fields: 字段值，如 chat_id、user_id、command
+    """
+    _log_context.set({key: value for key, value in fields.items() if value is not None})
+
+
+class _ContextFilter(logging.Filter):
+    """在调用线程中把当前上下文字段写入日志记录（入队之前）"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        for key, value in _log_context.get().items():
+            if not hasattr(record, key):
+                setattr(record, key, value)
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """每条日志输出为一行 JSON"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key in CONTEXT_FIELDS:
+            value = getattr(record, key, None)
+            if value is not None:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """入队时不格式化消息，由监听线程完成格式化和写出
+
+    标准 QueueHandler 在调用线程中合并 msg 和 args；日志对象只在本进程内
+    传递，因此可以把这一步也留给监听线程，事件循环上只剩创建记录和入队。
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def _parse_level(value: str) -> int:
+    """解析日志级别名（如 INFO），无效时为 INFO"""
+    level = logging.getLevelName(value.strip().upper())
+    return level if isinstance(level, int) else logging.INFO
+
+
+def _build_formatter() -> logging.Formatter:
+    if os.environ.get("LOG_FORMAT", "json").lower() == "text":
+        return logging.Formatter(TEXT_FORMAT)
+    return JsonFormatter()
+
+
+def configure_logging(force: bool = False):
+    """配置进程的日志管道（重复调用时只生效一次）
+
+    所有模块的日志经根 logger 的队列处理器进入内存队列，由后台监听线程
+    格式化后写到 stderr 和（可选的）按大小轮转的日志文件。环境变量:
+
+    - LOG_LEVEL: 全局级别 (默认 INFO)
+    - LOG_LEVELS: 按模块设置级别，如 "src.handlers=DEBUG,httpx=WARNING"
+    - LOG_FORMAT: json (默认) 或 text
+    - LOG_FILE / LOG_MAX_BYTES / LOG_BACKUP_COUNT: 轮转文件输出
+
+    由程序入口 (main.py、分片工作进程、迁移工具) 调用，导入模块时不会配置；
+    根 logger 上其他来源的处理器（如 pytest 的日志捕获）保持不变。
+
+    Args:
+        force: 已配置时是否重新配置
+    """
+    global _listener, _queue_handler
+    with _configure_lock:
+        if _listener is not None and not force:
+            return
+        if _listener is not None:
+            _listener.stop()
+
+        formatter = _build_formatter()
+        handlers = [logging.StreamHandler(sys.stderr)]
+        log_file = os.environ.get("LOG_FILE")
+        if log_file:
+            Path(log_file).parent.mkdir(parents=True, exist_ok=True)
+            handlers.append(logging.handlers.RotatingFileHandler(
+                log_file,
+                maxBytes=int(os.environ.get("LOG_MAX_BYTES", str(10 * 1024 * 1024))),
+                backupCount=int(os.environ.get("LOG_BACKUP_COUNT", "5")),
+                encoding="utf-8",
+            ))
+        for handler in handlers:
+            handler.setFormatter(formatter)
+
+        log_queue = queue.SimpleQueue()
+        queue_handler = _DeferredQueueHandler(log_queue)
+        queue_handler.addFilter(_ContextFilter())
+
+        root = logging.getLogger()
+        if _queue_handler is not None:
+            root.removeHandler(_queue_handler)
+        root.addHandler(queue_handler)
+        _queue_handler = queue_handler
+        root.setLevel(_parse_level(os.environ.get("LOG_LEVEL", "INFO")))
+
+        for item in os.environ.get("LOG_LEVELS", "").split(","):
+            name, sep, level = item.partition("=")
+            if sep and name.strip():
+                logging.getLogger(name.strip()).setLevel(_parse_level(level))
+
+        _listener = logging.handlers.QueueListener(
+            log_queue, *handlers, respect_handler_level=True
+        )
+        _listener.start()
+
+
+def shutdown_logging():
+    """停止监听线程并写出队列中剩余的日志"""
+    global _listener
+    with _configure_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+atexit.register(shutdown_logging)
+
+
+def setup_logger(name: str = __name__, level: int = None) -> logging.Logger:
+    """返回 logger 实例（日志管道由入口调用 configure_logging() 配置）
 
     Args:
         name: logger 名称
-        level: 日志级别
+        level: 日志级别，默认继承 LOG_LEVEL / LOG_LEVELS 的配置
 
     Returns:
-        配置好的 logger 实例
+        logger 实例
     """
-    logging.basicConfig(
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        level=level
-    )
-    return logging.getLogger(name)
+    logger = logging.getLogger(name)
+    if level is not None:
+        logger.setLevel(level)
+    return logger
@@ -0,0 +1,72 @@
+"""Event loop lag monitor"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Optional
+
+from src.utils.logger import setup_logger
+from src.utils.stats import summarize
+
+
+logger = setup_logger(__name__)
+
+
+class LoopLagMonitor:
+    """事件循环延迟监控
+
+    周期性地 sleep(interval)，实际醒来时间比预期晚多少就是事件循环被
+    阻塞（同步 I/O、CPU 密集计算）的时长。
+    """
+
+    def __init__(self, interval: float = 0.5, warn_threshold: float = 0.1,
+                 samples: int = 1024):
+        """初始化监控器
+
+        Args:
+            interval: 采样间隔（秒）
+            warn_threshold: 单次延迟超过该值（秒）时记录警告
+            samples: 保留的最近样本数
+        """
+        self.interval = interval
+        self.warn_threshold = warn_threshold
+        self._lags = deque(maxlen=samples)
+        self._task: Optional[asyncio.Task] = None
+        self.stalls = 0
+
+    def start(self):
+        """在当前事件循环中启动监控任务"""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """停止监控任务"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        """采样循环"""
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.perf_counter() - expected)
+            self._lags.append(lag)
+            if lag >= self.warn_threshold:
+                self.stalls += 1
+                logger.warning(f"事件循环阻塞 {lag * 1000:.0f} ms")
+
+    def get_stats(self) -> dict:
+        """获取延迟统计
+
+        Returns:
+            {"count", "p50", "p90", "p99", "max", "stalls"}，单位为秒
+        """
+        stats = summarize(self._lags)
+        stats["stalls"] = self.stalls
+        return stats
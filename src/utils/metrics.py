@@ -0,0 +1,343 @@
+"""Metrics registry with Prometheus text exposition"""
+
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
+
+from src.utils.logger import setup_logger
+
+
+logger = setup_logger(__name__)
+
+
+# 默认直方图桶（秒），覆盖 1ms 的文件读写到数秒的 API 调用
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value) -> str:
+    """转义标签值"""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence, extra: str = "") -> str:
+    """格式化标签 {a="1",b="2"}"""
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    """格式化样本值（整数不带小数点）"""
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    """指标基类：按标签值分组保存样本"""
+
+    kind = ""
+
+    def __init__(self, registry: "MetricsRegistry", name: str, help_text: str,
+                 label_names: Sequence[str] = ()):
+        self._registry = registry
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple, object] = {}
+
+    @property
+    def enabled(self) -> bool:
+        """所属注册表是否已启用（计算样本值本身有开销时先检查）"""
+        return self._registry.enabled
+
+    def _key(self, labels: dict) -> Tuple:
+        return tuple(labels.get(name, "") for name in self.label_names)
+
+    def render(self) -> List[str]:
+        """生成文本格式的样本行"""
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_sample(key, value))
+        return lines
+
+    def _render_sample(self, key: Tuple, value) -> List[str]:
+        return [f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"]
+
+
+class Counter(_Metric):
+    """只增计数器"""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        """增加计数
+
+        Args:
+            amount: 增量
+            **labels: 标签值
+        """
+        if not self._registry.enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        """获取当前计数（未记录过时为 0）
+
+        Args:
+            **labels: 标签值
+
+        Returns:
+            当前计数
+        """
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    """可任意设置的瞬时值"""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        """设置当前值
+
+        Args:
+            value: 当前值
+            **labels: 标签值
+        """
+        if not self._registry.enabled:
+            return
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    """累积直方图"""
+
+    kind = "histogram"
+
+    def __init__(self, registry: "MetricsRegistry", name: str, help_text: str,
+                 label_names: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(registry, name, help_text, label_names)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        """记录一个样本
+
+        Args:
+            value: 样本值
+            **labels: 标签值
+        """
+        if not self._registry.enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # [各桶计数..., 总数, 总和]
+                state = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[index] += 1
+                    break
+            state[-2] += 1
+            state[-1] += value
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        """记录 with 块的耗时（秒），未启用时不计时
+
+        Args:
+            **labels: 标签值
+        """
+        if not self._registry.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _render_sample(self, key: Tuple, state) -> List[str]:
+        lines = []
+        cumulative = 0
+        for index, bound in enumerate(self.buckets + (float("inf"),)):
+            if index < len(self.buckets):
+                cumulative += state[index]
+            else:
+                cumulative = state[-2]
+            labels = _format_labels(self.label_names, key, f'le="{_format_value(bound)}"')
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.label_names, key)
+        lines.append(f"{self.name}_count{labels} {state[-2]}")
+        lines.append(f"{self.name}_sum{labels} {_format_value(state[-1])}")
+        return lines
+
+
+class MetricsRegistry:
+    """指标注册表
+
+    未启用时所有记录方法在第一行直接返回，不加锁也不计时；启用后由
+    start_metrics_server() 在本地 HTTP 端口以文本格式输出。
+    """
+
+    def __init__(self):
+        """初始化注册表（默认未启用）"""
+        self.enabled = False
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], None]] = []
+
+    def enable(self):
+        """启用指标记录"""
+        self.enabled = True
+
+    def counter(self, name: str, help_text: str, label_names: Sequence[str] = ()) -> Counter:
+        """注册计数器"""
+        return self._register(Counter(self, name, help_text, label_names))
+
+    def gauge(self, name: str, help_text: str, label_names: Sequence[str] = ()) -> Gauge:
+        """注册瞬时值"""
+        return self._register(Gauge(self, name, help_text, label_names))
+
+    def histogram(self, name: str, help_text: str, label_names: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        """注册直方图"""
+        return self._register(Histogram(self, name, help_text, label_names, buckets))
+
+    def _register(self, metric: _Metric):
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], None]):
+        """添加采集回调：每次输出前调用，用于在抓取时计算瞬时值
+
+        Args:
+            collector: 无参函数，内部调用 Gauge.set()
+        """
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """以 Prometheus 文本格式输出所有指标
+
+        Returns:
+            文本格式的指标
+        """
+        for collector in list(self._collectors):
+            try:
+                collector()
+            except Exception as e:
+                logger.error(f"指标采集失败: {e}")
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# 进程级共享的注册表
+REGISTRY = MetricsRegistry()
+
+HANDLER_LATENCY = REGISTRY.histogram(
+    "workpilot_handler_seconds", "Handler latency by command", ("handler",)
+)
+HANDLER_ERRORS = REGISTRY.counter(
+    "workpilot_handler_errors_total", "Handler exceptions by command", ("handler",)
+)
+STORAGE_LATENCY = REGISTRY.histogram(
+    "workpilot_storage_seconds", "Storage operation latency", ("component", "op")
+)
+STORAGE_BYTES = REGISTRY.counter(
+    "workpilot_storage_bytes_total", "Bytes read or written by storage", ("component", "op")
+)
+TELEGRAM_LATENCY = REGISTRY.histogram(
+    "workpilot_telegram_api_seconds", "Telegram Bot API call latency", ("method",)
+)
+TELEGRAM_ERRORS = REGISTRY.counter(
+    "workpilot_telegram_api_errors_total", "Failed Telegram Bot API calls", ("method", "error")
+)
+TELEGRAM_RETRIES = REGISTRY.counter(
+    "workpilot_telegram_retries_total", "Sends retried after RetryAfter"
+)
+SEND_FAILURES = REGISTRY.counter(
+    "workpilot_send_failures_total", "Messages the dispatcher gave up sending"
+)
+GROUPS = REGISTRY.gauge("workpilot_groups", "Registered groups owned by this process")
+MEMBERS = REGISTRY.gauge("workpilot_members", "Members expected to submit, excluding excluded users")
+SUBMISSION_RATIO = REGISTRY.gauge(
+    "workpilot_week_submission_ratio", "Share of expected members who submitted this week"
+)
+REPORT_FILTER_MESSAGES = REGISTRY.counter(
+    "workpilot_report_filter_messages_total",
+    "Group text messages checked by the report pre-filter", ("result",)
+)
+UPDATES_PROCESSED = REGISTRY.counter(
+    "workpilot_updates_processed_total", "Updates processed by the per-chat update processor"
+)
+UPDATE_WAIT = REGISTRY.histogram(
+    "workpilot_update_wait_seconds", "Time from dispatch until an update starts processing"
+)
+UPDATES = REGISTRY.gauge(
+    "workpilot_updates", "Dispatched updates by state (running, waiting, backlog)", ("state",)
+)
+UPDATE_CHATS = REGISTRY.gauge(
+    "workpilot_update_active_chats", "Chats with updates running or waiting"
+)
+CONFIG_EVENTS = REGISTRY.counter(
+    "workpilot_config_events_total",
+    "Config mutations, file writes, reloads of other processes' writes and replays", ("event",)
+)
+CONFIG_DIRTY = REGISTRY.gauge(
+    "workpilot_config_dirty", "1 while config changes are waiting to be written back"
+)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """/metrics 请求处理"""
+
+    registry: MetricsRegistry = REGISTRY
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = self.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # 抓取请求很频繁，不写入访问日志
+        pass
+
+
+def start_metrics_server(port: int, host: str = "127.0.0.1",
+                         registry: MetricsRegistry = REGISTRY) -> ThreadingHTTPServer:
+    """启用指标记录并在后台线程中提供 /metrics
+
+    Args:
+        port: 监听端口
+        host: 监听地址，默认只监听本机
+        registry: 指标注册表
+
+    Returns:
+        HTTP 服务器（调用 shutdown() 停止）
+    """
+    registry.enable()
+    handler = type("MetricsHandler", (_MetricsHandler,), {"registry": registry})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True)
+    thread.start()
+    logger.info(f"指标服务已启动: http://{host}:{port}/metrics")
+    return server
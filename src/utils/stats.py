@@ -0,0 +1,38 @@
+"""Statistics helpers"""
+
+from typing import Iterable, List
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """计算已排序序列的分位数（最近秩法）
+
+    Args:
+        sorted_values: 升序排列的数值列表
+        q: 分位 (0-100)
+
+    Returns:
+        分位数，序列为空时返回 0
+    """
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(q / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def summarize(values: Iterable[float]) -> dict:
+    """汇总一组耗时样本
+
+    Args:
+        values: 样本（秒）
+
+    Returns:
+        {"count", "p50", "p90", "p99", "max"}
+    """
+    ordered = sorted(values)
+    return {
+        "count": len(ordered),
+        "p50": percentile(ordered, 50),
+        "p90": percentile(ordered, 90),
+        "p99": percentile(ordered, 99),
+        "max": ordered[-1] if ordered else 0.0,
+    }
@@ -0,0 +1,212 @@
+"""Telegram text rendering and chunking"""
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Iterable, Iterator, List, Sequence
+
+
+# Telegram 单条消息上限（按 UTF-16 码元计）
+TELEGRAM_TEXT_LIMIT = 4096
+
+
+def utf16_len(text: str) -> int:
+    """计算文本的 UTF-16 码元长度（Telegram 的计数方式）
+
+    Args:
+        text: 文本
+
+    Returns:
+        UTF-16 码元数
+    """
+    return len(text.encode('utf-16-le')) // 2
+
+
+def _split_oversized(block: str, limit: int) -> Iterator[str]:
+    """将超长块按行拆分，单行仍超长时按字符拆分（不会拆开代理对）"""
+    lines = block.splitlines(keepends=True)
+    buffer: List[str] = []
+    size = 0
+    for line in lines:
+        line_size = utf16_len(line)
+        if line_size > limit:
+            if buffer:
+                yield "".join(buffer)
+                buffer, size = [], 0
+            piece: List[str] = []
+            piece_size = 0
+            for char in line:
+                char_size = 2 if ord(char) > 0xFFFF else 1
+                if piece_size + char_size > limit:
+                    yield "".join(piece)
+                    piece, piece_size = [], 0
+                piece.append(char)
+                piece_size += char_size
+            if piece:
+                buffer, size = piece, piece_size
+            continue
+        if size + line_size > limit:
+            yield "".join(buffer)
+            buffer, size = [], 0
+        buffer.append(line)
+        size += line_size
+    if buffer:
+        yield "".join(buffer)
+
+
+def chunk_blocks(blocks: Iterable[str], limit: int = TELEGRAM_TEXT_LIMIT) -> Iterator[str]:
+    """将文本块合并为不超过 Telegram 上限的消息
+
+    优先在块边界（如每份周报之间）切分，避免拆开 Markdown 实体；
+    单个块超限时才退化为按行切分。
+
+    Args:
+        blocks: 文本块序列
+        limit: 单条消息的 UTF-16 码元上限
+
+    Yields:
+        消息文本
+    """
+    buffer: List[str] = []
+    size = 0
+    for block in blocks:
+        block_size = utf16_len(block)
+        if block_size > limit:
+            if buffer:
+                yield "".join(buffer)
+                buffer, size = [], 0
+            yield from _split_oversized(block, limit)
+            continue
+        if size + block_size > limit:
+            yield "".join(buffer)
+            buffer, size = [], 0
+        buffer.append(block)
+        size += block_size
+    if buffer:
+        yield "".join(buffer)
+
+
+async def send_chunks(send: Callable[[str], Awaitable], chunks: Iterable[str]):
+    """按顺序发送分段消息，发送当前段的同时准备下一段
+
+    Args:
+        send: 发送单条消息的协程函数
+        chunks: 消息文本序列（可为惰性生成器）
+    """
+    in_flight = None
+    for chunk in chunks:
+        if in_flight is not None:
+            await in_flight
+        in_flight = asyncio.ensure_future(send(chunk))
+        # 让出一次事件循环，使请求先发出，再在等待网络期间生成下一段
+        await asyncio.sleep(0)
+    if in_flight is not None:
+        await in_flight
+
+
+def render_summary(group_name: str, week: str, reports: Dict[str, dict],
+                   pending_members: List[dict] = None) -> List[str]:
+    """渲染周报汇总
+
+    Args:
+        group_name: 群组名称
+        week: 周标识
+        reports: 周报字典 {user_id: record}
+        pending_members: 未提交成员列表
+
+    Returns:
+        文本块列表（每份周报一个块）
+    """
+    blocks = [f"📊 **{group_name} - {week} 周报汇总**\n{'=' * 40}\n\n"]
+
+    if not reports:
+        blocks.append("暂无周报提交\n")
+    else:
+        separator = '-' * 30
+        for report in reports.values():
+            blocks.append(
+                f"👤 **{report['username']}**\n"
+                f"提交时间: {report['submitted_at']}\n"
+                f"内容:\n{report['content']}\n"
+                f"{separator}\n\n"
+            )
+
+    if pending_members:
+        lines = [f"\n⚠️ **未提交周报的成员 ({len(pending_members)}人)**:\n"]
+        lines.extend(f"- {member['username']}\n" for member in pending_members)
+        blocks.append("".join(lines))
+
+    return blocks
+
+
+def render_status(week: str, submitted: int, total: int, reports: Dict[str, dict],
+                  pending_members: List[dict]) -> List[str]:
+    """渲染周报提交状态
+
+    Args:
+        week: 周标识
+        submitted: 已提交人数
+        total: 成员总数
+        reports: 周报字典 {user_id: record}
+        pending_members: 未提交成员列表
+
+    Returns:
+        文本块列表
+    """
+    blocks = [f"📊 **{week} 周报状态**\n\n已提交: {submitted}/{total}\n\n"]
+
+    if reports:
+        lines = ["✅ **已提交:**\n"]
+        lines.extend(f"  • {report['username']}\n" for report in reports.values())
+        blocks.append("".join(lines))
+
+    if pending_members:
+        lines = [f"\n⏳ **未提交 ({len(pending_members)}人):**\n"]
+        lines.extend(f"  • {member['username']}\n" for member in pending_members)
+        blocks.append("".join(lines))
+
+    return blocks
+
+
+def render_members(usernames: Sequence[str]) -> List[str]:
+    """渲染成员列表
+
+    Args:
+        usernames: 成员用户名
+
+    Returns:
+        文本块列表
+    """
+    if not usernames:
+        return ["暂无注册成员，请使用 /register 注册"]
+
+    lines = [f"👥 **已注册成员 ({len(usernames)}人)**\n\n"]
+    lines.extend(f"• {username}\n" for username in usernames)
+    return ["".join(lines)]
+
+
+def render_excluded(excluded_users: Dict[str, str],
+                    group_excluded: Dict[str, str] = None) -> List[str]:
+    """渲染排除列表
+
+    Args:
+        excluded_users: 全局排除用户字典 {user_id: username}
+        group_excluded: 本群排除用户字典 {user_id: username}
+
+    Returns:
+        文本块列表
+    """
+    if not excluded_users and not group_excluded:
+        return ["📋 排除列表为空，所有人都需要提交周报"]
+
+    lines = [
+        f"📋 **排除列表** ({len(excluded_users) + len(group_excluded or {})}人)\n\n",
+        "以下用户不需要提交周报:\n",
+    ]
+    lines.extend(
+        f"• {username} (ID: {user_id})\n" for user_id, username in excluded_users.items()
+    )
+    if group_excluded:
+        lines.append("\n仅在本群排除:\n")
+        lines.extend(
+            f"• {username} (ID: {user_id})\n" for user_id, username in group_excluded.items()
+        )
+    return ["".join(lines)]
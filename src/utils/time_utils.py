@@ -1,13 +1,222 @@
 """Time utility functions"""
 
-from datetime import datetime
+import re
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
+from src.utils.logger import setup_logger
 
-def get_current_week() -> str:
-    """获取当前周的标识 (格式: 2024-W01)
+
+logger = setup_logger(__name__)
+
+# ISO-8601 周：周一开始，每年第 1 周包含该年第一个周四（年份取周所属的 ISO 年）
+WEEK_FORMAT = "%G-W%V"
+WEEK_PATTERN = re.compile(r"^(\d{4})-W(\d{2})$")
+
+# 旧版周标识格式（%W：以该年第一个周一为第 1 周，之前的日子为第 0 周）
+LEGACY_WEEK_FORMAT = "%Y-W%W"
+
+# 单次周范围允许的最大周数（约 10 年）
+MAX_WEEK_RANGE = 520
+
+# 跨周回调: callback(旧周标识, 新周标识, 时区名)
+RolloverCallback = Callable[[str, str, Optional[str]], None]
+
+
+class WeekClock:
+    """当前周标识的缓存
+
+    每个时区的周标识缓存到下一个周一 0 点，期间的调用只比较一次时间戳。
+    检测到跨周时依次调用订阅者，缓存、未提交成员索引等据此丢弃旧周的数据。
+    """
+
+    def __init__(self):
+        """初始化周时钟"""
+        self._lock = threading.Lock()
+        # {时区名: (周标识, 下一次跨周的 UNIX 时间戳)}，None 表示服务器本地时间
+        self._current: Dict[Optional[str], Tuple[str, float]] = {}
+        self._zones: Dict[str, Optional[ZoneInfo]] = {}
+        self._subscribers: List[RolloverCallback] = []
+
+    def _zone(self, tz: Optional[str]) -> Optional[ZoneInfo]:
+        """解析时区名，无效时回退到服务器本地时间"""
+        if tz is None:
+            return None
+        zone = self._zones.get(tz, False)
+        if zone is False:
+            try:
+                zone = ZoneInfo(tz)
+            except (ZoneInfoNotFoundError, ValueError):
+                logger.warning(f"未知的时区 {tz}，按服务器本地时间计算周次")
+                zone = None
+            self._zones[tz] = zone
+        return zone
+
+    def _compute(self, tz: Optional[str], now: float) -> Tuple[str, float]:
+        """计算 now 所在的周标识和下一次跨周时刻"""
+        zone = self._zone(tz)
+        local = datetime.fromtimestamp(now, zone)
+        monday = local.date() - timedelta(days=local.weekday()) + timedelta(days=7)
+        # zone 为 None 时按服务器本地时间解释
+        boundary = datetime(monday.year, monday.month, monday.day, tzinfo=zone).timestamp()
+        return local.strftime(WEEK_FORMAT), boundary
+
+    def current(self, tz: str = None, now: float = None) -> str:
+        """获取当前周标识
+
+        Args:
+            tz: IANA 时区名，默认为服务器本地时间
+            now: 当前时刻 (UNIX 时间戳)，默认为系统时间
+
+        Returns:
+            ISO 周标识 (如 2026-W01)
+        """
+        now = time.time() if now is None else now
+        cached = self._current.get(tz)
+        if cached is not None and now < cached[1]:
+            return cached[0]
+
+        week, boundary = self._compute(tz, now)
+        with self._lock:
+            previous = self._current.get(tz)
+            self._current[tz] = (week, boundary)
+        if previous is not None and previous[0] != week:
+            self._emit(previous[0], week, tz)
+        return week
+
+    def check(self, now: float = None):
+        """检查所有已使用的时区是否跨周（由定时任务调用，保证事件及时触发）
+
+        Args:
+            now: 当前时刻 (UNIX 时间戳)，默认为系统时间
+        """
+        for tz in list(self._current):
+            self.current(tz, now)
+
+    def subscribe(self, callback: RolloverCallback) -> RolloverCallback:
+        """订阅跨周事件
+
+        Args:
+            callback: 回调 callback(旧周标识, 新周标识, 时区名)
+
+        Returns:
+            callback 本身，便于取消订阅
+        """
+        with self._lock:
+            self._subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback: RolloverCallback):
+        """取消订阅跨周事件"""
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def _emit(self, old_week: str, new_week: str, tz: Optional[str]):
+        """通知订阅者，单个订阅者出错不影响其他订阅者"""
+        logger.info(f"跨周: {old_week} -> {new_week} ({tz or '本地时间'})")
+        for callback in list(self._subscribers):
+            try:
+                callback(old_week, new_week, tz)
+            except Exception as e:
+                logger.error(f"跨周回调执行失败: {e}")
+
+
+# 进程级共享的周时钟
+WEEK_CLOCK = WeekClock()
+
+
+def get_current_week(tz: str = None) -> str:
+    """获取当前周的标识 (ISO-8601，格式: 2024-W01)
+
+    Args:
+        tz: IANA 时区名，默认为服务器本地时间
 
     Returns:
         当前周的标识字符串
     """
-    now = datetime.now()
-    return now.strftime("%Y-W%W")
+    return WEEK_CLOCK.current(tz)
+
+
+def week_start(week: str) -> date:
+    """获取周标识对应的周一日期
+
+    Args:
+        week: 周标识
+
+    Returns:
+        该周周一的日期
+
+    Raises:
+        ValueError: 周标识格式错误或该年没有这一周
+    """
+    match = WEEK_PATTERN.match(week)
+    if not match:
+        raise ValueError(f"无效的周标识: {week}")
+    try:
+        return date.fromisocalendar(int(match.group(1)), int(match.group(2)), 1)
+    except ValueError:
+        raise ValueError(f"无效的周标识: {week}") from None
+
+
+def week_key(day: date) -> str:
+    """获取日期所在周的标识
+
+    Args:
+        day: 日期
+
+    Returns:
+        ISO 周标识
+    """
+    return day.strftime(WEEK_FORMAT)
+
+
+def legacy_week_to_iso(week: str) -> str:
+    """将旧版 %Y-W%W 周标识转换为同一周的 ISO 周标识
+
+    Args:
+        week: 旧版周标识（第 0 周表示该年第一个周一之前的几天）
+
+    Returns:
+        ISO 周标识
+
+    Raises:
+        ValueError: 周标识格式错误
+    """
+    if not WEEK_PATTERN.match(week):
+        raise ValueError(f"无效的周标识: {week}")
+    monday = datetime.strptime(f"{week}-1", f"{LEGACY_WEEK_FORMAT}-%w").date()
+    return week_key(monday)
+
+
+def parse_week_range(spec: str) -> List[str]:
+    """解析周范围 (如 2026-W30..2026-W40，首尾包含)
+
+    Args:
+        spec: 单个周标识或 "起始..结束" 形式的范围
+
+    Returns:
+        按时间升序排列的周标识列表
+
+    Raises:
+        ValueError: 格式错误、起始晚于结束或范围过大
+    """
+    if ".." not in spec:
+        week_start(spec)
+        return [spec]
+
+    first, last = (part.strip() for part in spec.split("..", 1))
+    current, end = week_start(first), week_start(last)
+    if current > end:
+        raise ValueError(f"起始周晚于结束周: {spec}")
+    if (end - current).days // 7 + 1 > MAX_WEEK_RANGE:
+        raise ValueError(f"周范围过大，最多 {MAX_WEEK_RANGE} 周")
+
+    weeks = []
+    while current <= end:
+        weeks.append(week_key(current))
+        current += timedelta(days=7)
+    return weeks
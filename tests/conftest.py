@@ -0,0 +1,7 @@
+"""pytest 公共配置"""
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
@@ -0,0 +1,76 @@
+"""配置写回合并与多实例合并测试"""
+
+import json
+
+from src.models.config import Config
+
+GROUP_ID = -1001
+OTHER_GROUP_ID = -1002
+
+
+def saved_members(config, group_id=GROUP_ID) -> dict:
+    data = json.loads(config.config_file.read_text(encoding="utf-8"))
+    return data["groups"][str(group_id)]["members"]
+
+
+def test_write_behind_coalesces_mutations(tmp_path):
+    # 合并窗口足够长，期间的修改只由 close() 触发的一次写入落盘
+    config = Config(tmp_path / "config.json", flush_interval=60, refresh_interval=0)
+    config.register_group(GROUP_ID, "测试群")
+    for user_id in range(1, 6):
+        config.add_member(GROUP_ID, user_id, f"成员{user_id}")
+
+    stats = config.get_stats()
+    assert stats["dirty"] and stats["flushes"] == 0
+    assert not config.config_file.exists()
+
+    config.close()
+    stats = config.get_stats()
+    assert not stats["dirty"]
+    assert stats["flushes"] == 1
+    assert stats["coalesced"] == stats["mutations"] - 1
+    assert saved_members(config) == {str(i): f"成员{i}" for i in range(1, 6)}
+
+
+def test_two_instances_merge_writes(tmp_path):
+    path = tmp_path / "config.json"
+    first = Config(path, flush_interval=0, refresh_interval=0)
+    second = Config(path, flush_interval=0, refresh_interval=0)
+    try:
+        first.register_group(GROUP_ID, "测试群")
+        assert second.refresh()
+        first.add_member(GROUP_ID, 1, "甲")
+        # second 的内存副本已过期：写回时先加载 first 的写入，再重放自己的修改
+        second.add_member(GROUP_ID, 2, "乙")
+        second.register_group(OTHER_GROUP_ID, "另一个群")
+
+        assert saved_members(first) == {"1": "甲", "2": "乙"}
+        assert second.get_stats()["replays"] == 1
+        assert first.refresh()
+        assert set(first.group_ids()) == {GROUP_ID, OTHER_GROUP_ID}
+        assert dict(first.member_snapshot(GROUP_ID).items()) == {1: "甲", 2: "乙"}
+    finally:
+        first.close()
+        second.close()
+
+
+def test_write_behind_replays_pending_ops_over_other_writer(tmp_path):
+    path = tmp_path / "config.json"
+    writer = Config(path, flush_interval=0, refresh_interval=0)
+    writer.register_group(GROUP_ID, "测试群")
+    buffered = Config(path, flush_interval=60, refresh_interval=0)
+    try:
+        buffered.add_member(GROUP_ID, 1, "甲")
+        buffered.add_excluded_user(9, "机器人")
+        # 另一个实例在合并窗口内写入
+        writer.add_member(GROUP_ID, 2, "乙")
+
+        assert buffered.flush()
+        assert buffered.get_stats()["replays"] == 1
+        assert saved_members(buffered) == {"2": "乙", "1": "甲"}
+        assert writer.refresh()
+        assert writer.is_user_excluded(9)
+        assert dict(writer.member_snapshot(GROUP_ID).items()) == {2: "乙", 1: "甲"}
+    finally:
+        buffered.close()
+        writer.close()
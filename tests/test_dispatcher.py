@@ -0,0 +1,21 @@
+"""发送限速令牌桶测试"""
+
+from src.services import dispatcher
+from src.services.dispatcher import TokenBucket
+
+
+def test_pause_does_not_accumulate_tokens(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(dispatcher.time, "monotonic", lambda: now[0])
+    bucket = TokenBucket(rate=1, capacity=20)
+    bucket._tokens = 0
+
+    bucket.pause(30)
+    now[0] += 30
+    bucket._refill(now[0])
+    # 暂停结束时只有重试用的一个令牌，而不是 30 秒攒下的满桶
+    assert bucket._tokens == 1
+
+    now[0] += 2
+    bucket._refill(now[0])
+    assert bucket._tokens == 3
@@ -0,0 +1,83 @@
+"""日志存储的重放、折叠和多进程可见性测试"""
+
+import json
+
+import pytest
+
+from src.models.journal_store import JOURNAL_NAME, JournalReportStore
+
+GROUP_ID = -1001
+WEEK = "2026-W42"
+
+
+def record(name: str, content: str = None) -> dict:
+    return {
+        "username": name,
+        "content": content or f"{name}的周报",
+        "submitted_at": "2026-10-16T10:00:00",
+    }
+
+
+@pytest.fixture
+def reports_dir(tmp_path):
+    return tmp_path / "reports"
+
+
+def test_replay_after_restart(reports_dir):
+    store = JournalReportStore(reports_dir)
+    store.upsert_report(GROUP_ID, WEEK, 1, record("甲"))
+    store.upsert_report(GROUP_ID, WEEK, 2, record("乙"))
+    store.upsert_report(GROUP_ID, WEEK, 1, record("甲", "改过的周报"))
+    # 不折叠直接丢弃（模拟进程崩溃）
+    del store
+
+    restarted = JournalReportStore(reports_dir)
+    reports = restarted.load_week(GROUP_ID, WEEK)["reports"]
+    assert reports["1"]["content"] == "改过的周报"
+    assert set(reports) == {"1", "2"}
+    assert restarted.list_weeks(GROUP_ID) == [WEEK]
+    restarted.close()
+
+
+def test_compaction_folds_journal_into_snapshot(reports_dir):
+    store = JournalReportStore(reports_dir)
+    store.upsert_report(GROUP_ID, WEEK, 1, record("甲"))
+    store.upsert_report(GROUP_ID, WEEK, 2, record("乙"))
+
+    assert store.compact(GROUP_ID) == 2
+    snapshot = json.loads((reports_dir / str(GROUP_ID) / f"{WEEK}.json").read_text("utf-8"))
+    assert set(snapshot["reports"]) == {"1", "2"}
+    # 新日志只有日志头
+    lines = (reports_dir / str(GROUP_ID) / JOURNAL_NAME).read_text("utf-8").splitlines()
+    assert [json.loads(line) for line in lines] == [{"generation": 2}]
+    assert store.submitted_user_ids(GROUP_ID, WEEK) == {"1", "2"}
+    assert store.compact(GROUP_ID) == 0
+    store.close()
+
+
+def test_entries_from_another_process_are_visible(reports_dir):
+    first = JournalReportStore(reports_dir)
+    second = JournalReportStore(reports_dir)
+    first.upsert_report(GROUP_ID, WEEK, 1, record("甲"))
+    token = second.version_token(GROUP_ID, WEEK)
+
+    first.upsert_report(GROUP_ID, WEEK, 2, record("乙"))
+    assert second.version_token(GROUP_ID, WEEK) != token
+    assert second.submitted_user_ids(GROUP_ID, WEEK) == {"1", "2"}
+    first.close()
+    second.close()
+
+
+def test_overlay_does_not_shadow_newer_compacted_record(reports_dir):
+    first = JournalReportStore(reports_dir)
+    second = JournalReportStore(reports_dir)
+    first.upsert_report(GROUP_ID, WEEK, 1, record("甲", "旧内容"))
+    second.upsert_report(GROUP_ID, WEEK, 1, record("甲", "新内容"))
+    # 另一个进程把两条都折叠进快照，以新的代数重新开始日志
+    second.compact(GROUP_ID)
+
+    assert first.load_week(GROUP_ID, WEEK)["reports"]["1"]["content"] == "新内容"
+    first.upsert_report(GROUP_ID, WEEK, 2, record("乙"))
+    assert set(second.load_week(GROUP_ID, WEEK)["reports"]) == {"1", "2"}
+    first.close()
+    second.close()
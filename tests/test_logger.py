@@ -0,0 +1,33 @@
+"""日志配置测试"""
+
+import logging
+
+from src.utils import logger as logger_module
+from src.utils.logger import configure_logging, setup_logger
+
+
+def test_configure_logging_keeps_foreign_handlers(caplog):
+    root = logging.getLogger()
+    foreign = [handler for handler in root.handlers]
+    level = root.level
+    try:
+        configure_logging(force=True)
+        configure_logging(force=True)
+        assert all(handler in root.handlers for handler in foreign)
+        # 重复配置只替换自己的队列处理器
+        assert len(root.handlers) == len(foreign) + 1
+
+        with caplog.at_level(logging.INFO):
+            setup_logger("src.test").info("周报已收录")
+        assert "周报已收录" in caplog.text
+    finally:
+        root.removeHandler(logger_module._queue_handler)
+        logger_module._queue_handler = None
+        logger_module.shutdown_logging()
+        root.setLevel(level)
+
+
+def test_setup_logger_does_not_configure_root():
+    before = list(logging.getLogger().handlers)
+    setup_logger("src.other")
+    assert logging.getLogger().handlers == before
@@ -0,0 +1,60 @@
+"""成员表 (MemberTable) 与成员表快照测试"""
+
+import json
+
+import pytest
+
+from src.models.config import Config
+from src.models.membership import MemberTable
+
+GROUP_ID = -1001
+
+
+@pytest.fixture
+def config(tmp_path):
+    config = Config(tmp_path / "config.json", flush_interval=0, refresh_interval=0)
+    config.register_group(GROUP_ID, "测试群")
+    yield config
+    config.close()
+
+
+def test_member_table_keeps_insertion_order():
+    table = MemberTable([("30", "丙"), ("10", "甲")])
+    table["20"] = "乙"
+    table["10"] = "甲2"
+    del table["30"]
+    table["5"] = "丁"
+
+    assert list(table.items()) == [("10", "甲2"), ("20", "乙"), ("5", "丁")]
+    assert "20" in table and "30" not in table and "x" not in table
+    assert table.get("5") == "丁" and table.get("30") is None
+    assert table == {"10": "甲2", "20": "乙", "5": "丁"}
+
+
+def test_members_round_trip_as_string_keys(config):
+    for user_id, username in [(300, "丙"), (100, "甲"), (200, "乙")]:
+        config.add_member(GROUP_ID, user_id, username)
+
+    saved = json.loads(config.config_file.read_text(encoding="utf-8"))
+    assert saved["groups"][str(GROUP_ID)]["members"] == {"300": "丙", "100": "甲", "200": "乙"}
+    assert list(saved["groups"][str(GROUP_ID)]["members"]) == ["300", "100", "200"]
+
+    reloaded = Config(config.config_file, flush_interval=0, refresh_interval=0)
+    members = reloaded.membership.group(GROUP_ID)
+    assert list(members.items()) == [(300, "丙"), (100, "甲"), (200, "乙")]
+    reloaded.close()
+
+
+def test_snapshot_is_not_affected_by_later_changes(config):
+    config.add_member(GROUP_ID, 1, "甲")
+    config.add_member(GROUP_ID, 2, "乙")
+    snapshot = config.membership.group(GROUP_ID)
+
+    config.remove_member(GROUP_ID, 1)
+    config.add_member(GROUP_ID, 3, "丙")
+
+    assert list(snapshot.items()) == [(1, "甲"), (2, "乙")]
+    assert snapshot.username(1) == "甲" and 3 not in snapshot
+    current = config.membership.group(GROUP_ID)
+    assert list(current.items()) == [(2, "乙"), (3, "丙")]
+    assert current.username(3) == "丙" and 1 not in current
@@ -0,0 +1,82 @@
+"""未提交成员索引 (PendingIndex) 与完整计算的一致性测试"""
+
+import pytest
+
+from src.models.config import Config
+from src.models.report import WeeklyReport
+from src.models.report_cache import WeekCache
+from src.models.report_store import JsonReportStore
+from src.services.bot_service import BotService
+
+GROUP_ID = -1001
+OTHER_GROUP_ID = -1002
+
+
+@pytest.fixture
+def bot(tmp_path):
+    config = Config(tmp_path / "config.json", flush_interval=0, refresh_interval=0)
+    store = JsonReportStore(tmp_path / "reports")
+    manager = WeeklyReport(tmp_path / "reports", store=store, cache=WeekCache(max_entries=8))
+    bot = BotService(config, manager)
+    for group_id in (GROUP_ID, OTHER_GROUP_ID):
+        bot.register_group(group_id, f"群{group_id}")
+        for user_id in range(1, 6):
+            bot.add_member(group_id, user_id, f"成员{user_id}")
+    yield bot
+    bot.close()
+    manager.clock.unsubscribe(manager._on_rollover)
+    store.close()
+    config.close()
+
+
+def assert_matches_recompute(bot, group_id):
+    index = bot.pending_index
+    week = bot.report_manager.current_week(group_id)
+    expected, _ = index._compute(group_id, week)
+    pending = {item["user_id"]: item["username"] for item in index.get_pending(group_id)}
+    assert pending == expected
+    assert index.count_pending(group_id) == len(expected)
+    assert index.check(group_id)["consistent"]
+
+
+def test_incremental_updates_match_full_recompute(bot):
+    index = bot.pending_index
+    for group_id in (GROUP_ID, OTHER_GROUP_ID):
+        assert_matches_recompute(bot, group_id)
+    rebuilds = index.rebuilds
+
+    bot.add_report(GROUP_ID, 1, "成员1", "本周完成了 A")
+    bot.add_member(GROUP_ID, 6, "成员6")
+    bot.add_member(GROUP_ID, 2, "成员2改名")
+    bot.remove_member(GROUP_ID, 3)
+    bot.sync_members(GROUP_ID, {7: "成员7", 4: "成员4改名"})
+    bot.exclude_user(GROUP_ID, 5, "成员5", group_only=True)
+    bot.exclude_user(OTHER_GROUP_ID, 4, "成员4")
+    for group_id in (GROUP_ID, OTHER_GROUP_ID):
+        assert_matches_recompute(bot, group_id)
+
+    # 被排除的用户重新入群后不计入未提交，移出排除列表后重新计入
+    bot.add_member(OTHER_GROUP_ID, 4, "成员4")
+    assert_matches_recompute(bot, OTHER_GROUP_ID)
+    bot.include_user(4)
+    for group_id in (GROUP_ID, OTHER_GROUP_ID):
+        assert_matches_recompute(bot, group_id)
+    assert 4 in {item["user_id"] for item in index.get_pending(OTHER_GROUP_ID)}
+
+    # 以上修改都由事件增量维护，没有触发完整计算
+    assert index.rebuilds == rebuilds
+
+
+def test_external_report_write_triggers_recompute(bot):
+    index = bot.pending_index
+    assert_matches_recompute(bot, GROUP_ID)
+    rebuilds = index.rebuilds
+
+    # 其他进程直接写入存储，本进程没有收到事件
+    week = bot.report_manager.current_week(GROUP_ID)
+    bot.report_manager.store.upsert_report(GROUP_ID, week, 2, {
+        "username": "成员2", "content": "外部写入", "submitted_at": "2026-10-16T10:00:00"
+    })
+    assert_matches_recompute(bot, GROUP_ID)
+    assert 2 not in {item["user_id"] for item in index.get_pending(GROUP_ID)}
+    assert index.rebuilds > rebuilds
@@ -0,0 +1,54 @@
+"""周报存储后端的整周覆盖写入并发检查测试"""
+
+import pytest
+
+from src.models.report import WeeklyReport
+from src.models.report_cache import WeekCache
+from src.models.report_store import JsonReportStore, StaleWriteError
+from src.models.sqlite_store import SQLiteReportStore
+
+GROUP_ID = -1001
+WEEK = "2026-W42"
+
+
+def record(name: str) -> dict:
+    return {"username": name, "content": f"{name}的周报", "submitted_at": "2026-10-16T10:00:00"}
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "json":
+        store = JsonReportStore(tmp_path / "reports")
+    else:
+        store = SQLiteReportStore(tmp_path / "reports.db")
+    yield store
+    store.close()
+
+
+def test_save_week_rejects_stale_version(store):
+    store.upsert_report(GROUP_ID, WEEK, 1, record("甲"))
+    data = store.load_week(GROUP_ID, WEEK)
+
+    # 读取之后另一个写者提交了一份周报
+    store.upsert_report(GROUP_ID, WEEK, 2, record("乙"))
+    data["reports"]["3"] = record("丙")
+    with pytest.raises(StaleWriteError):
+        store.save_week(GROUP_ID, WEEK, data)
+    assert set(store.load_week(GROUP_ID, WEEK)["reports"]) == {"1", "2"}
+
+
+def test_update_reports_retries_on_concurrent_upsert(store, tmp_path):
+    manager = WeeklyReport(tmp_path / "reports", store=store, cache=WeekCache(max_entries=8))
+    store.upsert_report(GROUP_ID, WEEK, 1, record("甲"))
+    calls = []
+
+    def updater(data):
+        calls.append(1)
+        if len(calls) == 1:
+            store.upsert_report(GROUP_ID, WEEK, 2, record("乙"))
+        data["reports"].pop("1", None)
+
+    manager.update_reports(GROUP_ID, updater, week=WEEK)
+    assert len(calls) == 2
+    assert set(store.load_week(GROUP_ID, WEEK)["reports"]) == {"2"}
+    manager.clock.unsubscribe(manager._on_rollover)
@@ -0,0 +1,75 @@
+"""按群组时区的提醒调度测试"""
+
+import json
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from src.models.config import Config
+from src.services.schedule_service import DEADLINE, REMINDER, ScheduleService
+
+GROUP_ID = -1001
+TZ = ZoneInfo("Asia/Shanghai")
+
+
+@pytest.fixture
+def config(tmp_path):
+    config = Config(tmp_path / "config.json", flush_interval=0, refresh_interval=0)
+    config.register_group(GROUP_ID, "测试群")
+    yield config
+    config.close()
+
+
+def timestamp(*args) -> float:
+    return datetime(*args, tzinfo=TZ).timestamp()
+
+
+def test_deadline_reminder_targets_the_week_it_closes(config):
+    # 默认周五 17:00 提醒、周一 10:00 截止
+    schedule = ScheduleService(config, spread=0)
+    schedule.sync(now=timestamp(2026, 10, 14, 12))
+
+    friday = schedule.pop_due(now=timestamp(2026, 10, 16, 17, 0, 1))
+    assert friday == [(GROUP_ID, REMINDER, "2026-W42")]
+
+    # 周一截止时已是 2026-W43，截止提醒检查的仍是 2026-W42
+    monday = schedule.pop_due(now=timestamp(2026, 10, 19, 10, 0, 1))
+    assert monday == [(GROUP_ID, DEADLINE, "2026-W42")]
+
+
+def test_deadline_later_in_the_same_week(config):
+    config.set_group_schedule(GROUP_ID, deadline_day=6, deadline_hour=20)
+    schedule = ScheduleService(config, spread=0)
+    schedule.sync(now=timestamp(2026, 10, 17, 12))
+
+    assert schedule.pop_due(now=timestamp(2026, 10, 18, 20, 0, 1)) == [
+        (GROUP_ID, DEADLINE, "2026-W42")
+    ]
+
+
+def test_sync_only_resolves_changed_groups(config, monkeypatch):
+    other = -1002
+    config.register_group(other, "其他群")
+    schedule = ScheduleService(config, spread=0)
+    assert schedule.sync(now=timestamp(2026, 10, 14, 12)) == 2
+
+    resolved = []
+    resolve = schedule._resolve
+    monkeypatch.setattr(schedule, "_resolve", lambda group_id: resolved.append(group_id)
+                        or resolve(group_id))
+
+    config.set_group_schedule(other, reminder_hour=9)
+    config.add_member(GROUP_ID, 1, "甲")
+    assert schedule.sync(now=timestamp(2026, 10, 14, 12)) == 1
+    assert sorted(resolved) == sorted([other, GROUP_ID])
+
+    # 其他进程修改了全局默认值：所有群组都要重新解析
+    resolved.clear()
+    saved = json.loads(config.config_file.read_text(encoding="utf-8"))
+    saved["reminder_hour"] = 18
+    saved["_version"] += 1
+    config.config_file.write_text(json.dumps(saved), encoding="utf-8")
+    assert config.refresh()
+    assert schedule.sync(now=timestamp(2026, 10, 14, 12)) == 1
+    assert sorted(resolved) == sorted([GROUP_ID, other])
@@ -0,0 +1,39 @@
+"""消息分段 (chunk_blocks) 测试"""
+
+from src.utils.text_render import TELEGRAM_TEXT_LIMIT, chunk_blocks, utf16_len
+
+
+def test_utf16_len_counts_astral_chars_twice():
+    assert utf16_len("周报") == 2
+    assert utf16_len("🎉") == 2
+    assert utf16_len("a🎉b") == 4
+
+
+def test_chunks_split_at_block_boundaries():
+    blocks = [f"第{i}份周报 🎉\n" + "内容" * 300 + "\n\n" for i in range(20)]
+    chunks = list(chunk_blocks(blocks))
+
+    assert len(chunks) > 1
+    assert all(utf16_len(chunk) <= TELEGRAM_TEXT_LIMIT for chunk in chunks)
+    assert "".join(chunks) == "".join(blocks)
+    # 未超限的块不会被拆开
+    for chunk in chunks:
+        assert chunk.startswith("第") and chunk.endswith("\n\n")
+
+
+def test_oversized_blocks_stay_within_limit():
+    # 一行 3000 个 emoji 占 6000 个码元，按字符数计算会误判为未超限
+    emoji_line = "🎉" * 3000 + "\n"
+    long_lines = "".join(f"第{i}行：" + "字" * 100 + "\n" for i in range(100))
+    blocks = ["开头\n", emoji_line, long_lines, "结尾\n"]
+    chunks = list(chunk_blocks(blocks))
+
+    assert all(0 < utf16_len(chunk) <= TELEGRAM_TEXT_LIMIT for chunk in chunks)
+    assert "".join(chunks) == "".join(blocks)
+
+
+def test_small_limit_with_astral_chars():
+    chunks = list(chunk_blocks(["a🎉🎉🎉b"], limit=3))
+
+    assert all(utf16_len(chunk) <= 3 for chunk in chunks)
+    assert "".join(chunks) == "a🎉🎉🎉b"
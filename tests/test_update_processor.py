@@ -0,0 +1,47 @@
+"""按聊天串行的并发更新处理器测试"""
+
+import asyncio
+
+from src.update_processor import BacklogQueue, PerChatUpdateProcessor
+
+
+def fetch_like_ptb(queue: BacklogQueue, processor: PerChatUpdateProcessor, handler, tasks: list):
+    """模拟 Application._update_fetcher 的并发模式：取出即创建任务，不等待处理"""
+    async def fetcher():
+        while True:
+            update = await queue.get()
+            tasks.append(asyncio.create_task(processor.process_update(update, handler(update))))
+    return asyncio.create_task(fetcher())
+
+
+def test_backlog_queue_bounds_scheduled_updates():
+    async def scenario():
+        processor = PerChatUpdateProcessor(2, max_backlog=5)
+        queue = BacklogQueue(processor, maxsize=10)
+        release = asyncio.Event()
+        done = []
+
+        async def handler(update):
+            await release.wait()
+            done.append(update)
+
+        tasks = []
+        fetcher = fetch_like_ptb(queue, processor, handler, tasks)
+        for update in range(10):
+            await queue.put(update)
+        await asyncio.sleep(0.01)
+
+        # 只调度了 max_backlog 个更新，其余留在队列中，接收端仍可以再放入 5 个
+        assert len(tasks) == 5
+        assert queue.qsize() == 5
+        assert processor.get_stats()["backlog"] == 5
+
+        release.set()
+        while len(done) < 10:
+            await asyncio.sleep(0.01)
+        assert sorted(done) == list(range(10))
+        # 取出协程已为下一个更新预先占用了一个名额
+        assert processor.get_stats()["backlog"] == 1
+        fetcher.cancel()
+
+    asyncio.run(scenario())
@@ -0,0 +1,99 @@
+"""旧版 %Y-W%W 周标识迁移为 ISO 周的测试"""
+
+import json
+
+import pytest
+
+from src.models.report_store import ISO_WEEKS_MARKER, JsonReportStore, LegacyWeekKeysError
+from src.models.sqlite_store import SQLiteReportStore
+from src.models.week_migration import plan_rekey, rekey_json_tree, rekey_sqlite, written_as_iso
+
+GROUP_ID = -1001
+
+
+def record(name: str, submitted_at: str) -> dict:
+    return {"username": name, "content": f"{name} 的周报", "submitted_at": submitted_at}
+
+
+def write_week(reports_dir, week: str, reports: dict):
+    group_dir = reports_dir / str(GROUP_ID)
+    group_dir.mkdir(parents=True, exist_ok=True)
+    (group_dir / f"{week}.json").write_text(
+        json.dumps({"week": week, "reports": reports}, ensure_ascii=False), encoding="utf-8"
+    )
+
+
+def test_plan_rekey_maps_legacy_weeks_to_iso():
+    # 2026-01-01 是周四：旧版第 1 周从 1 月 5 日开始，即 ISO 第 2 周
+    assert plan_rekey(["2026-W41", "2026-W00"]) == {"2026-W41": "2026-W42", "2026-W00": "2026-W01"}
+    # 2024-01-01 是周一：两种周标识一致，不需要改名
+    assert plan_rekey(["2024-W10"]) == {}
+
+
+def test_plan_rekey_skips_iso_weeks():
+    assert plan_rekey(["2026-W41", "2026-W42"], {"2026-W42"}) == {"2026-W41": "2026-W42"}
+
+
+def test_written_as_iso_uses_submission_dates():
+    # 2026-10-13 在 ISO 2026-W42，旧版 2026-W41
+    assert written_as_iso("2026-W42", ["2026-10-13T09:00:00"])
+    assert not written_as_iso("2026-W41", ["2026-10-13T09:00:00"])
+    assert not written_as_iso("2026-W42", [])
+
+
+def test_json_store_refuses_unmigrated_tree(tmp_path):
+    write_week(tmp_path, "2026-W41", {"1": record("alice", "2026-10-13T09:00:00")})
+    with pytest.raises(LegacyWeekKeysError):
+        JsonReportStore(tmp_path)
+    assert not (tmp_path / ISO_WEEKS_MARKER).exists()
+
+
+def test_json_store_marks_new_tree(tmp_path):
+    JsonReportStore(tmp_path)
+    assert (tmp_path / ISO_WEEKS_MARKER).exists()
+
+
+def test_rekey_mixed_json_tree(tmp_path):
+    # 旧版文件 2026-W41 与旧版本在未迁移目录中以 ISO 标识写入的 2026-W42 是同一周
+    write_week(tmp_path, "2026-W41", {
+        "1": record("alice", "2026-10-12T09:00:00"),
+        "2": record("bob", "2026-10-12T10:00:00"),
+    })
+    write_week(tmp_path, "2026-W42", {
+        "2": record("bob", "2026-10-14T10:00:00"),
+        "3": record("carol", "2026-10-15T10:00:00"),
+    })
+
+    stats = rekey_json_tree(tmp_path)
+
+    assert stats == {"groups": 1, "renamed": 1, "merged": 1}
+    group_dir = tmp_path / str(GROUP_ID)
+    assert sorted(p.stem for p in group_dir.glob("*.json")) == ["2026-W42"]
+    data = JsonReportStore(tmp_path).load_week(GROUP_ID, "2026-W42")
+    assert set(data["reports"]) == {"1", "2", "3"}
+    # 同一用户保留较晚的提交
+    assert data["reports"]["2"]["submitted_at"] == "2026-10-14T10:00:00"
+    assert rekey_json_tree(tmp_path) == {"skipped": True}
+
+
+def test_rekey_mixed_sqlite(tmp_path):
+    db_file = tmp_path / "reports.db"
+    store = SQLiteReportStore(db_file)
+    store.upsert_report(GROUP_ID, "2026-W41", 1, record("alice", "2026-10-12T09:00:00"))
+    store.upsert_report(GROUP_ID, "2026-W42", 3, record("carol", "2026-10-15T10:00:00"))
+    # 模拟尚未迁移的旧数据库
+    store._conn.execute("PRAGMA user_version=0")
+    store.close()
+
+    with pytest.raises(LegacyWeekKeysError):
+        SQLiteReportStore(db_file)
+
+    store = SQLiteReportStore(db_file, allow_legacy_weeks=True)
+    try:
+        assert rekey_sqlite(store) == {"weeks": 1, "rows": 1}
+        assert store.all_weeks() == ["2026-W42"]
+        assert store.submitted_user_ids(GROUP_ID, "2026-W42") == {"1", "3"}
+        assert rekey_sqlite(store) == {"skipped": True}
+    finally:
+        store.close()
+    SQLiteReportStore(db_file).close()